@@ -1,18 +1,53 @@
 from manim import *
 import numpy as np
 
+from throw_arc import QuadraticThrow
+
+def TwoD_throw_controls(P, Q):
+    return np.array([P, (P + Q)/2 + np.linalg.norm(Q-P)*np.array([0,0,1]), Q])
+
 def TwoD_throw_func(P, Q):
-    return bezier(np.array([P, (P + Q)/2 + np.linalg.norm(Q-P)*np.array([0,0,1]), Q]))
+    return bezier(TwoD_throw_controls(P, Q))
 
 throw_heights = np.array([[[0, 1], [1, 1], [3, 0]], [[4, 0], [2, 1], [2, 1]]])
 
+"""
+Returns the control points of every throw of a two dimensional siteswap lattice at once, as the quadratic
+Bezier curves of TwoD_throw_func: from the start to the end of the throw, through a control point above
+their midpoint by the length of the throw. Throws of height (0, 0) are left out.
+Inputs:
+throw_heights -- (rows, columns, 2) array, the throw at row i and column j goes from (j, i) to (j, i) + throw_heights[i][j]
+Returns:
+(number of throws, 3, 3) array of the start, control and end point of each throw
+"""
+def lattice_throw_controls(throw_heights):
+    throw_heights = np.asarray(throw_heights, dtype=float)
+    rows, columns = throw_heights.shape[:2]
+    i, j = np.meshgrid(np.arange(rows), np.arange(columns), indexing="ij")
+    starts = np.stack([j, i, np.zeros_like(i)], axis=-1).reshape(-1, 3).astype(float)
+    steps = np.concatenate([throw_heights.reshape(-1, 2), np.zeros((rows*columns, 1))], axis=1)
+    starts, steps = starts[np.any(steps != 0, axis=1)], steps[np.any(steps != 0, axis=1)]
+    ends = starts + steps
+    peaks = (starts + ends)/2 + np.linalg.norm(steps, axis=1)[:, None]*OUT
+    return np.stack([starts, peaks, ends], axis=1)
+
+"""
+Every throw of a two dimensional siteswap lattice as one QuadraticThrow, with one cubic curve per throw.
+The curves are the exact cubic forms of the quadratic throws, computed in one NumPy evaluation,
+so lattices of thousands of throws are a single mobject with four points per throw.
+Inputs:
+throw_heights -- (rows, columns, 2) array of throws, as for lattice_throw_controls
+"""
+class LatticeThrows(QuadraticThrow):
+    def __init__(self, throw_heights, **kwargs):
+        super().__init__(lattice_throw_controls(throw_heights), **kwargs)
+
+"""
+A scene drawing the throws of a two dimensional siteswap lattice, throw_heights by default.
+Set the throw_heights class attribute to draw another lattice.
+"""
 class TwoDimsiteSwap(ThreeDScene):
+    throw_heights = throw_heights
+
     def construct(self):
-        throws = []
-        for i in range(np.shape(throw_heights)[0]):
-            for j in range(np.shape(throw_heights)[1]):
-                start = np.array([j, i, 0])
-                end = start + np.array([throw_heights[i][j][0], throw_heights[i][j][1]])
-                throws.append(ParametricFunction(TwoD_throw_func(start, end), t_range=[0,1]))
-        for throw in throws:
-            self.add(throw)
\ No newline at end of file
+        self.add(LatticeThrows(self.throw_heights))
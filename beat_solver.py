@@ -0,0 +1,201 @@
+from manim import *
+import numpy as np
+
+from throw_arc import throw_arc_geometry
+
+"""
+This file contains a solver which moves every throw and label of a tracker driven siteswap
+diagram in one pass per frame, instead of one updater closure per arrow and per label.
+Every quantity in these diagrams is affine in the tracker values: a catch position is
+catch_pos + (coefficients . tracker values), and so is a label's value. The solver stores the
+positions and coefficients of all throws and labels as arrays, evaluates them with one
+matrix product per frame, and pushes the results to the mobjects.
+"""
+
+"""
+A single per frame solver for throws drawn as ThrowArcs between beats on NumberLines,
+and DecimalNumber labels whose values follow the same trackers.
+Inputs:
+lines -- list of NumberLine objects the beats are measured on
+trackers -- list of ValueTrackers the catch positions and label values depend on
+Setting visible_width only reshapes the throws whose horizontal span overlaps a band of that width centered
+on the frame, leaving the others as they were until they come back into it. Throws which were just added or
+pointed at other beats are reshaped on the next update wherever they are, so none keeps a stale shape.
+Throws and labels taken off the scene can be deactivated, and are skipped until they are set again.
+"""
+class BeatStateSolver:
+    def __init__(self, lines, trackers):
+        self.lines = list(lines)
+        self.trackers = list(trackers)
+        self.arcs = []
+        self.throw_lines = np.zeros(0, dtype=int)
+        self.throw_positions = np.zeros(0)
+        self.catch_lines = np.zeros(0, dtype=int)
+        self.catch_positions = np.zeros(0)
+        self.catch_coefficients = np.zeros((0, len(self.trackers)))
+        self.dirty_throws = np.zeros(0, dtype=bool)
+        self.active_throws = np.zeros(0, dtype=bool)
+        self.labels = []
+        self.label_bases = np.zeros(0)
+        self.label_coefficients = np.zeros((0, len(self.trackers)))
+        self.label_values = np.zeros(0)
+        self.active_labels = np.zeros(0, dtype=bool)
+        self.line_shift_coefficients = np.zeros((len(self.lines), len(self.trackers)))
+        self.line_shifts = np.zeros(len(self.lines))
+        self.arc_groups = []
+        self.windows = []
+        self.driver = None
+        self.visible_width = None
+
+    #Registers throws with the solver.
+    #Inputs:
+    #arcs -- list of ThrowArcs
+    #throw_lines -- index into lines of the line each throw starts on, one per arc or a single index
+    #throw_positions -- beat each throw starts at
+    #catch_lines -- index into lines of the line each throw is caught on, one per arc or a single index
+    #catch_positions -- beat each throw lands at when all trackers are 0
+    #catch_coefficients -- Optional, (len(arcs), len(trackers)) array, how far each catch moves per unit of each tracker
+    def add_throws(self, arcs, throw_lines, throw_positions, catch_lines, catch_positions, catch_coefficients=None):
+        K = len(arcs)
+        if catch_coefficients is None:
+            catch_coefficients = np.zeros((K, len(self.trackers)))
+        self.arcs.extend(arcs)
+        self.throw_lines = np.concatenate([self.throw_lines, np.broadcast_to(throw_lines, (K,)).astype(int)])
+        self.throw_positions = np.concatenate([self.throw_positions, np.broadcast_to(throw_positions, (K,))])
+        self.catch_lines = np.concatenate([self.catch_lines, np.broadcast_to(catch_lines, (K,)).astype(int)])
+        self.catch_positions = np.concatenate([self.catch_positions, np.broadcast_to(catch_positions, (K,))])
+        self.catch_coefficients = np.concatenate([self.catch_coefficients,
+                                                  np.reshape(catch_coefficients, (K, len(self.trackers)))])
+        self.dirty_throws = np.concatenate([self.dirty_throws, np.ones(K, dtype=bool)])
+        self.active_throws = np.concatenate([self.active_throws, np.ones(K, dtype=bool)])
+        self.arc_groups = self.group_arcs()
+
+    #Registers DecimalNumber labels with the solver.
+    #Inputs:
+    #labels -- list of DecimalNumbers
+    #base_values -- value of each label when all trackers are 0
+    #coefficients -- (len(labels), len(trackers)) array, how much each label changes per unit of each tracker
+    def add_labels(self, labels, base_values, coefficients):
+        L = len(labels)
+        self.labels.extend(labels)
+        self.label_bases = np.concatenate([self.label_bases, np.broadcast_to(base_values, (L,))])
+        self.label_coefficients = np.concatenate([self.label_coefficients,
+                                                  np.reshape(coefficients, (L, len(self.trackers)))])
+        self.label_values = np.concatenate([self.label_values, np.full(L, np.nan)])
+        self.active_labels = np.concatenate([self.active_labels, np.ones(L, dtype=bool)])
+
+    #Makes the solver slide one of its lines horizontally by (coefficients . tracker values),
+    #before placing the throws on it.
+    def add_line_shift(self, line_index, coefficients):
+        self.line_shift_coefficients[line_index] = coefficients
+
+    #Points an already registered throw at a different pair of beats, for arcs recycled between beats.
+    #Call regroup afterwards if the arc's tip or buff settings changed.
+    def set_throw(self, k, throw_line, throw_position, catch_line, catch_position, catch_coefficients=None):
+        self.throw_lines[k] = throw_line
+        self.throw_positions[k] = throw_position
+        self.catch_lines[k] = catch_line
+        self.catch_positions[k] = catch_position
+        self.catch_coefficients[k] = 0 if catch_coefficients is None else catch_coefficients
+        self.dirty_throws[k] = True
+        self.active_throws[k] = True
+
+    #Gives an already registered label a different base value and coefficients, for labels recycled between beats.
+    def set_label(self, k, base_value, coefficients=None):
+        self.label_bases[k] = base_value
+        self.label_coefficients[k] = 0 if coefficients is None else coefficients
+        self.label_values[k] = np.nan
+        self.active_labels[k] = True
+
+    #Stops moving registered throws and setting registered labels, e.g. for arcs and labels a window took off its line,
+    #until set_throw and set_label point them at beats again.
+    def deactivate(self, throw_indices=(), label_indices=()):
+        throw_indices, label_indices = list(throw_indices), list(label_indices)
+        self.active_throws[throw_indices] = False
+        self.dirty_throws[throw_indices] = False
+        self.active_labels[label_indices] = False
+
+    def regroup(self):
+        self.arc_groups = self.group_arcs()
+
+    #Arcs sharing their tip and buff settings are solved in a single call to throw_arc_geometry.
+    def group_arcs(self):
+        groups = {}
+        for k, arc in enumerate(self.arcs):
+            key = (arc.tip_length, arc.buff, arc.max_tip_length_to_length_ratio, arc.num_components)
+            groups.setdefault(key, []).append(k)
+        return [(key, np.array(indices)) for key, indices in groups.items()]
+
+    def tracker_values(self):
+        return np.array([tracker.get_value() for tracker in self.trackers], dtype=float)
+
+    #Slides the lines to where they sit for the given tracker values.
+    def shift_lines(self, values):
+        line_shifts = self.line_shift_coefficients @ values
+        for j in np.flatnonzero(line_shifts != self.line_shifts):
+            self.lines[j].shift((line_shifts[j] - self.line_shifts[j])*RIGHT)
+        self.line_shifts = line_shifts
+
+    #Returns the start and end point of every registered throw, as two (K, 3) arrays,
+    #and the value of every registered label, for the given tracker values.
+    #By default the current tracker values are used, and the lines are slid to match them first.
+    def solve(self, values=None):
+        if values is None:
+            values = self.tracker_values()
+            self.shift_lines(values)
+        origins = np.array([line.n2p(0) for line in self.lines], dtype=float)
+        units = np.array([line.n2p(1) for line in self.lines], dtype=float) - origins
+        catches = self.catch_positions + self.catch_coefficients @ values
+        starts = origins[self.throw_lines] + self.throw_positions[:, None]*units[self.throw_lines]
+        ends = origins[self.catch_lines] + catches[:, None]*units[self.catch_lines]
+        label_values = self.label_bases + self.label_coefficients @ values
+        return starts, ends, label_values
+
+    #Returns a boolean array of which throws overlap the visible band or changed beats since they were last reshaped,
+    #or None if every throw is reshaped.
+    def visible_throws(self, starts, ends):
+        if self.visible_width is None:
+            return None
+        half_width = self.visible_width/2
+        return (self.dirty_throws | ((np.maximum(starts[:, 0], ends[:, 0]) >= -half_width)
+                                     & (np.minimum(starts[:, 0], ends[:, 0]) <= half_width)))
+
+    #Moves every throw and sets every label for the current tracker values.
+    #Windows onto the lines recycle their beats once the lines are in place, before the throws are solved.
+    #Labels are only reset when their value changed.
+    def update(self, *args):
+        values = self.tracker_values()
+        self.shift_lines(values)
+        for window in self.windows:
+            window.refresh()
+        starts, ends, label_values = self.solve(values)
+        visible = self.visible_throws(starts, ends)
+        moving = self.active_throws if visible is None else self.active_throws & visible
+        for (tip_length, buff, ratio, num_components), indices in self.arc_groups:
+            indices = indices[moving[indices]]
+            if len(indices) == 0:
+                continue
+            angles = np.array([self.arcs[k].angle for k in indices], dtype=float)
+            bodies, tips = throw_arc_geometry(starts[indices], ends[indices], angles, tip_length=tip_length,
+                                              buff=buff, max_tip_length_to_length_ratio=ratio,
+                                              num_components=num_components)
+            for k, body, tip in zip(indices, bodies, tips):
+                self.arcs[k].set_geometry(body, tip)
+        self.dirty_throws[:] = False
+        for k in np.flatnonzero((label_values != self.label_values) & self.active_labels):
+            self.labels[k].set_value(label_values[k])
+        self.label_values = label_values
+        return self
+
+    #Starts running the solver every frame. The solver runs from an empty mobject put at the back
+    #of the scene, so it updates before anything drawn, and the scene treats everything after it as moving.
+    #The driver lists the mobjects it changes as its driven_mobjects, for static_layer.
+    def attach(self, scene):
+        if self.driver is None:
+            self.driver = Mobject()
+            self.driver.add_updater(lambda mob: self.update())
+        self.driver.driven_mobjects = list(self.lines) + list(self.arcs) + list(self.labels)
+        scene.add(self.driver)
+        scene.bring_to_back(self.driver)
+        self.update()
+        return self
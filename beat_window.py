@@ -0,0 +1,149 @@
+from manim import *
+import numpy as np
+
+from glyph_cache import cached_decimal, cached_text
+from throw_arc import ThrowArc
+
+"""
+This file contains a window onto a long siteswap number line, which only builds the beats
+near the camera frame. Each beat on screen gets a slot holding its throw, its label and its hand;
+as the line slides, slots of beats which left the window are handed to beats which entered it,
+so memory and per frame cost stay the same however long the pattern's range of beats is.
+The window runs inside a BeatStateSolver, which places the recycled throws and labels.
+
+What each beat shows is given by a beat_spec function, taking a beat and returning a dictionary with
+catch_position -- beat the throw lands at when all trackers are 0
+angle -- angle of the throw's arc
+label_value -- value of the beat's label when all trackers are 0
+and optionally
+throw_line, catch_line -- indices into the solver's lines, by default the window's line
+catch_coefficients, label_coefficients -- how far the catch and label move per unit of each tracker
+buff, max_tip_length_to_length_ratio, color -- style of the throw, as for ThrowArc
+num_decimal_places, label_color, label_direction -- style and side of the label
+hand -- text of the hand marker drawn beyond the label, if any
+"""
+
+"""
+Returns a NumberLine over only the beats of endpoints which can be seen when beat
+(endpoints[0] + endpoints[1])/2 is in the middle of the frame, padded by margin and reach.
+That middle beat is stored as window_center; center the line on it to match a full line over endpoints.
+Inputs:
+endpoints -- list of integers of length 2, start and end beats of the whole pattern
+reach -- number of beats to build beyond the frame on either side, at least the longest throw
+margin -- Optional, distance beyond the edge of the frame still counted as visible
+Further keyword arguments are passed to NumberLine.
+"""
+def window_line(endpoints, reach, margin=1, **kwargs):
+    center = (endpoints[0] + endpoints[1])/2
+    half_width = (config.frame_width/2 + margin)/kwargs.get("unit_size", 1)
+    first = max(endpoints[0], int(np.floor(center - half_width)) - reach)
+    last = min(endpoints[1], int(np.ceil(center + half_width)) + reach)
+    line = NumberLine(x_range=[first, last], **kwargs)
+    line.window_center = center
+    return line
+
+"""
+The mobjects drawn for one beat, and their rows in the solver.
+"""
+class BeatSlot:
+    def __init__(self, arc, arc_index, label, label_index):
+        self.arc = arc
+        self.arc_index = arc_index
+        self.label = label
+        self.label_index = label_index
+        self.hand = None
+
+"""
+Builds and recycles the beats of one of a solver's lines which are near the frame.
+Inputs:
+solver -- BeatStateSolver moving the line, its throws and labels
+line_index -- index into the solver's lines of the line to window
+endpoints -- list of integers of length 2, the beats are never built outside of this range
+beat_spec -- function from a beat to the dictionary described at the top of this file
+reach -- number of beats built beyond the frame on either side, at least the longest throw,
+         so throws from beats off screen which land on screen are drawn
+margin -- Optional, distance beyond the edge of the frame still counted as visible
+font_size -- Optional, font size of the labels
+"""
+class BeatWindow:
+    def __init__(self, solver, line_index, endpoints, beat_spec, reach, margin=1, font_size=70):
+        self.solver = solver
+        self.line_index = line_index
+        self.line = solver.lines[line_index]
+        self.endpoints = endpoints
+        self.beat_spec = beat_spec
+        self.reach = reach
+        self.margin = margin
+        self.font_size = font_size
+        self.slots = {}
+        self.free_slots = []
+        self.beats = range(0)
+        solver.windows.append(self)
+
+    #Returns the range of beats on the line within reach of the frame, clipped to endpoints.
+    def needed_beats(self):
+        origin = self.line.n2p(0)[0]
+        unit = self.line.n2p(1)[0] - origin
+        half_width = config.frame_width/2 + self.margin
+        low, high = sorted(((-half_width - origin)/unit, (half_width - origin)/unit))
+        first = max(self.endpoints[0], int(np.floor(low)) - self.reach)
+        last = min(self.endpoints[1], int(np.ceil(high)) + self.reach)
+        return range(first, last + 1)
+
+    #Hands the slots of beats which left the window to the beats which entered it. Returns whether anything changed.
+    def refresh(self):
+        beats = self.needed_beats()
+        if beats == self.beats:
+            return False
+        for beat in [beat for beat in self.slots if beat not in beats]:
+            slot = self.slots.pop(beat)
+            self.line.remove(slot.arc, slot.label, *([slot.hand] if slot.hand != None else []))
+            self.solver.deactivate([slot.arc_index], [slot.label_index])
+            self.free_slots.append(slot)
+        for beat in beats:
+            if beat not in self.slots:
+                slot = self.free_slots.pop() if self.free_slots else self.new_slot()
+                self.slots[beat] = slot
+                self.assign(beat, slot)
+        self.beats = beats
+        self.solver.regroup()
+        return True
+
+    #Sets up every built beat again, after beat_spec was changed.
+    def rebuild(self):
+        for beat, slot in self.slots.items():
+            self.assign(beat, slot)
+        self.solver.regroup()
+
+    #Registers a new throw and label with the solver.
+    def new_slot(self):
+        arc = ThrowArc(ORIGIN, RIGHT)
+        label = cached_decimal(0, 0, edge_to_fix=ORIGIN, font_size=self.font_size)
+        self.solver.add_throws([arc], self.line_index, 0, self.line_index, 1)
+        self.solver.add_labels([label], 0, np.zeros(len(self.solver.trackers)))
+        return BeatSlot(arc, len(self.solver.arcs) - 1, label, len(self.solver.labels) - 1)
+
+    #Points a slot at a beat: styles its throw and label from beat_spec, places the label and hand,
+    #and hands the positions and coefficients to the solver, which places the throw and sets the label on its next update.
+    def assign(self, beat, slot):
+        spec = self.beat_spec(beat)
+        arc = slot.arc
+        arc.angle = spec["angle"]
+        arc.buff = spec.get("buff", 0)
+        arc.max_tip_length_to_length_ratio = spec.get("max_tip_length_to_length_ratio")
+        arc.set_color(spec.get("color", WHITE))
+        self.solver.set_throw(slot.arc_index, spec.get("throw_line", self.line_index), beat,
+                              spec.get("catch_line", self.line_index), spec["catch_position"],
+                              spec.get("catch_coefficients"))
+        label = slot.label
+        direction = spec.get("label_direction", DOWN)
+        label.set(num_decimal_places=spec.get("num_decimal_places", 0))
+        label.set_color(spec.get("label_color", WHITE))
+        label.next_to(self.line.n2p(beat), direction, buff=MED_SMALL_BUFF)
+        self.solver.set_label(slot.label_index, spec["label_value"], spec.get("label_coefficients"))
+        if slot.hand != None:
+            self.line.remove(slot.hand)
+            slot.hand = None
+        if "hand" in spec:
+            slot.hand = cached_text(spec["hand"]).next_to(label, direction)
+        self.line.add(arc, label, *([slot.hand] if slot.hand != None else []))
@@ -0,0 +1,255 @@
+import argparse
+import fnmatch
+import importlib
+import json
+import platform
+import sys
+import tempfile
+import time
+import traceback
+
+import numpy as np
+
+from render_farm import PROJECT_DIRECTORY, discover_scenes, scene_config
+from siteswap_patterns import enumerate_siteswaps, pattern_name
+
+"""
+This file contains a benchmark harness for the project's scenes. Each scene is rendered without
+writing any files, and three costs are timed separately:
+setup -- time spent in construct outside of play and wait, building mobjects and updaters
+interpolation -- time per frame spent moving animations and running updaters (Scene.update_to_time)
+rasterization -- time per frame spent drawing the frame (the renderer's render)
+Besides the scenes of the project's files, the scenes of pattern_scenes.py are run over a range
+of pattern periods and numbers of beats, with and without windowing, so the cost of the hot paths can
+be followed as the patterns grow. Results are written as JSON, and can be compared with an earlier run.
+Usage:
+python benchmark.py --output benchmark.json
+python benchmark.py --case "pattern_scenes.prechac*" --repeat 3 --baseline benchmark.json
+"""
+
+BENCHMARK_MODULES = ["rotating_polygon", "prechac_line", "siteswap", "siteswap_diagram_mods",
+                     "draw_siteswap", "line_on_circle"]
+BENCHMARK_PERIODS = [3, 5, 8]
+BENCHMARK_BEAT_COUNTS = [30, 120, 480]
+BENCHMARK_WINDOW_MARGIN = 1
+BENCHMARK_METRICS = ["setup_seconds", "interpolation_mean", "rasterization_mean"]
+
+"""
+Mixed into a Scene class to time it. Frames are timed around update_to_time and the renderer's render,
+and setup is the time between setup and tear_down, less the time spent in play.
+"""
+class TimedScene:
+    def setup(self):
+        super().setup()
+        self.timings = {"interpolation": [], "rasterization": [], "play": 0.0}
+        render = self.renderer.render
+        def timed_render(*args, **kwargs):
+            start = time.perf_counter()
+            render(*args, **kwargs)
+            self.timings["rasterization"].append(time.perf_counter() - start)
+        self.renderer.render = timed_render
+        self.timings["construct_start"] = time.perf_counter()
+
+    def tear_down(self):
+        self.timings["construct"] = time.perf_counter() - self.timings.pop("construct_start")
+        super().tear_down()
+
+    def play(self, *args, **kwargs):
+        start = time.perf_counter()
+        super().play(*args, **kwargs)
+        self.timings["play"] += time.perf_counter() - start
+
+    def update_to_time(self, t):
+        start = time.perf_counter()
+        super().update_to_time(t)
+        self.timings["interpolation"].append(time.perf_counter() - start)
+
+"""
+Returns summary statistics of a list of per frame times, in seconds.
+"""
+def frame_statistics(times):
+    if len(times) == 0:
+        return {"frames": 0, "total": 0.0, "mean": 0.0, "median": 0.0, "p95": 0.0, "max": 0.0}
+    times = np.asarray(times)
+    return {"frames": len(times), "total": float(times.sum()), "mean": float(times.mean()),
+            "median": float(np.median(times)), "p95": float(np.percentile(times, 95)), "max": float(times.max())}
+
+"""
+Returns a benchmark case, a dictionary naming a scene class and the class attributes to override on it.
+Inputs:
+module_name -- name of the module defining the scene
+scene_name -- name of the Scene class
+labels -- Optional, dictionary of the parameters the case stands for, e.g. {"period": 5}, recorded with the results
+Further keyword arguments are class attributes overriding those of the scene.
+"""
+def benchmark_case(module_name, scene_name, labels=None, **parameters):
+    name = f"{module_name}.{scene_name}"
+    if labels:
+        name += "[" + ",".join(f"{key}={value}" for key, value in labels.items()) + "]"
+    return {"name": name, "module": module_name, "scene": scene_name, "labels": labels or {}, "parameters": parameters}
+
+"""
+Returns a pattern of a given period to benchmark with, the first three ball pattern of that period
+with throws of at most 5.
+"""
+def benchmark_pattern(period):
+    return next(enumerate_siteswaps(period, 3, 5))
+
+"""
+Returns the list of benchmark cases: every scene in BENCHMARK_MODULES as written, and the scenes of
+pattern_scenes.py for every period, and every number of beats with and without windowing.
+"""
+def benchmark_cases(periods=BENCHMARK_PERIODS, beat_counts=BENCHMARK_BEAT_COUNTS, window_margin=BENCHMARK_WINDOW_MARGIN):
+    cases = [benchmark_case(module_name, scene_name) for module_name, scene_name in discover_scenes()
+             if module_name in BENCHMARK_MODULES]
+    for period in periods:
+        throw_heights = benchmark_pattern(period)
+        labels = {"pattern": pattern_name(throw_heights), "period": period}
+        cases.append(benchmark_case("pattern_scenes", "rotation_pattern", labels, throw_heights=throw_heights))
+        cases.append(benchmark_case("pattern_scenes", "wrap_pattern", labels, throw_heights=throw_heights))
+        for beats in beat_counts:
+            endpoints = [-(beats//2), beats - beats//2]
+            for margin in [None, window_margin]:
+                case_labels = dict(labels, beats=beats, windowed=margin != None)
+                for scene_name in ["prechac_pattern", "diagram_pattern"]:
+                    cases.append(benchmark_case("pattern_scenes", scene_name, case_labels, throw_heights=throw_heights,
+                                                endpoints=endpoints, window_margin=margin))
+    return cases
+
+"""
+Renders one benchmark case without writing any output, and returns its timings.
+Inputs:
+case -- dictionary from benchmark_case
+quality -- Optional, manim quality preset or its command line flag
+Returns:
+Dictionary with the case's name, module, scene and labels, the status ("ok" or "failed"), the setup time,
+the time spent in play outside of the timed frames, and statistics of the interpolation and rasterization
+times per frame, or the error.
+"""
+def run_case(case, quality="low_quality"):
+    from manim import tempconfig
+    from glyph_cache import clear_glyph_cache
+    result = {key: case[key] for key in ["name", "module", "scene", "labels"]}
+    try:
+        if PROJECT_DIRECTORY not in sys.path:
+            sys.path.insert(0, PROJECT_DIRECTORY)
+        scene_class = getattr(importlib.import_module(case["module"]), case["scene"])
+        timed_class = type(scene_class.__name__, (TimedScene, scene_class), dict(case["parameters"]))
+        clear_glyph_cache()
+        with tempfile.TemporaryDirectory() as media_dir:
+            settings = scene_config(case["module"], quality, media_dir)
+            settings.update(write_to_movie=False, save_last_frame=False, disable_caching=True, preview=False)
+            with tempconfig(settings):
+                start = time.perf_counter()
+                scene = timed_class()
+                scene.render()
+                total = time.perf_counter() - start
+        timings = scene.timings
+        interpolation = frame_statistics(timings["interpolation"])
+        rasterization = frame_statistics(timings["rasterization"])
+        result.update(status="ok", total_seconds=total,
+                      setup_seconds=timings["construct"] - timings["play"],
+                      play_overhead_seconds=timings["play"] - interpolation["total"] - rasterization["total"],
+                      interpolation=interpolation, rasterization=rasterization,
+                      interpolation_mean=interpolation["mean"], rasterization_mean=rasterization["mean"])
+    except Exception:
+        result.update(status="failed", error=traceback.format_exc())
+    return result
+
+"""
+Runs a list of benchmark cases one after another, keeping the fastest of repeat runs of each.
+Inputs:
+cases -- list of dictionaries from benchmark_case
+repeat -- Optional, number of times to run each case
+quality -- Optional, manim quality preset or its command line flag
+log -- Optional, function called with a line of text as each case finishes
+Returns:
+Dictionary with the environment the benchmark ran in and the list of results from run_case.
+"""
+def run_benchmarks(cases, repeat=1, quality="low_quality", log=print):
+    import manim
+    results = []
+    for index, case in enumerate(cases):
+        runs = [run_case(case, quality) for i in range(repeat)]
+        finished = [run for run in runs if run["status"] == "ok"]
+        result = min(finished, key=lambda run: run["total_seconds"]) if finished else runs[0]
+        result["repeat"] = repeat
+        results.append(result)
+        if log != None:
+            log(f"[{index + 1}/{len(cases)}] {format_result(result)}")
+    environment = {"python": platform.python_version(), "platform": platform.platform(),
+                   "manim": manim.__version__, "numpy": np.__version__,
+                   "quality": quality, "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    return {"environment": environment, "results": results}
+
+"""
+Returns one line describing a result from run_case.
+"""
+def format_result(result):
+    if result["status"] != "ok":
+        return f"{result['name']}: failed, {result['error'].strip().splitlines()[-1]}"
+    return (f"{result['name']}: setup {1000*result['setup_seconds']:.1f}ms, "
+            f"{result['interpolation']['frames']} frames, "
+            f"interpolation {1000*result['interpolation_mean']:.2f}ms/frame, "
+            f"rasterization {1000*result['rasterization_mean']:.2f}ms/frame")
+
+"""
+Compares benchmark results with an earlier run, matching cases by name.
+Inputs:
+baseline -- results of the earlier run, as returned by run_benchmarks
+benchmark -- results of this run
+tolerance -- Optional, fraction a metric may grow by before it counts as a regression
+Returns:
+List of (case name, metric, baseline value, new value) for every metric of BENCHMARK_METRICS which regressed.
+"""
+def compare_results(baseline, benchmark, tolerance=0.2):
+    baseline_results = {result["name"]: result for result in baseline["results"] if result["status"] == "ok"}
+    regressions = []
+    for result in benchmark["results"]:
+        old = baseline_results.get(result["name"])
+        if old == None or result["status"] != "ok":
+            continue
+        for metric in BENCHMARK_METRICS:
+            if old[metric] > 0 and result[metric] > (1 + tolerance)*old[metric]:
+                regressions.append((result["name"], metric, old[metric], result[metric]))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the setup, interpolation and rasterization of the project's scenes.")
+    parser.add_argument("--case", action="append", default=[],
+                        help="only run cases whose name matches this pattern, may be repeated")
+    parser.add_argument("--periods", type=int, nargs="+", default=BENCHMARK_PERIODS, help="pattern periods to run")
+    parser.add_argument("--beats", type=int, nargs="+", default=BENCHMARK_BEAT_COUNTS,
+                        help="numbers of beats on the number lines to run")
+    parser.add_argument("--repeat", type=int, default=1, help="runs of each case, the fastest is kept")
+    parser.add_argument("--quality", default="l", help="l, m, h, p, k or a manim quality name")
+    parser.add_argument("--list", action="store_true", help="list the cases that would be run and exit")
+    parser.add_argument("--output", default=None, help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=None, help="compare the results with this earlier JSON output")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="fraction a metric may grow by before it counts as a regression")
+    args = parser.parse_args(argv)
+
+    cases = benchmark_cases(args.periods, args.beats)
+    if args.case:
+        cases = [case for case in cases if any(fnmatch.fnmatch(case["name"], pattern) for pattern in args.case)]
+    if args.list:
+        for case in cases:
+            print(case["name"])
+        return 0
+    benchmark = run_benchmarks(cases, repeat=args.repeat, quality=args.quality)
+    if args.output != None:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(benchmark, file, indent=2)
+    status = 0 if all(result["status"] == "ok" for result in benchmark["results"]) else 1
+    if args.baseline != None:
+        with open(args.baseline, encoding="utf-8") as file:
+            regressions = compare_results(json.load(file), benchmark, args.tolerance)
+        for name, metric, old, new in regressions:
+            print(f"Regression: {name} {metric} {old:.6f}s -> {new:.6f}s ({new/old:.2f}x)")
+        if regressions:
+            status = 1
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
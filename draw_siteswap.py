@@ -1,10 +1,26 @@
 from manim import *
 from manim.mobject.geometry.tips import ArrowTriangleTip, ArrowTriangleFilledTip    
 
+from glyph_cache import cached_text
+from siteswap_patterns import check_siteswap, orbit_colors
+from throw_arc import THROW_FACTORY
 
-def draw_siteswap(scene : Scene, throw_heights, radius=2):
+"""
+Draws a siteswap on a polygonal clock, with an arrow from each beat to the beat its throw lands on,
+setting scene.polygon, scene.labels and scene.arcs.
+Inputs:
+scene -- A Scene object to render to
+throw_heights -- list of periodic throw heights in the pattern
+radius -- Optional, radius of the circumcircle of the polygon
+colors -- Optional, list of colors, the arrows of ball orbit k get colors[k % len(colors)],
+          see siteswap_patterns.orbit_colors
+Raises a ValueError if throw_heights is not a valid siteswap.
+"""
+def draw_siteswap(scene : Scene, throw_heights, radius=2, colors=None):
+    check_siteswap(throw_heights)
     loop_radius = 0.05
     N = len(throw_heights)
+    throw_colors = orbit_colors(throw_heights, colors)
     vertices = []
     labels = []
     for i in range(N):
@@ -12,7 +28,7 @@ def draw_siteswap(scene : Scene, throw_heights, radius=2):
         vertex = radius*np.array([np.cos(new_angle), np.sin(new_angle), 0])
         vertices.append(vertex)
         label_position = vertex + (0.4)*(1/radius)*vertex
-        label = Text(str(throw_heights[i])).move_to(label_position)
+        label = cached_text(str(throw_heights[i])).move_to(label_position)
         labels.append(label)
     scene.polygon = Polygon(*vertices)
     scene.labels = labels
@@ -28,12 +44,12 @@ def draw_siteswap(scene : Scene, throw_heights, radius=2):
                       start_angle = start_angle-PI,
                       angle = -TAU + 0.5,
                       arc_center=loop_center,
-                      color=PINK)
-            arc.add_tip(ArrowTriangleFilledTip(color=PINK))
+                      color=throw_colors[i])
+            arc.add_tip(ArrowTriangleFilledTip(color=throw_colors[i]))
             arc.throw_index = i
             arc.catch_index = i
         else:
-            arc = CurvedArrow(start, end, angle=-TAU/4, color=PINK)
+            arc = THROW_FACTORY.arc(start, end, color=throw_colors[i])
             arc.throw_index = i
             arc.catch_index = catch_index
         arcs.append(arc)
@@ -0,0 +1,153 @@
+import argparse
+import importlib
+import struct
+import sys
+
+import numpy as np
+
+from render_farm import PROJECT_DIRECTORY, scene_config
+
+"""
+This file contains an output mode writing raw RGBA frames of a scene to a .npy file instead of, or as well as,
+encoding a video. Frames are appended as they are drawn and the header is rewritten with the final count at
+the end, so the file is a plain (frames, height, width, 4) uint8 array which np.load(path, mmap_mode="r")
+opens without reading it into memory. Frames are numbered as manim writes them, with the held frames of
+waits where nothing moves counted one by one, and every frame_store_every-th one is kept.
+Usage:
+python frame_store.py line_on_circle.line_on_circle --every 5 --output line_on_circle.npy
+class stored(FrameStoreScene, line_on_circle):
+"""
+
+NPY_HEADER_LENGTH = 128
+
+"""
+Returns the header of a version 1.0 .npy file holding a C ordered array of a given shape and dtype,
+padded to NPY_HEADER_LENGTH bytes so that it can be rewritten in place once the number of frames is known.
+"""
+def npy_header(shape, dtype=np.uint8):
+    text = repr({"descr": np.lib.format.dtype_to_descr(np.dtype(dtype)), "fortran_order": False, "shape": tuple(shape)})
+    text = text.ljust(NPY_HEADER_LENGTH - 11) + "\n"
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(text)) + text.encode("latin1")
+
+"""
+A .npy file of frames of the same shape, written one frame at a time.
+Inputs:
+path -- path of the file to write
+"""
+class FrameStore:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "wb")
+        self.shape = None
+        self.count = 0
+        self.file.write(npy_header((0, 0, 0, 4)))
+
+    #Appends a frame, an (height, width, 4) uint8 array.
+    def write(self, frame):
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        if self.shape == None:
+            self.shape = frame.shape
+        elif frame.shape != self.shape:
+            raise ValueError(f"Frame of shape {frame.shape} in a store of {self.shape} frames.")
+        self.file.write(frame.tobytes())
+        self.count += 1
+
+    #Writes the final header and closes the file.
+    def close(self):
+        if self.file.closed:
+            return
+        self.file.seek(0)
+        self.file.write(npy_header((self.count,) + (self.shape or (0, 0, 4))))
+        self.file.close()
+
+"""
+Opens the frames of a store as a read only memory mapped array, without reading them.
+"""
+def load_frames(path):
+    return np.load(path, mmap_mode="r")
+
+"""
+A Scene mixin writing every frame_store_every-th frame the renderer draws to the FrameStore at frame_store_path,
+see the top of this file. Put it before the Scene class in the bases, or use store_frames.
+"""
+class FrameStoreScene:
+    frame_store_path = "frames.npy"
+    frame_store_every = 1
+
+    def setup(self):
+        super().setup()
+        self.frame_store = FrameStore(self.frame_store_path)
+        self.frame_number = 0
+        add_frame = self.renderer.add_frame
+        def store_frame(frame, num_frames=1):
+            add_frame(frame, num_frames)
+            if self.renderer.skip_animations:
+                return
+            for number in range(self.frame_number, self.frame_number + num_frames):
+                if number % self.frame_store_every == 0:
+                    self.frame_store.write(frame)
+            self.frame_number += num_frames
+        self.renderer.add_frame = store_frame
+
+    def render(self, *args, **kwargs):
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            self.frame_store.close()
+
+"""
+Returns a subclass of a Scene class writing its frames to a FrameStore.
+Inputs:
+scene_class -- the Scene class
+path -- path of the .npy file to write
+every -- Optional, keep every every-th frame
+"""
+def store_frames(scene_class, path, every=1):
+    return type(scene_class.__name__, (FrameStoreScene, scene_class),
+                {"frame_store_path": path, "frame_store_every": every})
+
+"""
+Renders a scene with its frames written to a FrameStore, in the current process.
+Inputs:
+module_name -- name of the module defining the scene
+scene_name -- name of the Scene class
+path -- path of the .npy file to write
+every -- Optional, keep every every-th frame
+quality -- Optional, manim quality preset or its command line flag
+config_overrides -- Optional, dictionary of further manim config values, e.g. a smaller pixel_width and pixel_height
+movie -- Optional, whether to encode the video as well
+Returns:
+The number of frames written.
+"""
+def render_frames(module_name, scene_name, path, every=1, quality="low_quality", config_overrides=None, movie=False):
+    from manim import tempconfig
+    if PROJECT_DIRECTORY not in sys.path:
+        sys.path.insert(0, PROJECT_DIRECTORY)
+    scene_class = store_frames(getattr(importlib.import_module(module_name), scene_name), path, every)
+    settings = scene_config(module_name, quality)
+    if not movie:
+        settings.update(write_to_movie=False, save_last_frame=False, disable_caching=True)
+    settings.update(preview=False)
+    settings.update(config_overrides or {})
+    with tempconfig(settings):
+        scene = scene_class()
+        scene.render()
+    return scene.frame_store.count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a scene's frames to a memory mapped .npy file.")
+    parser.add_argument("scene", help="module.Scene to render")
+    parser.add_argument("--output", default=None, help="file to write, by default <Scene>.npy")
+    parser.add_argument("--every", type=int, default=1, help="keep every n-th frame")
+    parser.add_argument("--quality", default="l", help="l, m, h, p, k or a manim quality name")
+    parser.add_argument("--movie", action="store_true", help="encode the video as well")
+    args = parser.parse_args(argv)
+
+    module_name, _, scene_name = args.scene.rpartition(".")
+    output = args.output or f"{scene_name}.npy"
+    count = render_frames(module_name, scene_name, output, args.every, args.quality, movie=args.movie)
+    print(f"Wrote {count} frames to {output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+from collections import OrderedDict
+
+from manim import *
+
+"""
+This file contains a process wide cache of label mobjects. Building a Text shapes the string and parses
+the resulting SVG every time, even for strings already drawn, and building a DecimalNumber still lays out and
+copies the glyphs of its digits, which manim memoizes by string, so labels are built once per
+(string, font, size, color) and every later request gets a copy.
+The cache holds at most glyph_cache_size entries, evicting the least recently used.
+"""
+
+glyph_cache = OrderedDict()
+glyph_cache_size = 1024
+
+"""
+Sets the largest number of mobjects the cache holds, evicting the least recently used ones if needed.
+"""
+def set_glyph_cache_size(size):
+    global glyph_cache_size
+    glyph_cache_size = size
+    while len(glyph_cache) > glyph_cache_size:
+        glyph_cache.popitem(last=False)
+
+"""
+Empties the cache.
+"""
+def clear_glyph_cache():
+    glyph_cache.clear()
+
+"""
+Returns a copy of the mobject cached under key, building and caching it with build() if it isn't cached yet.
+"""
+def cached_glyph(key, build):
+    if key in glyph_cache:
+        glyph_cache.move_to_end(key)
+        return glyph_cache[key].copy()
+    value = glyph_cache[key] = build()
+    if len(glyph_cache) > glyph_cache_size:
+        glyph_cache.popitem(last=False)
+    return value.copy()
+
+#Keyword arguments become part of cache keys, so they are written out in a hashable, order independent form.
+def options_key(kwargs):
+    return repr(sorted(kwargs.items()))
+
+"""
+A cached replacement for Text(text, ...). Takes the same arguments as Text.
+The key includes Text's current constructor, so defaults changed with Text.set_default
+are never served from glyphs built under the old defaults.
+"""
+def cached_text(text, font="", font_size=DEFAULT_FONT_SIZE, color=None, **kwargs):
+    if color != None:
+        kwargs["color"] = color
+    key = ("Text", text, font, font_size, Text.__init__, options_key(kwargs))
+    return cached_glyph(key, lambda: Text(text, font=font, font_size=font_size, **kwargs))
+
+"""
+A cached replacement for DecimalNumber(number, num_decimal_places, ...). Takes the same
+arguments as DecimalNumber. The glyphs of digits set later with set_value come from
+manim's own map of digit strings, as for any DecimalNumber.
+"""
+def cached_decimal(number=0, num_decimal_places=2, **kwargs):
+    key = ("DecimalNumber", number, num_decimal_places, DecimalNumber.__init__, options_key(kwargs))
+    return cached_glyph(key, lambda: DecimalNumber(number, num_decimal_places, **kwargs))
@@ -0,0 +1,165 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from frame_store import load_frames, render_frames
+from render_farm import PROJECT_DIRECTORY, discover_scenes, filter_scenes
+
+"""
+This file contains a regression suite checking that changes to the geometry and rendering code leave the
+pictures alone. Every scene is rendered at a low resolution without encoding any video, keeping every
+GOLDEN_EVERY-th frame in a frame_store.py store, and compared with golden frames recorded before the change.
+Frames are compared after a 3x3 box blur of their premultiplied colors, so antialiasing moving by a fraction
+of a pixel isn't reported, and a frame differs when more than a tolerance of its pixels change by more than a
+threshold. The comparison runs on the memory mapped stores, a batch of frames at a time.
+Usage:
+python golden_frames.py record
+python golden_frames.py check --workers 8
+python golden_frames.py check --scene "rotating_polygon.*" --tolerance 0.005
+"""
+
+GOLDEN_DIRECTORY = os.path.join(PROJECT_DIRECTORY, "golden_frames")
+GOLDEN_PIXEL_WIDTH = 192
+GOLDEN_PIXEL_HEIGHT = 108
+GOLDEN_EVERY = 15
+GOLDEN_THRESHOLD = 16/255
+GOLDEN_TOLERANCE = 0.001
+GOLDEN_BATCH = 32
+
+"""
+Returns the path of the golden frames of a scene in a directory.
+"""
+def golden_path(directory, module_name, scene_name):
+    return os.path.join(directory, f"{module_name}.{scene_name}.npy")
+
+"""
+Renders the frames of one scene to a store in a directory, never raising, like render_farm.render_scene.
+Returns:
+Dictionary with the module, scene, status ("ok" or "failed"), wall time in seconds,
+and either the path and number of frames written or the error.
+"""
+def record_scene(module_name, scene_name, directory, every=GOLDEN_EVERY):
+    start = time.perf_counter()
+    result = {"module": module_name, "scene": scene_name}
+    try:
+        path = golden_path(directory, module_name, scene_name)
+        with tempfile.TemporaryDirectory() as media_dir:
+            count = render_frames(module_name, scene_name, path, every, "low_quality",
+                                  {"pixel_width": GOLDEN_PIXEL_WIDTH, "pixel_height": GOLDEN_PIXEL_HEIGHT,
+                                   "media_dir": media_dir})
+        result.update(status="ok", path=path, frames=count)
+    except Exception:
+        result.update(status="failed", error=traceback.format_exc())
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+"""
+Returns a batch of frames as float32 premultiplied RGB in [0, 1], each channel averaged over 3x3 pixels.
+"""
+def blurred_colors(frames):
+    frames = np.asarray(frames, dtype=np.float32)/255
+    colors = frames[..., :3]*frames[..., 3:]
+    padded = np.pad(colors, ((0, 0), (1, 1), (1, 1), (0, 0)), mode="edge")
+    height, width = colors.shape[1:3]
+    blurred = np.zeros_like(colors)
+    for dy in range(3):
+        for dx in range(3):
+            blurred += padded[:, dy:dy + height, dx:dx + width]
+    return blurred/9
+
+"""
+Compares two stores of frames of the same shape.
+Inputs:
+expected, actual -- (frames, height, width, 4) uint8 arrays, e.g. from load_frames
+threshold -- Optional, smallest change of a blurred channel, from 0 to 1, which counts a pixel as changed
+batch -- Optional, number of frames compared at once
+Returns:
+changed -- array of the fraction of changed pixels of each frame
+largest -- array of the largest change of a blurred channel in each frame
+"""
+def compare_frames(expected, actual, threshold=GOLDEN_THRESHOLD, batch=GOLDEN_BATCH):
+    changed = np.zeros(len(expected))
+    largest = np.zeros(len(expected))
+    for start in range(0, len(expected), batch):
+        difference = np.abs(blurred_colors(expected[start:start + batch]) - blurred_colors(actual[start:start + batch])).max(axis=3)
+        changed[start:start + batch] = (difference > threshold).mean(axis=(1, 2))
+        largest[start:start + batch] = difference.max(axis=(1, 2))
+    return changed, largest
+
+"""
+Checks a scene's frames against its golden frames and returns a line describing the outcome, and whether it passed.
+"""
+def check_scene(result, golden_directory, threshold=GOLDEN_THRESHOLD, tolerance=GOLDEN_TOLERANCE):
+    name = f"{result['module']}.{result['scene']}"
+    if result["status"] != "ok":
+        return f"failed   {name}: {result['error'].strip().splitlines()[-1]}", False
+    golden = golden_path(golden_directory, result["module"], result["scene"])
+    if not os.path.exists(golden):
+        return f"missing  {name}: no golden frames, run record", False
+    expected, actual = load_frames(golden), load_frames(result["path"])
+    if expected.shape != actual.shape:
+        return f"changed  {name}: {actual.shape[0]} frames of {actual.shape[1:3]}, expected " \
+               f"{expected.shape[0]} frames of {expected.shape[1:3]}", False
+    changed, largest = compare_frames(expected, actual, threshold)
+    failing = np.flatnonzero(changed > tolerance)
+    if len(failing):
+        frame = failing[np.argmax(changed[failing])]
+        return f"changed  {name}: {len(failing)} of {len(changed)} frames differ, worst is frame " \
+               f"{frame*GOLDEN_EVERY} with {100*changed[frame]:.2f}% of pixels changed, by up to {largest[frame]:.2f}", False
+    return f"ok       {name}: {len(changed)} frames, largest change {largest.max(initial=0):.3f}", True
+
+"""
+Renders scenes to stores in a directory in parallel worker processes, yielding the results of record_scene as they finish.
+"""
+def record_scenes(scenes, directory, workers=None):
+    os.makedirs(directory, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = [pool.submit(record_scene, module_name, scene_name, directory) for module_name, scene_name in scenes]
+        for future in as_completed(futures):
+            yield future.result()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record or check the golden frames of every scene.")
+    parser.add_argument("command", choices=["record", "check"],
+                        help="record the golden frames, or check the scenes against them")
+    parser.add_argument("--scene", action="append", default=[],
+                        help="only use scenes matching this module.Scene pattern, may be repeated")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--golden", default=GOLDEN_DIRECTORY, help="directory of the golden frames")
+    parser.add_argument("--threshold", type=float, default=GOLDEN_THRESHOLD,
+                        help="smallest change of a blurred color channel, from 0 to 1, counting a pixel as changed")
+    parser.add_argument("--tolerance", type=float, default=GOLDEN_TOLERANCE,
+                        help="largest fraction of changed pixels a frame may have")
+    parser.add_argument("--keep", default=None, help="for check, copy the frames of changed scenes to this directory")
+    args = parser.parse_args(argv)
+
+    scenes = filter_scenes(discover_scenes(), args.scene)
+    start = time.perf_counter()
+    passed = True
+    if args.command == "record":
+        for result in record_scenes(scenes, args.golden, args.workers):
+            ok = result["status"] == "ok"
+            passed &= ok
+            print(f"recorded {result['module']}.{result['scene']}: {result['frames']} frames" if ok else
+                  f"failed   {result['module']}.{result['scene']}: {result['error'].strip().splitlines()[-1]}", flush=True)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            for result in record_scenes(scenes, directory, args.workers):
+                line, ok = check_scene(result, args.golden, args.threshold, args.tolerance)
+                passed &= ok
+                print(line, flush=True)
+                if not ok and args.keep != None and result["status"] == "ok":
+                    os.makedirs(args.keep, exist_ok=True)
+                    shutil.copy(result["path"], args.keep)
+    print(f"{len(scenes)} scenes in {time.perf_counter() - start:.1f}s")
+    return 0 if passed else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+import argparse
+import functools
+import importlib
+import json
+import sys
+import time
+
+from render_farm import PROJECT_DIRECTORY, scene_config
+
+"""
+This file contains opt-in instrumentation for scenes, timing every updater and every animation's
+interpolate_mobject, custom ones like center_only_homotopy included, as well as each frame's
+update_to_time and render. It records call counts, total time and time per frame for each of them,
+and at the end of the render prints a report ranking them by total time and can write a timeline
+in the Chrome trace format, which chrome://tracing and https://ui.perfetto.dev open.
+Callbacks are grouped by name, e.g. every label_updater closure of build_updaters is one entry.
+Usage:
+python instrumentation.py prechac_line.even_prechac_anim --trace trace.json
+class profiled(InstrumentedScene, line_on_circle):
+"""
+
+"""
+A callable timing a function, which stands in for it in lists of updaters. It compares equal to the
+function it wraps, so remove_updater still finds it, and inspect.signature sees through it,
+so manim still passes dt to updaters taking it.
+"""
+class TimedCallable:
+    def __init__(self, function, instrumentation, name, category):
+        functools.update_wrapper(self, function)
+        self.function = function
+        self.instrumentation = instrumentation
+        self.name = name
+        self.category = category
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter_ns()
+        try:
+            return self.function(*args, **kwargs)
+        finally:
+            self.instrumentation.record(self.name, self.category, start, time.perf_counter_ns())
+
+    def __eq__(self, other):
+        return other is self or other == self.function
+
+    def __hash__(self):
+        return hash(self.function)
+
+"""
+Call counts, times and a timeline of the callbacks of a render.
+Inputs:
+trace_limit -- Optional, most events kept for the timeline, the statistics cover every call
+"""
+class Instrumentation:
+    def __init__(self, trace_limit=500000):
+        self.origin = time.perf_counter_ns()
+        self.trace_limit = trace_limit
+        #name -> [category, calls, total ns, longest call ns, frames called in, most ns in one frame]
+        self.stats = {}
+        self.frame = {}
+        self.frames = 0
+        self.frame_ns = 0
+        self.events = []
+
+    #Records one call of a callback, from start to end in perf_counter_ns.
+    def record(self, name, category, start, end):
+        duration = end - start
+        stat = self.stats.get(name)
+        if stat is None:
+            stat = self.stats[name] = [category, 0, 0, 0, 0, 0]
+        stat[1] += 1
+        stat[2] += duration
+        stat[3] = max(stat[3], duration)
+        self.frame[name] = self.frame.get(name, 0) + duration
+        if category == "frame":
+            self.frame_ns += duration
+        if len(self.events) < self.trace_limit:
+            self.events.append((name, category, start, duration))
+
+    #Closes the current frame, adding its time per callback to the per frame statistics.
+    def end_frame(self):
+        if not self.frame:
+            return
+        for name, duration in self.frame.items():
+            stat = self.stats[name]
+            stat[4] += 1
+            stat[5] = max(stat[5], duration)
+        self.frame = {}
+        self.frames += 1
+
+    #Returns a TimedCallable standing in for a function, or the function itself if it is already timed.
+    def wrap(self, function, name, category):
+        if isinstance(function, TimedCallable):
+            return function
+        return TimedCallable(function, self, name, category)
+
+    #Times every updater of a mobject's family, keeping their order.
+    def instrument_updaters(self, mobject):
+        for member in mobject.get_family():
+            updaters = getattr(member, "updaters", None)
+            if updaters:
+                member.updaters = [self.wrap(updater, f"updater {updater_name(updater)} ({type(member).__name__})",
+                                             "updater") for updater in updaters]
+
+    #Times an animation's interpolate_mobject, and those of the animations it is made of.
+    def instrument_animation(self, animation):
+        if not isinstance(animation.interpolate_mobject, TimedCallable):
+            name = f"{type(animation).__name__}.interpolate_mobject ({type(animation.mobject).__name__})"
+            animation.interpolate_mobject = self.wrap(animation.interpolate_mobject, name, "animation")
+        for child in getattr(animation, "animations", []):
+            self.instrument_animation(child)
+
+    #Returns a report of the callbacks, ranked by total time, limited to the given number of lines.
+    def report(self, limit=30):
+        lines = [f"{self.frames} frames, {self.frame_ns/1e6:.1f}ms in update_to_time and render",
+                 f"{'total ms':>10} {'share':>6} {'calls':>8} {'us/call':>9} {'ms/frame':>9} {'max ms/frame':>12}  name"]
+        ranked = sorted(self.stats.items(), key=lambda item: item[1][2], reverse=True)
+        for name, (category, calls, total, longest, frames, frame_max) in ranked[:limit]:
+            share = total/self.frame_ns if self.frame_ns else 0
+            lines.append(f"{total/1e6:10.2f} {100*share:5.1f}% {calls:8d} {total/calls/1e3:9.1f} "
+                         f"{total/max(frames, 1)/1e6:9.3f} {frame_max/1e6:12.3f}  {name}")
+        if len(ranked) > limit:
+            lines.append(f"... and {len(ranked) - limit} more")
+        return "\n".join(lines)
+
+    #Returns the timeline in the Chrome trace event format, with times in microseconds.
+    def chrome_trace(self):
+        events = [{"name": name, "cat": category, "ph": "X", "ts": (start - self.origin)/1e3,
+                   "dur": duration/1e3, "pid": 1, "tid": 1} for name, category, start, duration in self.events]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    #Writes the timeline to a JSON file.
+    def write_trace(self, path):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.chrome_trace(), file)
+
+"""
+Returns a readable name for an updater: the qualified name of its function, e.g.
+build_updaters.<locals>.label_updater, or of the function a partial or method calls.
+"""
+def updater_name(updater):
+    function = getattr(updater, "func", updater)
+    return getattr(function, "__qualname__", None) or type(function).__name__
+
+"""
+A Scene mixin timing the scene's updaters and animations, see the top of this file. Put it before the Scene
+class in the bases. The report is printed at the end of the render, and the timeline is written to
+instrumentation_trace if it is set.
+"""
+class InstrumentedScene:
+    instrumentation_trace = None
+    instrumentation_report_limit = 30
+
+    def setup(self):
+        super().setup()
+        self.instrumentation = Instrumentation()
+        self.renderer.render = self.instrumentation.wrap(self.renderer.render, "render", "frame")
+
+    #Times the updaters and animations before each play, so that mobjects added since are covered.
+    def begin_animations(self):
+        for mobject in self.mobjects:
+            self.instrumentation.instrument_updaters(mobject)
+        self.updaters = [self.instrumentation.wrap(updater, f"scene updater {updater_name(updater)}", "updater")
+                         for updater in self.updaters]
+        for animation in self.animations:
+            self.instrumentation.instrument_animation(animation)
+        super().begin_animations()
+
+    def update_to_time(self, t):
+        self.instrumentation.end_frame()
+        start = time.perf_counter_ns()
+        super().update_to_time(t)
+        self.instrumentation.record("update_to_time", "frame", start, time.perf_counter_ns())
+
+    def render(self, *args, **kwargs):
+        result = super().render(*args, **kwargs)
+        self.instrumentation.end_frame()
+        print(self.instrumentation.report(self.instrumentation_report_limit))
+        if self.instrumentation_trace != None:
+            self.instrumentation.write_trace(self.instrumentation_trace)
+        return result
+
+"""
+Returns a subclass of a Scene class with its updaters and animations timed.
+Inputs:
+scene_class -- the Scene class
+trace -- Optional, path of the JSON timeline to write
+report_limit -- Optional, number of callbacks in the report
+"""
+def instrument(scene_class, trace=None, report_limit=30):
+    return type(scene_class.__name__, (InstrumentedScene, scene_class),
+                {"instrumentation_trace": trace, "instrumentation_report_limit": report_limit})
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a scene, timing its updaters and animations.")
+    parser.add_argument("scene", help="module.Scene to render")
+    parser.add_argument("--quality", default="l", help="l, m, h, p, k or a manim quality name")
+    parser.add_argument("--trace", default=None, help="write a Chrome trace JSON timeline to this file")
+    parser.add_argument("--limit", type=int, default=30, help="number of callbacks in the report")
+    parser.add_argument("--no-movie", action="store_true", help="render the frames without writing a video")
+    args = parser.parse_args(argv)
+
+    from manim import tempconfig
+    module_name, _, scene_name = args.scene.rpartition(".")
+    if PROJECT_DIRECTORY not in sys.path:
+        sys.path.insert(0, PROJECT_DIRECTORY)
+    scene_class = instrument(getattr(importlib.import_module(module_name), scene_name), args.trace, args.limit)
+    settings = scene_config(module_name, args.quality)
+    if args.no_movie:
+        settings.update(write_to_movie=False, save_last_frame=False)
+    with tempconfig(settings):
+        scene_class().render()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,10 @@
 from manim import *
 
 from draw_siteswap import draw_siteswap
+from motion_tracks import EventTrack, MotionTrack, cached_track, track_updater
+from static_layer import StaticLayerScene
 
-class line_on_circle(Scene):
+class line_on_circle(StaticLayerScene, Scene):
     def construct(self):
         Radius = 3.5
         circle = Circle(Radius).set_color(WHITE)
@@ -14,19 +16,22 @@ class line_on_circle(Scene):
             new_angle = np.pi/2 - i * TAU/N
             tick_points.append(Radius*np.array([np.cos(new_angle), np.sin(new_angle), 0]))
         self.add(Polygon(*tick_points))'''
-        def point_updater(mobject):
-            epsilon = 0.2
-            new_center = [Radius*np.cos(angle.get_value()), Radius*np.sin(angle.get_value()), 0]
-            mobject.move_to(new_center)
-            angle_to_tick = -angle.get_value()*N/TAU + N/4
-            if np.abs(angle_to_tick - np.round(angle_to_tick)) < epsilon:
-                mobject.set_color(RED)
-            else:
-                mobject.set_color(BLUE)
+        epsilon = 0.2
+        def near_tick(value):
+            angle_to_tick = -value*N/TAU + N/4
+            return np.abs(angle_to_tick - np.round(angle_to_tick)) < epsilon
+        #The point's position and whether it is near a tick are sampled once over the turn.
+        position = cached_track(("line_on_circle.position", Radius, -2*TAU, 0),
+                                lambda: MotionTrack(lambda value: [Radius*np.cos(value), Radius*np.sin(value), 0], -2*TAU, 0))
+        near_ticks = cached_track(("line_on_circle.near_tick", N, epsilon, -2*TAU, 0),
+                                  lambda: EventTrack(near_tick, -2*TAU, 0))
+        def point_updater(mobject, center, near):
+            mobject.move_to(center)
+            mobject.set_color(RED if near else BLUE)
         P = Circle(0.5, fill_opacity=1)
-        P.add_updater(point_updater)
+        P.add_updater(track_updater(angle, point_updater, position, near_ticks))
         line = Line()
-        line.add_updater(lambda mobject: mobject.put_start_and_end_on(ORIGIN, P.get_center()))
+        line.add_updater(track_updater(angle, lambda mobject, center: mobject.put_start_and_end_on(ORIGIN, center), position))
         self.add(P)
         self.add(line)
         '''def mover(mobject, dt):
@@ -0,0 +1,102 @@
+import numpy as np
+
+"""
+This file contains motion tracks: functions of a ValueTracker's value, like the position of the point
+going round line_on_circle or the angle of a rotating clock, sampled once over every value the tracker
+takes into NumPy arrays. Updaters then only interpolate into the arrays instead of recomputing the
+function every frame. Event tracks hold the values where a condition, like being near a tick of the clock,
+turns on or off, found once to within a tolerance, so the condition is a binary search per frame.
+Tracks are sampled over tracker values rather than frame times, so the same tracks serve every quality
+level and frame rate, and tracks built with cached_track are shared by every render in the process.
+"""
+
+motion_tracks = {}
+
+"""
+Returns the track cached under key, building and caching it with build() if it isn't cached yet.
+The key should name the function and include everything it depends on, such as radii and ranges.
+"""
+def cached_track(key, build):
+    if key not in motion_tracks:
+        motion_tracks[key] = build()
+    return motion_tracks[key]
+
+"""
+Empties the cache.
+"""
+def clear_motion_tracks():
+    motion_tracks.clear()
+
+"""
+A function of a tracker value sampled at evenly spaced values and linearly interpolated between them.
+Values outside [start, end] are clamped, like np.interp. Linear functions are exact with 2 samples.
+Inputs:
+function -- function of a float returning a number or an array, all of the same shape
+start, end -- range of values the tracker takes
+samples -- Optional, number of values the function is sampled at
+vectorized -- Optional, whether function takes the whole array of values at once, returning the samples
+              along its first axis
+"""
+class MotionTrack:
+    def __init__(self, function, start, end, samples=4096, vectorized=False):
+        self.start = float(min(start, end))
+        self.end = float(max(start, end))
+        self.values = np.linspace(self.start, self.end, max(samples, 2))
+        if vectorized:
+            self.samples = np.asarray(function(self.values), dtype=float)
+        else:
+            self.samples = np.array([function(value) for value in self.values], dtype=float)
+        self.step = (self.end - self.start)/(len(self.values) - 1) if self.end > self.start else 1.0
+
+    #The interpolated function at a value.
+    def __call__(self, value):
+        position = min(max((value - self.start)/self.step, 0.0), len(self.values) - 1.0)
+        index = min(int(position), len(self.values) - 2)
+        fraction = position - index
+        return self.samples[index]*(1 - fraction) + self.samples[index + 1]*fraction
+
+"""
+A boolean function of a tracker value, stored as the sorted values where it changes.
+The changes are found between samples and refined by bisection, so an interval where the function
+is True is only missed if it is narrower than the spacing of the samples.
+Inputs:
+predicate -- function of a float returning a boolean
+start, end -- range of values the tracker takes
+samples -- Optional, number of values the predicate is sampled at
+tolerance -- Optional, how closely the changes are located
+"""
+class EventTrack:
+    def __init__(self, predicate, start, end, samples=4096, tolerance=1e-9):
+        start, end = float(min(start, end)), float(max(start, end))
+        values = np.linspace(start, end, max(samples, 2))
+        states = np.array([bool(predicate(value)) for value in values])
+        self.initial = bool(states[0])
+        changes = []
+        for index in np.flatnonzero(states[1:] != states[:-1]):
+            low, high = values[index], values[index + 1]
+            while high - low > tolerance:
+                middle = (low + high)/2
+                if bool(predicate(middle)) == states[index]:
+                    low = middle
+                else:
+                    high = middle
+            changes.append(high)
+        self.changes = np.array(changes)
+
+    #The predicate at a value: the state at start, flipped once per change at or below the value.
+    def __call__(self, value):
+        return self.initial ^ bool(np.searchsorted(self.changes, value, side="right") % 2)
+
+"""
+Returns an updater which reads a tracker and applies the values of some tracks at its value to a mobject,
+as apply(mobject, *values). Any function of the tracker's value can stand in for a track. It does nothing on frames where the tracker hasn't moved, such as during waits.
+"""
+def track_updater(tracker, apply, *tracks):
+    last_value = [None]
+    def updater(mobject):
+        value = tracker.get_value()
+        if value == last_value[0]:
+            return
+        last_value[0] = value
+        apply(mobject, *[track(value) for track in tracks])
+    return updater
@@ -0,0 +1,162 @@
+from manim import *
+import numpy as np
+
+from beat_solver import BeatStateSolver
+from prechac import prechac
+from prechac_line import build_updaters, build_windowed_updaters, siteswap_line, windowed_siteswap_line
+from rotating_polygon import draw_siteswap
+from siteswap import array_homotopy, center_only_homotopy, wrap_homotopy, wrap_homotopy_array, wrap_throw
+from siteswap_diagram_mods import diagram, windowed_diagram
+from siteswap_patterns import ORBIT_COLORS, check_siteswap, orbit_colors, pattern_name
+
+"""
+This file contains scenes which draw any juggling pattern, where the scenes in the other files each
+draw one hardcoded pattern. The pattern and the other parameters of each scene are class attributes,
+so the scene for a new pattern is a subclass overriding them, made with pattern_scene.
+"""
+
+"""
+The siteswap on a polygonal clock, as in rotating_polygon.fivethreeone, rotated by rotation_ticks ticks
+to show it is invariant under rotation.
+"""
+class rotation_pattern(Scene):
+    throw_heights = [5, 3, 1]
+    polygon_radius = 1.5
+    loop_radius = 0.5
+    rotation_ticks = 1
+    run_time = 3
+
+    def construct(self):
+        N = len(self.throw_heights)
+        draw_siteswap(self, self.throw_heights, polygon_radius=self.polygon_radius, loop_radius=self.loop_radius)
+        self.wait()
+        self.play(Rotate(self.polygon, -self.rotation_ticks*TAU/N, OUT, self.polygon.get_center()), run_time=self.run_time)
+        self.wait()
+
+"""
+The Prechac transformation of the siteswap on one number line per juggler, as in prechac_line.even_prechac_anim.
+Setting window_margin builds the lines with windowed_siteswap_line.
+Inputs (class attributes):
+jugglers -- number of jugglers, e.g. 3 for a feed
+offsets -- how many lines down each pass goes, as for prechac.prechac
+"""
+class prechac_pattern(Scene):
+    throw_heights = [5, 3, 1, 3]
+    prechac_positions = [0]
+    endpoints = [-14, 10]
+    window_margin = None
+    jugglers = 2
+    offsets = 1
+    run_time = 3
+
+    def construct(self):
+        N = len(self.throw_heights)
+        if self.window_margin != None:
+            lines = windowed_siteswap_line(self, self.throw_heights, self.endpoints, self.prechac_positions,
+                                           margin=self.window_margin, jugglers=self.jugglers, offsets=self.offsets)
+            global_position, period_tracker = build_windowed_updaters(self, self.throw_heights, self.prechac_positions, lines)
+        else:
+            lines, selves_to_change = siteswap_line(self, self.throw_heights, self.endpoints, self.prechac_positions,
+                                                    jugglers=self.jugglers)
+            global_position, period_tracker = build_updaters(self, self.throw_heights, self.prechac_positions,
+                                                             self.endpoints, lines, selves_to_change, self.offsets)
+        passing = prechac(self.throw_heights, self.jugglers, self.prechac_positions, self.offsets)
+        self.play(global_position.animate.set_value(passing.shifts[1]), run_time=self.run_time)
+        self.wait(2)
+        self.play(period_tracker.animate.set_value(-N), run_time=self.run_time)
+        self.wait(3)
+
+"""
+The siteswap drawn on axes and wrapped around its polygonal clock, as in siteswap.siteswap, for any period.
+Inputs (class attributes):
+beats -- number of throws drawn, from beat 1
+colors -- colors of the throws, the throws of ball orbit k get colors[k % len(colors)], see siteswap_patterns.orbit_colors
+"""
+class wrap_pattern(Scene):
+    throw_heights = [5, 3, 1]
+    beats = 9
+    colors = ORBIT_COLORS
+    run_time = 8
+
+    def construct(self):
+        config.frame_height = 12
+        N = len(self.throw_heights)
+        axes = Axes(x_range=(-2, self.beats, 1), axis_config={"include_numbers": True, "include_ticks": True})
+        if N >= 3:
+            vertices = [axes.c2p(np.cos(k*TAU/N), np.sin(k*TAU/N)) for k in range(N)]
+            self.add(Polygon(*vertices, color='#785EF0'))
+        self.add(axes)
+        wrapping_objects = []
+        center_wrapping_objects = []
+        throw_colors = orbit_colors(self.throw_heights, self.colors)
+        for i in range(1, self.beats + 1):
+            color = throw_colors[(i - 1) % N]
+            throw_height = self.throw_heights[(i - 1) % N]
+            if throw_height == 0:
+                continue
+            throw = wrap_throw(i, i + throw_height, axes, color=color)
+            wrapping_objects.append(throw)
+            center_wrapping_objects.append(Dot(color=color).move_to(axes.c2p(i, 0)))
+            center_wrapping_objects.append(Square(0.5, color=color).move_to(axes.c2p(i + throw_height, 0)))
+        homotopies = []
+        for ob in wrapping_objects:
+            self.add(ob)
+            homotopies.append(array_homotopy(mobject=ob, homotopy=lambda points, t: wrap_homotopy_array(points, t, Axes=axes, period=N),
+                                             rate_func=smooth, run_time=self.run_time))
+        for ob in center_wrapping_objects:
+            self.add(ob)
+            homotopies.append(center_only_homotopy(ob, homotopy=lambda x, y, z, t: wrap_homotopy(x, y, z, t, Axes=axes, period=N),
+                                                   rate_func=smooth, run_time=self.run_time))
+        self.wait()
+        self.play(AnimationGroup(*homotopies, lag_ratio=0))
+        self.wait()
+
+"""
+The siteswap on a single number line, as in siteswap_diagram_mods.diagram, sliding one period to the left.
+Setting window_margin builds the line with windowed_diagram.
+"""
+class diagram_pattern(Scene):
+    throw_heights = [5, 3, 1]
+    endpoints = [-15, 15]
+    window_margin = None
+    run_time = 3
+
+    def construct(self):
+        N = len(self.throw_heights)
+        slide_tracker = ValueTracker(0)
+        if self.window_margin != None:
+            line, solver, window = windowed_diagram(self.throw_heights, self.endpoints, [slide_tracker],
+                                                    margin=self.window_margin, reach=max(self.throw_heights) + N)
+        else:
+            line, throws = diagram(self.throw_heights, self.endpoints)
+            solver = BeatStateSolver([line], [slide_tracker])
+            solver.add_throws(throws, 0, [throw.throw_pos for throw in throws], 0, [throw.catch_pos for throw in throws])
+        solver.add_line_shift(0, [1])
+        self.add(line)
+        solver.attach(self)
+        self.wait()
+        self.play(slide_tracker.animate.set_value(-N), run_time=self.run_time, rate_func=linear)
+        self.wait()
+
+PATTERN_SCENES = {"rotation": rotation_pattern, "prechac": prechac_pattern,
+                  "wrap": wrap_pattern, "diagram": diagram_pattern}
+
+"""
+Returns a Scene class drawing a given pattern.
+Inputs:
+kind -- one of the keys of PATTERN_SCENES: "rotation", "prechac", "wrap" or "diagram"
+throw_heights -- list of periodic throw heights in the pattern
+name -- Optional, name of the class, by default the kind and the pattern, e.g. rotation_531
+Further keyword arguments override the other class attributes of the scene, e.g. endpoints=[-20, 20].
+Raises a ValueError if throw_heights is not a valid siteswap or a parameter doesn't exist.
+"""
+def pattern_scene(kind, throw_heights, name=None, **parameters):
+    if kind not in PATTERN_SCENES:
+        raise ValueError(f"Unknown scene {kind!r}, expected one of {', '.join(PATTERN_SCENES)}.")
+    base = PATTERN_SCENES[kind]
+    for parameter in parameters:
+        if not hasattr(base, parameter) or callable(getattr(base, parameter)):
+            raise ValueError(f"{base.__name__} has no parameter {parameter!r}.")
+    check_siteswap(throw_heights)
+    parameters["throw_heights"] = list(throw_heights)
+    return type(name or f"{kind}_{pattern_name(throw_heights)}", (base,), parameters)
@@ -0,0 +1,178 @@
+from collections import OrderedDict
+from typing import NamedTuple
+
+import numpy as np
+
+from siteswap_patterns import canonical_rotations, validate_period
+
+"""
+This file contains the Prechac transformation as a computation, turning solo siteswaps into passing
+patterns without building any scenes. It only depends on NumPy.
+
+In the transformation, k jugglers all juggle the same solo pattern of period N, juggler j running
+j*N/k beats ahead of juggler 0. A throw of height h which juggler j makes to juggler j + d instead
+lands on the same beat of the catcher's pattern when its value is h - d*N/k, since juggler j + d
+reaches that beat d*N/k beats earlier.
+Passes whose value would be negative are made a whole number of periods later, adding multiples of N.
+Results are memoized by the canonical rotation of the pattern, so the rotations of a pattern
+share their results, and large batches of patterns are transformed in vectorized passes.
+"""
+
+"""
+A passing pattern made from a solo pattern by the Prechac transformation. Every field may have extra leading
+batch dimensions, one entry per pattern, as returned by prechac_batch.
+Fields:
+throw_heights -- (N,) array, the solo pattern
+values -- (N,) array of the throw values every juggler makes, passes included
+passes -- (N,) boolean array, whether each throw is a pass
+offsets -- (N,) array, the throw at position i goes from juggler j to juggler (j + offsets[i]) % jugglers
+period_shifts -- (N,) array, number of periods added to each pass to keep its value non negative
+shifts -- (jugglers,) array, number of beats each juggler runs ahead of juggler 0
+jugglers -- number of jugglers
+"""
+class PassingPattern(NamedTuple):
+    throw_heights: np.ndarray
+    values: np.ndarray
+    passes: np.ndarray
+    offsets: np.ndarray
+    period_shifts: np.ndarray
+    shifts: np.ndarray
+    jugglers: int
+
+    #(..., jugglers, N) array of the juggler making each throw of each juggler.
+    def sources(self):
+        return np.broadcast_to(np.arange(self.jugglers)[:, None], self.offsets.shape[:-1] + (self.jugglers, self.offsets.shape[-1]))
+
+    #(..., jugglers, N) array of the juggler catching each throw of each juggler.
+    def targets(self):
+        return (np.arange(self.jugglers)[:, None] + self.offsets[..., None, :]) % self.jugglers
+
+    #Total number of balls juggled by all the jugglers together.
+    def ball_count(self):
+        return self.jugglers*self.values.sum(axis=-1)/self.values.shape[-1]
+
+prechac_cache = OrderedDict()
+prechac_cache_size = 1 << 16
+
+"""
+Empties the memoized results.
+"""
+def clear_prechac_cache():
+    prechac_cache.clear()
+
+"""
+Returns a boolean (M, N) array of the positions to turn into passes, from either a list of positions
+mod N shared by every pattern, or a boolean array with one row per pattern.
+"""
+def position_mask(positions, M, N):
+    positions = np.asarray(positions)
+    if positions.dtype == bool:
+        return np.broadcast_to(positions, (M, N)).copy()
+    mask = np.zeros(N, dtype=bool)
+    mask[positions.astype(int) % N] = True
+    return np.broadcast_to(mask, (M, N)).copy()
+
+"""
+Returns an integer (M, N) array of how many jugglers along each throw goes, from a single number,
+a list with one entry per position when positions is a list, or an array laid out like positions when it is a mask.
+"""
+def offset_array(offsets, positions, M, N):
+    offsets = np.asarray(offsets)
+    positions = np.asarray(positions)
+    if offsets.ndim == 1 and positions.dtype != bool:
+        per_position = np.zeros(N, dtype=int)
+        per_position[positions.astype(int) % N] = offsets
+        return np.broadcast_to(per_position, (M, N)).copy()
+    return np.broadcast_to(offsets, (M, N)).astype(int)
+
+"""
+Transforms the passes of canonical patterns, one pattern per row.
+Returns the (M, N) arrays of throw values and period shifts.
+"""
+def transform_rows(patterns, offsets, jugglers):
+    N = patterns.shape[1]
+    values = patterns - offsets*N/jugglers
+    period_shifts = np.ceil(np.maximum(0, -values)/N).astype(int)
+    return values + period_shifts*N, period_shifts
+
+"""
+Applies the Prechac transformation to a batch of solo patterns sharing a period.
+Inputs:
+patterns -- 2D array of patterns, one per row, or a single pattern
+jugglers -- Optional, number of jugglers
+positions -- Optional, positions mod the period to turn into passes, as a list shared by every pattern
+             or a boolean array with one row per pattern
+offsets -- Optional, how many jugglers along each pass goes, a single number, a list with one entry per position,
+           or when positions is a boolean array, an array laid out like it
+check -- Optional, whether to check the patterns are valid siteswaps
+Returns:
+PassingPattern whose fields have a leading dimension of one entry per pattern.
+Raises a ValueError if a pattern is not a valid siteswap, or a pass would go back to the juggler throwing it.
+"""
+def prechac_batch(patterns, jugglers=2, positions=(0,), offsets=1, check=True):
+    patterns = np.atleast_2d(np.asarray(patterns))
+    M, N = patterns.shape
+    if check:
+        valid = validate_period(patterns)
+        if not np.all(valid):
+            raise ValueError(f"{patterns[~valid][0].tolist()} is not a valid siteswap.")
+    mask = position_mask(positions, M, N)
+    offsets = np.where(mask, offset_array(offsets, positions, M, N) % jugglers, 0)
+    if np.any(mask & (offsets == 0)):
+        raise ValueError(f"Passes need an offset which is not a multiple of the {jugglers} jugglers.")
+    #Rotate every pattern, with its passes, into its canonical rotation, and look the distinct ones up in the cache.
+    rotations = canonical_rotations(patterns)
+    forward = (rotations[:, None] + np.arange(N)) % N
+    rows = np.concatenate([np.take_along_axis(patterns, forward, 1),
+                           np.take_along_axis(offsets, forward, 1)], axis=1).astype(np.int64)
+    unique_rows, inverse = np.unique(rows, axis=0, return_inverse=True)
+    keys = [(jugglers, row.tobytes()) for row in unique_rows]
+    missing = np.array([key not in prechac_cache for key in keys], dtype=bool)
+    if np.any(missing):
+        values, period_shifts = transform_rows(unique_rows[missing, :N], unique_rows[missing, N:], jugglers)
+        for i, k in enumerate(np.flatnonzero(missing)):
+            prechac_cache[keys[k]] = (values[i], period_shifts[i])
+            if len(prechac_cache) > prechac_cache_size:
+                prechac_cache.popitem(last=False)
+    results = []
+    for key in keys:
+        prechac_cache.move_to_end(key)
+        results.append(prechac_cache[key])
+    canonical_values = np.stack([result[0] for result in results])[inverse.ravel()]
+    canonical_shifts = np.stack([result[1] for result in results])[inverse.ravel()]
+    backward = (np.arange(N) - rotations[:, None]) % N
+    return PassingPattern(throw_heights=patterns, values=np.take_along_axis(canonical_values, backward, 1),
+                          passes=mask, offsets=offsets,
+                          period_shifts=np.take_along_axis(canonical_shifts, backward, 1),
+                          shifts=np.arange(jugglers)*N/jugglers, jugglers=jugglers)
+
+"""
+Applies the Prechac transformation to a single solo pattern. Takes the same inputs as prechac_batch,
+for one pattern given as a list of throw heights.
+Returns:
+PassingPattern of the pattern.
+"""
+def prechac(throw_heights, jugglers=2, positions=(0,), offsets=1, check=True):
+    batch = prechac_batch([throw_heights], jugglers, positions, offsets, check)
+    return PassingPattern(*[field[0] for field in batch[:5]], shifts=batch.shifts, jugglers=jugglers)
+
+"""
+Applies the Prechac transformation to patterns of any periods, grouping them by period
+so that each period is transformed in one vectorized pass.
+Inputs:
+patterns -- iterable of lists of throw heights
+jugglers, offsets, check -- as for prechac_batch
+positions -- Optional, list of positions shared by every pattern, taken mod each pattern's period
+Returns:
+List of PassingPatterns, in the order the patterns were given.
+"""
+def prechac_all(patterns, jugglers=2, positions=(0,), offsets=1, check=True):
+    patterns = [np.asarray(pattern) for pattern in patterns]
+    periods = np.array([len(pattern) for pattern in patterns])
+    results = [None]*len(patterns)
+    for N in np.unique(periods):
+        indices = np.flatnonzero(periods == N)
+        batch = prechac_batch(np.stack([patterns[i] for i in indices]), jugglers, positions, offsets, check)
+        for row, i in enumerate(indices):
+            results[i] = PassingPattern(*[field[row] for field in batch[:5]], shifts=batch.shifts, jugglers=jugglers)
+    return results
@@ -2,8 +2,53 @@ from unicodedata import decimal
 from manim import *
 import numpy as np
 
+from beat_solver import BeatStateSolver
+from beat_window import BeatWindow, window_line
+from glyph_cache import cached_decimal, cached_text
+from prechac import prechac
+from siteswap_patterns import check_siteswap, orbit_colors
+from throw_arc import ThrowArc
+
+PASS_COLORS = [BLUE, ORANGE, GREEN, PURPLE, YELLOW, TEAL]
+
+"""
+Returns 1 if the throws and labels of a line of a prechac diagram go above it, -1 if they go below it.
+Every line but the bottom one has them above, so for two jugglers the top line's are above and the bottom line's below.
+"""
+def line_side(line_index, jugglers):
+    return 1 if line_index < jugglers - 1 else -1
+
+"""
+Returns how the passes of a prechac diagram of any number of jugglers follow the trackers
+(global_position, period_tracker) of build_updaters. Line j slides by (jugglers - 1 - j)*global_position,
+so with global_position at N/jugglers, prechac's shift between neighbouring jugglers, each line runs
+N/jugglers beats ahead of the line above it, as juggler j runs j*N/jugglers beats ahead of juggler 0 in prechac.py.
+A pass from line i to line c then reads h + (i - c)*global_position + m*period_tracker, where m makes it read
+the pass value of prechac.prechac with period_tracker at -N. For two jugglers and passes with h >= N/2, m is 1
+for the passes thrown from the bottom line and 0 for the top line. A pass with h < N/2 needs a period more to
+stay non negative (prechac's period_shifts), so its m is one less, e.g. -1 for a pass thrown from the top line.
+Inputs:
+throw_heights - list of periodic throw heights in the pattern
+prechac_positions - list of positions mod the period to turn into passes
+jugglers - number of jugglers, one line each
+offsets - how many lines down each pass goes, wrapping around to the top, as for prechac.prechac
+Returns:
+catch_lines -- (jugglers, N) array of the line catching the throw at each position of each line
+catch_coefficients -- (jugglers, N, 2) array of how far each catch moves per unit of each tracker, on its line
+label_coefficients -- (jugglers, N, 2) array of how much each label changes per unit of each tracker
+"""
+def pass_coefficients(throw_heights, prechac_positions, jugglers=2, offsets=1):
+    passing = prechac(throw_heights, jugglers, prechac_positions, offsets)
+    throw_lines = np.arange(jugglers)[:, None]
+    catch_lines = passing.targets()
+    wraps = (throw_lines + passing.offsets >= jugglers).astype(int)
+    period_multipliers = np.where(passing.passes, wraps - passing.period_shifts, 0)
+    catch_coefficients = np.stack([np.zeros(catch_lines.shape), period_multipliers], axis=-1)
+    label_coefficients = np.stack([throw_lines - catch_lines, period_multipliers], axis=-1)
+    return catch_lines, catch_coefficients, label_coefficients
+
 """
-Returns a pair of NumberLines depicting two jugglers juggling the same pattern in sync,
+Returns stacked NumberLines depicting jugglers juggling the same pattern in sync, one line each,
 in addition to a specified collection of throws to alter into a prechac pattern.
 Inputs:
 scene - A Scene object to render to
@@ -11,171 +56,299 @@ throw_heights - list of periodic throw heights in the pattern
 endpoints - list of integers of length 2, start and end beats of diagram
 prechac_positions - list of positions mod the period to turn into passes
 show_hands -- boolean, whether the hands are labeled or not
-line_spacing -- How far apart are the lines from each other vertically
+line_spacing -- How far apart are the lines from each other vertically, by default 24/jugglers
+colors -- Optional, list of colors, the throws of ball orbit k get colors[k % len(colors)], see
+          siteswap_patterns.orbit_colors. By default the throws are white.
+jugglers -- Optional, number of jugglers, 2 by default
 Returns:
 lines -- A list of NumberLine objects containing throws and throw height labels of the jugglign patterns
-selves_to_change -- A list of selves as CurvedArrows to change into passes
+selves_to_change -- A list with one list per line of selves as ThrowArcs to change into passes
+Raises a ValueError if throw_heights is not a valid siteswap.
 """
-def siteswap_line(scene, throw_heights, endpoints, prechac_positions=[], show_hands=True, line_spacing=12):
+def siteswap_line(scene, throw_heights, endpoints, prechac_positions=[], show_hands=True, line_spacing=None, colors=None,
+                  jugglers=2):
+    check_siteswap(throw_heights)
     N = len(throw_heights)
-    top_line = NumberLine(x_range = [endpoints[0], endpoints[1]], tick_size=0.2)
-    top_line.position = 0
-    bottom_line = NumberLine(x_range = [endpoints[0], endpoints[1]], tick_size=0.2)
-    bottom_line.position = 0
-    lines = VGroup(top_line, bottom_line).arrange(line_spacing*DOWN)
-    for k in range(2):
+    throw_colors = orbit_colors(throw_heights, colors) if colors != None else [WHITE]*N
+    if line_spacing == None:
+        line_spacing = 24/jugglers
+    lines = VGroup(*[NumberLine(x_range = [endpoints[0], endpoints[1]], tick_size=0.2)
+                     for k in range(jugglers)]).arrange(line_spacing*DOWN)
+    for k, line in enumerate(lines):
         label_dict = {}
         for i in range(endpoints[0], endpoints[1] + 1):
-            label_dict[i] = DecimalNumber(throw_heights[i%N], 0, edge_to_fix=ORIGIN)
-        if k == 0:
-            top_line.add_labels(label_dict, direction=UP, font_size=70)
-        else:
-            bottom_line.add_labels(label_dict, direction=DOWN, font_size=70)
+            label_dict[i] = cached_decimal(throw_heights[i%N], 0, edge_to_fix=ORIGIN)
+        line.add_labels(label_dict, direction=line_side(k, jugglers)*UP, font_size=70)
     if show_hands:
         hand_values = ["R", "L"]
-        for i in range(2):
+        for k, line in enumerate(lines):
             for j in range(endpoints[0], endpoints[1] + 1):
-                label = lines[i].labels[j - endpoints[0]]
-                if i == 0:
-                    hand = Text(hand_values[j % 2]).next_to(label, UP)
-                    lines[0].add(hand)
-                else:
-                    hand = Text(hand_values[j % 2]).next_to(label, DOWN)
-                    lines[1].add(hand)
-    selves_to_change = [[], []]
+                label = line.labels[j - endpoints[0]]
+                line.add(cached_text(hand_values[j % 2]).next_to(label, line_side(k, jugglers)*UP))
+    selves_to_change = [[] for k in range(jugglers)]
     for i in range(endpoints[0], endpoints[1] + 1):
         throw = throw_heights[i % N]
         catch = i + throw
-        bottom_arrow = CurvedArrow(bottom_line.n2p(i), bottom_line.n2p(catch), angle=-PI/1.5)
-        top_arrow = CurvedArrow(top_line.n2p(i), top_line.n2p(catch), angle=PI/1.5)
-        bottom_arrow.throw_pos = i
-        bottom_arrow.catch_pos = catch
-        top_arrow.throw_pos = i
-        top_arrow.catch_pos = catch
-        if i % N in prechac_positions:
-            selves_to_change[0].append(top_arrow)
-            selves_to_change[1].append(bottom_arrow)
-        else:
-            top_line.add(top_arrow)
-            bottom_line.add(bottom_arrow)
-
-    
+        for k, line in enumerate(lines):
+            arrow = ThrowArc(line.n2p(i), line.n2p(catch), angle=line_side(k, jugglers)*PI/1.5, color=throw_colors[i % N])
+            arrow.throw_pos = i
+            arrow.catch_pos = catch
+            if i % N in prechac_positions:
+                selves_to_change[k].append(arrow)
+            else:
+                line.add(arrow)
     return lines, selves_to_change
-    
+
 """
 Performs an animation turning a collection of selves into passes, and generates the corresponding updaters to use for Prechac-like Transformations.
+The passes and changing labels of every line are moved by one BeatStateSolver, which only reshapes the passes
+whose span overlaps the frame, so the cost of a frame grows with the visible throws rather than with the number of lines.
 Inputs:
 scene - A Scene object to render to
 throw_heights - list of periodic throw heights in the pattern
 endpoints - list of length 2, start and end of diagram
 prechac_positions - list of positions mod the period to turn into passes
-lines - list of 
+lines - list of NumberLines from siteswap_line, one per juggler
+selves_to_change - list of lists of selves from siteswap_line, one per line
+offsets - Optional, how many lines down each pass goes, as for prechac.prechac
 Returns:
-global_position -- ValueTracker which when modified appropriately translates one of the siteswap lines and the self throws, stretching the passes.
+global_position -- ValueTracker which when modified appropriately translates the siteswap lines and the self throws, stretching the passes.
 period_tracker -- ValueTracker which when modified translates the endpoints of the passes only. In a Prechac transformation they are translated by the period, the length of throw_heights.
 """
-def build_updaters(scene, throw_heights, prechac_positions, endpoints, lines, selves_to_change):
+def build_updaters(scene, throw_heights, prechac_positions, endpoints, lines, selves_to_change, offsets=1):
     N = len(throw_heights)
-    passes = [[], []]
-    top_line = lines[0]
-    bottom_line = lines[1]
+    jugglers = len(lines)
+    passes = [[] for i in range(jugglers)]
     scene.add(lines)
-    for i in range(2):
+    for i in range(jugglers):
         for throw in selves_to_change[i]:
             scene.add(throw)
-    period_shifting_line = 1
     global_position = ValueTracker(0)
     period_tracker = ValueTracker(0)
-    def pass_updater(arrow : Arrow):
-        if arrow.throw_line == period_shifting_line:
-            period_multiplier = 1
-        else:
-            period_multiplier = 0
-        updated_catch = arrow.catch_pos + period_multiplier*period_tracker.get_value()
-        arrow.put_start_and_end_on(lines[arrow.throw_line].n2p(arrow.throw_pos), 
-                                    lines[arrow.catch_line].n2p(updated_catch))
-
-    pass_colors = [BLUE, ORANGE]
-    for i in range(2):
+    targets, catch_coefficients, label_coefficients = pass_coefficients(throw_heights, prechac_positions, jugglers, offsets)
+    for i in range(jugglers):
         for throw in selves_to_change[i]:
-            new_pass = Arrow(lines.submobjects[i].n2p(throw.throw_pos), 
-                                lines.submobjects[1 - i].n2p(throw.catch_pos), color=pass_colors[i])
+            catch_line = targets[i][throw.throw_pos % N]
+            new_pass = ThrowArc(lines.submobjects[i].n2p(throw.throw_pos),
+                                lines.submobjects[catch_line].n2p(throw.catch_pos), angle=0, buff=MED_SMALL_BUFF,
+                                max_tip_length_to_length_ratio=0.25, color=PASS_COLORS[i % len(PASS_COLORS)])
             new_pass.throw_pos = throw.throw_pos
             new_pass.catch_pos = throw.catch_pos
             new_pass.throw_line = i
-            new_pass.catch_line = 1-i
-            new_pass.add_updater(pass_updater)
+            new_pass.catch_line = catch_line
             passes[i].append(new_pass)
-    
-    
-    def translation_updater(mob):
-        mob.shift((global_position.get_value() - mob.position)*RIGHT)
-        mob.position = global_position.get_value()
+
 
     self_to_pass_transforms = []
-    for i in range(2):
+    for i in range(jugglers):
         for j in range(len(passes[i])):
-            self_to_pass_transforms.append(Transform(selves_to_change[i][j], passes[i][j], 
+            self_to_pass_transforms.append(Transform(selves_to_change[i][j], passes[i][j],
                                             replace_mobject_with_target_in_scene=True))
-        
+
     scene.wait(2)
-    for i in range(2):
+    for i in range(jugglers):
         for j in range(endpoints[0], endpoints[1] + 1):
             if j % N in prechac_positions:
-                lines[i].labels[j - endpoints[0]].set(color=pass_colors[i])
+                lines[i].labels[j - endpoints[0]].set(color=PASS_COLORS[i % len(PASS_COLORS)])
     self_to_pass_animations = AnimationGroup(*self_to_pass_transforms, run_time=3)
     scene.play(self_to_pass_animations)
     scene.wait(2)
 
-    def label_updater(mob : DecimalNumber, base_throw, sign, period_multiplier):
-        mob.set_value(base_throw + sign*(global_position.get_value()) + period_multiplier*period_tracker.get_value())
-
-    
-    for i in range(2):
+    #All passes and changing labels are moved by one solver, with trackers (global_position, period_tracker),
+    #as described in pass_coefficients. With global_position at the shift between neighbouring jugglers and
+    #period_tracker at -N, the labels read the pass values of prechac.prechac.
+    solver = BeatStateSolver(lines, [global_position, period_tracker])
+    solver.visible_width = config.frame_width + 2
+    for i in range(jugglers):
+        solver.add_line_shift(i, [jugglers - 1 - i, 0])
+    for i in range(jugglers):
+        solver.add_throws(passes[i], i, [arrow.throw_pos for arrow in passes[i]], [arrow.catch_line for arrow in passes[i]],
+                          [arrow.catch_pos for arrow in passes[i]],
+                          [catch_coefficients[i][arrow.throw_pos % N] for arrow in passes[i]])
+    for i in range(jugglers):
+        labels = []
+        base_throws = []
+        coefficients = []
         for j in range(endpoints[0], endpoints[1] + 1):
             if (j % N) in prechac_positions:
                 label = lines[i].labels[j - endpoints[0]]
                 label.set(num_decimal_places=1)
-                base_throw = throw_heights[j%N]
-                if i == 0:
-                    label.add_updater(lambda mob : label_updater(mob, base_throw, -1, 0))
-                else:
-                    label.add_updater(lambda mob : label_updater(mob, base_throw, 1, 1))
-    
-    lines[0].add_updater(translation_updater)
+                labels.append(label)
+                base_throws.append(throw_heights[j%N])
+                coefficients.append(label_coefficients[i][j % N])
+        solver.add_labels(labels, base_throws, np.reshape(coefficients, (len(labels), 2)))
+    solver.attach(scene)
+    return global_position, period_tracker
+
+"""
+Returns the beat_spec of a BeatWindow on one of the lines of a prechac diagram, see beat_window.py.
+Inputs:
+throw_heights - list of periodic throw heights in the pattern
+prechac_positions - list of positions mod the period to turn into passes
+line_index - index of the line, from 0 for the top line
+colored - boolean, whether the labels of the prechac positions take the color of the passes
+passes - boolean, whether the throws at the prechac positions are passes, following the trackers
+         (global_position, period_tracker) as in build_updaters, or still selves
+show_hands -- boolean, whether the hands are labeled or not
+jugglers -- Optional, number of lines
+offsets -- Optional, how many lines down each pass goes, as for prechac.prechac
+"""
+def prechac_beat_spec(throw_heights, prechac_positions, line_index, colored=False, passes=False, show_hands=True,
+                      jugglers=2, offsets=1):
+    N = len(throw_heights)
+    pass_color = PASS_COLORS[line_index % len(PASS_COLORS)]
+    side = line_side(line_index, jugglers)
+    targets, catch_coefficients, label_coefficients = pass_coefficients(throw_heights, prechac_positions, jugglers, offsets)
+    def beat_spec(beat):
+        throw = throw_heights[beat % N]
+        spec = {"catch_position": beat + throw, "angle": side*PI/1.5,
+                "label_value": throw, "label_direction": side*UP}
+        if show_hands:
+            spec["hand"] = ["R", "L"][beat % 2]
+        if beat % N in prechac_positions:
+            if colored or passes:
+                spec["label_color"] = pass_color
+            if passes:
+                spec.update(catch_line=targets[line_index][beat % N],
+                            catch_coefficients=catch_coefficients[line_index][beat % N], angle=0,
+                            buff=MED_SMALL_BUFF, max_tip_length_to_length_ratio=0.25, color=pass_color,
+                            num_decimal_places=1, label_coefficients=label_coefficients[line_index][beat % N])
+        return spec
+    return beat_spec
+
+"""
+A windowed version of siteswap_line, which only builds the beats near the frame and recycles them
+as the lines slide, so its cost doesn't grow with the range of endpoints.
+The trackers are made here rather than in build_windowed_updaters, since the solver places the beats from the start.
+Inputs:
+scene - A Scene object to render to
+throw_heights - list of periodic throw heights in the pattern
+endpoints - list of integers of length 2, start and end beats of diagram
+prechac_positions - list of positions mod the period to turn into passes
+show_hands -- boolean, whether the hands are labeled or not
+line_spacing -- How far apart are the lines from each other vertically, by default 24/jugglers
+margin -- distance beyond the edge of the frame whose beats are still built
+reach -- Optional, number of beats built beyond the frame on either side. By default enough
+         for the longest throw and a slide and period shift of a whole period.
+jugglers -- Optional, number of jugglers, 2 by default
+offsets -- Optional, how many lines down each pass goes, as for prechac.prechac
+Returns:
+lines -- A VGroup of the NumberLines, with the solver moving them as lines.solver and their BeatWindows as lines.windows
+Raises a ValueError if throw_heights is not a valid siteswap.
+"""
+def windowed_siteswap_line(scene, throw_heights, endpoints, prechac_positions=[], show_hands=True, line_spacing=None,
+                           margin=1, reach=None, jugglers=2, offsets=1):
+    check_siteswap(throw_heights)
+    N = len(throw_heights)
+    if reach is None:
+        reach = max(throw_heights) + 2*N
+    if line_spacing == None:
+        line_spacing = 24/jugglers
+    lines = VGroup(*[window_line(endpoints, reach, margin, tick_size=0.2) for i in range(jugglers)]).arrange(line_spacing*DOWN)
+    for line in lines:
+        line.shift(-line.n2p(line.window_center)[0]*RIGHT)
+    global_position = ValueTracker(0)
+    period_tracker = ValueTracker(0)
+    solver = BeatStateSolver(lines, [global_position, period_tracker])
+    solver.visible_width = config.frame_width + 2
+    for i in range(jugglers):
+        solver.add_line_shift(i, [jugglers - 1 - i, 0])
+    lines.solver = solver
+    lines.offsets = offsets
+    lines.windows = [BeatWindow(solver, i, endpoints,
+                                prechac_beat_spec(throw_heights, prechac_positions, i, show_hands=show_hands,
+                                                  jugglers=jugglers, offsets=offsets),
+                                reach, margin) for i in range(jugglers)]
+    solver.update()
+    return lines
+
+"""
+The windowed version of build_updaters, for lines from windowed_siteswap_line. Only the selves on screen
+are animated into passes; beats entering the window later are built as passes straight away.
+Inputs:
+scene - A Scene object to render to
+throw_heights - list of periodic throw heights in the pattern
+prechac_positions - list of positions mod the period to turn into passes
+lines - lines returned by windowed_siteswap_line
+show_hands -- boolean, whether the hands are labeled or not
+Returns:
+global_position, period_tracker -- as for build_updaters
+"""
+def build_windowed_updaters(scene, throw_heights, prechac_positions, lines, show_hands=True):
+    N = len(throw_heights)
+    jugglers = len(lines.windows)
+    solver = lines.solver
+    global_position, period_tracker = solver.trackers
+    targets = pass_coefficients(throw_heights, prechac_positions, jugglers, lines.offsets)[0]
+    scene.add(lines)
+    scene.wait(2)
+    for i, window in enumerate(lines.windows):
+        window.beat_spec = prechac_beat_spec(throw_heights, prechac_positions, i, colored=True, show_hands=show_hands,
+                                             jugglers=jugglers, offsets=lines.offsets)
+        window.rebuild()
+    solver.update()
+    self_to_pass_transforms = []
+    for i, window in enumerate(lines.windows):
+        for beat, slot in window.slots.items():
+            if beat % N in prechac_positions:
+                new_pass = ThrowArc(lines[i].n2p(beat), lines[targets[i][beat % N]].n2p(beat + throw_heights[beat % N]), angle=0,
+                                    buff=MED_SMALL_BUFF, max_tip_length_to_length_ratio=0.25,
+                                    color=PASS_COLORS[i % len(PASS_COLORS)])
+                self_to_pass_transforms.append(Transform(slot.arc, new_pass))
+    scene.play(AnimationGroup(*self_to_pass_transforms, run_time=3))
+    for i, window in enumerate(lines.windows):
+        window.beat_spec = prechac_beat_spec(throw_heights, prechac_positions, i, passes=True, show_hands=show_hands,
+                                             jugglers=jugglers, offsets=lines.offsets)
+        window.rebuild()
+    scene.wait(2)
+    solver.attach(scene)
     return global_position, period_tracker
 
 """
 A scene that uses the preceding methods to explore Prechac-like transformations on an even period patten, 5313.
+Setting window_margin builds the lines with windowed_siteswap_line instead.
 """
 class even_prechac_anim(Scene):
+    window_margin = None
+
     def construct(self):
         throw_heights = [5, 3, 1, 3]
         N = len(throw_heights)
         prechac_positions = [0]
         endpoints = [-14, 10]
-        lines, selves_to_change = siteswap_line(self, throw_heights, endpoints, prechac_positions)
-        global_position, period_tracker = build_updaters(self, throw_heights, prechac_positions, endpoints, lines, selves_to_change)
+        if self.window_margin != None:
+            lines = windowed_siteswap_line(self, throw_heights, endpoints, prechac_positions, margin=self.window_margin)
+            global_position, period_tracker = build_windowed_updaters(self, throw_heights, prechac_positions, lines)
+        else:
+            lines, selves_to_change = siteswap_line(self, throw_heights, endpoints, prechac_positions)
+            global_position, period_tracker = build_updaters(self, throw_heights, prechac_positions, endpoints, lines, selves_to_change)
 
         self.wait(2)
-        self.play(global_position.animate.set_value(N/2), run_time=3)
+        self.play(global_position.animate.set_value(prechac(throw_heights, 2, prechac_positions).shifts[1]), run_time=3)
         self.wait(2)
         self.play(period_tracker.animate.set_value(-N), run_time = 3)
         self.wait(3)
         
 """
 A Scene that uses the previous methods to animate the Prechac transformation on an odd period pattern, 423. 
+Setting window_margin builds the lines with windowed_siteswap_line instead.
 """
 class odd_prechac_anim(Scene):
+    window_margin = None
+
     def construct(self):
         throw_heights = [4, 2, 3]
         N = len(throw_heights)
         prechac_positions = [0]
         endpoints = [-12, 10]
-        lines, selves_to_change = siteswap_line(self, throw_heights, endpoints, prechac_positions)
-        global_position, period_tracker = build_updaters(self, throw_heights, prechac_positions, endpoints, lines, selves_to_change)
+        if self.window_margin != None:
+            lines = windowed_siteswap_line(self, throw_heights, endpoints, prechac_positions, margin=self.window_margin)
+            global_position, period_tracker = build_windowed_updaters(self, throw_heights, prechac_positions, lines)
+        else:
+            lines, selves_to_change = siteswap_line(self, throw_heights, endpoints, prechac_positions)
+            global_position, period_tracker = build_updaters(self, throw_heights, prechac_positions, endpoints, lines, selves_to_change)
 
-        self.play(global_position.animate.set_value(N/2), run_time=3)
+        self.play(global_position.animate.set_value(prechac(throw_heights, 2, prechac_positions).shifts[1]), run_time=3)
         self.wait(2)
         self.play(period_tracker.animate.set_value(-N), run_time = 3)
         self.wait(3)
\ No newline at end of file
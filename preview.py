@@ -0,0 +1,557 @@
+import argparse
+import subprocess
+import sys
+import time
+import zlib
+from collections import deque
+
+import numpy as np
+
+from siteswap_patterns import check_siteswap, orbit_colors, parse_pattern
+
+"""
+This file contains a lightweight preview renderer for the polygon clock and number line diagrams.
+It draws the primitives those scenes are made of: polygons, curved arrows between vertices, the loops
+of get_loop, straight arrows, number lines, dots and number labels, straight into NumPy arrays with
+anti-aliased edges, without going through manim or Cairo. The labels are drawn as seven segment digits.
+The geometry follows the scenes' own: the clock of rotation_scene, CurvedArrow with angle -TAU/4,
+get_loop and NumberLine, in manim's frame coordinates, so a preview lines up with the rendered scene.
+Frames are RGBA uint8 arrays like manim's, which can be piped to ffmpeg or tiled into a thumbnail grid.
+It only depends on NumPy, and ffmpeg for writing videos.
+Usage:
+python preview.py --scene rotating_polygon.sixfourfiveone --output 6451.mp4
+python preview.py 531 6451 97531 --grid thumbnails.png
+"""
+
+PREVIEW_FRAME_HEIGHT = 8.0
+PREVIEW_STROKE_WIDTH = 4
+PREVIEW_TIP_LENGTH = 0.35
+PREVIEW_DOT_RADIUS = 0.08
+PREVIEW_LABEL_HEIGHT = 0.35
+PREVIEW_PIECE_LENGTH = 6
+PREVIEW_COLORS = {"background": "#000000", "polygon": "#58C4DD", "arc": "#FFFFFF", "loop": "#FFFFFF",
+                  "label": "#FFFFFF", "line": "#FFFFFF"}
+
+#The seven segments of a digit 0.5 wide and 1 high, centered on the origin, as (start, end) pairs.
+SEVEN_SEGMENTS = {"a": [(-0.25, 0.5), (0.25, 0.5)], "b": [(0.25, 0.5), (0.25, 0)], "c": [(0.25, 0), (0.25, -0.5)],
+                  "d": [(0.25, -0.5), (-0.25, -0.5)], "e": [(-0.25, -0.5), (-0.25, 0)], "f": [(-0.25, 0), (-0.25, 0.5)],
+                  "g": [(-0.25, 0), (0.25, 0)]}
+DIGIT_SEGMENTS = {"0": "abcdef", "1": "bc", "2": "abged", "3": "abgcd", "4": "fgbc", "5": "afgcd",
+                  "6": "afgedc", "7": "abc", "8": "abcdefg", "9": "abcdfg", "-": "g"}
+#(segments, 2, 2) array of the segments of each character.
+DIGIT_ARRAYS = {character: np.array([SEVEN_SEGMENTS[segment] for segment in segments], dtype=float)
+                for character, segments in DIGIT_SEGMENTS.items()}
+
+"""
+Returns a color, given as a hex string like "#58C4DD" or a tuple of red, green and blue between 0 and 1,
+as an opaque RGBA float array of values between 0 and 255.
+"""
+def color_array(color):
+    if isinstance(color, str):
+        color = color.lstrip("#")
+        return np.array([int(color[i:i + 2], 16) for i in (0, 2, 4)] + [255], dtype=np.float32)
+    return np.append(255*np.asarray(color, dtype=np.float32)[:3], np.float32(255))
+
+"""
+The rate function of manim's smooth, which Rotate and .animate use by default.
+"""
+def smooth(t, inflection=10.0):
+    error = 1/(1 + np.exp(inflection/2))
+    return np.clip((1/(1 + np.exp(-inflection*(t - 0.5))) - error)/(1 - 2*error), 0, 1)
+
+"""
+A frame being drawn, in manim's frame coordinates: the origin at the center and frame_height units
+from the bottom to the top. Shapes are blended into a float image, and frame returns it as RGBA pixels.
+Inputs:
+pixel_width, pixel_height -- Optional, size of the frame in pixels
+frame_height -- Optional, height of the frame in manim units
+background -- Optional, background color
+"""
+class PreviewCanvas:
+    def __init__(self, pixel_width=480, pixel_height=270, frame_height=PREVIEW_FRAME_HEIGHT,
+                 background=PREVIEW_COLORS["background"]):
+        self.pixel_width = pixel_width
+        self.pixel_height = pixel_height
+        self.frame_height = frame_height
+        self.frame_width = frame_height*pixel_width/pixel_height
+        self.scale = pixel_height/frame_height
+        #Colors are kept half a unit up, so that truncating the image to integers rounds it.
+        self.background = np.empty((pixel_height, pixel_width, 4), dtype=np.float32)
+        self.background[:] = color_array(background) + 0.5
+        self.image = self.background.copy()
+
+    #Fills the frame with the background color.
+    def clear(self):
+        np.copyto(self.image, self.background)
+        return self
+
+    #Returns the frame as an (pixel_height, pixel_width, 4) uint8 RGBA array.
+    def frame(self):
+        return self.image.astype(np.uint8)
+
+    #Returns points in frame coordinates as pixel coordinates, x to the right and y down from the top left corner.
+    def to_pixels(self, points):
+        points = np.asarray(points, dtype=float)
+        return np.stack([(points[..., 0] + self.frame_width/2)*self.scale,
+                         (self.frame_height/2 - points[..., 1])*self.scale], axis=-1)
+
+    #Returns the pixels between two corners in pixel coordinates, cropped to the frame, as a pair of slices
+    #and the x and y coordinates of the pixel centers, or None if none of them are in the frame.
+    def region(self, low, high):
+        left, top = max(int(np.floor(low[0])), 0), max(int(np.floor(low[1])), 0)
+        right, bottom = min(int(np.ceil(high[0])) + 1, self.pixel_width), min(int(np.ceil(high[1])) + 1, self.pixel_height)
+        if left >= right or top >= bottom:
+            return None
+        return (slice(top, bottom), slice(left, right)), np.arange(left, right) + 0.5, (np.arange(top, bottom) + 0.5)[:, None]
+
+    #Blends a color over a region of the frame, given the fraction of each of its pixels covered.
+    #Only the covered pixels are touched, as thin shapes cover little of their bounding box.
+    def blend(self, slices, coverage, color, opacity=1):
+        target = self.image[slices]
+        covered = coverage > 0
+        pixels = target[covered]
+        target[covered] = pixels + (opacity*coverage[covered])[:, None]*(color_array(color) + 0.5 - pixels)
+
+    #Draws line segments from starts to ends, given as (K, 2) or (K, 3) arrays, as one shape,
+    #so that where they overlap the color is only blended once. The width is a manim stroke width.
+    #The segments are cut into pieces of at most PREVIEW_PIECE_LENGTH pixels, so that every piece fits
+    #in a square patch of the same size and all of them are measured in one NumPy pass.
+    def segments(self, starts, ends, color, width=PREVIEW_STROKE_WIDTH, opacity=1):
+        starts, ends = self.to_pixels(starts).reshape(-1, 2), self.to_pixels(ends).reshape(-1, 2)
+        half_width = width*0.01*self.scale/2
+        reach = half_width + 1
+        pieces = np.maximum(np.ceil(np.hypot(*(ends - starts).T)/PREVIEW_PIECE_LENGTH), 1).astype(int)
+        owners = np.repeat(np.arange(len(starts)), pieces)
+        fractions = (np.arange(len(owners)) - np.repeat(np.cumsum(pieces) - pieces, pieces))/pieces[owners]
+        chords = (ends - starts)[owners]
+        p = (starts[owners] + fractions[:, None]*chords).astype(np.float32)
+        direction = (chords/pieces[owners][:, None]).astype(np.float32)
+        corners = np.floor(np.minimum(p, p + direction) - reach).astype(int)
+        size = int(np.ceil(PREVIEW_PIECE_LENGTH + 2*reach)) + 1
+        visible = ((corners[:, 0] + size > 0) & (corners[:, 1] + size > 0)
+                   & (corners[:, 0] < self.pixel_width) & (corners[:, 1] < self.pixel_height))
+        if not np.any(visible):
+            return self
+        p, direction, corners = p[visible], direction[visible], corners[visible]
+        xs = corners[:, 0, None] + np.arange(size)
+        ys = corners[:, 1, None] + np.arange(size)
+        dx = (xs + np.float32(0.5) - p[:, 0, None])[:, None, :]
+        dy = (ys + np.float32(0.5) - p[:, 1, None])[:, :, None]
+        length2 = np.einsum("ij,ij->i", direction, direction)
+        length2 = np.where(length2 > 0, length2, 1)[:, None, None]
+        t = np.clip((dx*direction[:, 0, None, None] + dy*direction[:, 1, None, None])/length2, 0, 1)
+        distance = np.hypot(dx - t*direction[:, 0, None, None], dy - t*direction[:, 1, None, None])
+        #Thin lines cover at most their width of a pixel.
+        coverage = np.clip(np.float32(half_width + 0.5) - distance, 0, min(1, 2*half_width))
+        covered = ((coverage > 0) & ((xs >= 0) & (xs < self.pixel_width))[:, None, :]
+                   & ((ys >= 0) & (ys < self.pixel_height))[:, :, None])
+        rows = np.broadcast_to(ys[:, :, None], coverage.shape)[covered]
+        columns = np.broadcast_to(xs[:, None, :], coverage.shape)[covered]
+        if len(rows) == 0:
+            return self
+        top, bottom, left, right = rows.min(), rows.max() + 1, columns.min(), columns.max() + 1
+        region = np.zeros((bottom - top, right - left), dtype=np.float32)
+        np.maximum.at(region, (rows - top, columns - left), coverage[covered])
+        self.blend((slice(top, bottom), slice(left, right)), region, color, opacity)
+        return self
+
+    #Draws a polyline through an (M, 2) or (M, 3) array of points, closed back to its first point if closed is True.
+    def stroke(self, points, color, width=PREVIEW_STROKE_WIDTH, opacity=1, closed=False):
+        points = np.asarray(points, dtype=float)
+        if closed:
+            points = np.concatenate([points, points[:1]])
+        return self.segments(points[:-1], points[1:], color, width, opacity)
+
+    #Fills a convex polygon with the given vertices.
+    def fill(self, points, color, opacity=1):
+        pixels = self.to_pixels(points).reshape(-1, 2)
+        found = self.region(pixels.min(axis=0) - 1, pixels.max(axis=0) + 1)
+        if found is None:
+            return self
+        slices, xs, ys = found
+        following = np.roll(pixels, -1, axis=0)
+        orientation = np.sign(np.sum(pixels[:, 0]*following[:, 1] - following[:, 0]*pixels[:, 1])) or 1
+        #Signed distance to the nearest edge, positive inside.
+        inside = np.full((len(ys), len(xs)), np.inf, dtype=np.float32)
+        for p, q in zip(pixels, following):
+            edge = q - p
+            length = np.hypot(*edge)
+            if length > 0:
+                np.minimum(inside, orientation*(edge[0]*(ys - p[1]) - edge[1]*(xs - p[0]))/length, out=inside)
+        self.blend(slices, np.clip(inside + 0.5, 0, 1), color, opacity)
+        return self
+
+    #Draws a filled circle.
+    def dot(self, center, color, radius=PREVIEW_DOT_RADIUS, opacity=1):
+        center = self.to_pixels(center)
+        pixel_radius = radius*self.scale
+        found = self.region(center - pixel_radius - 1, center + pixel_radius + 1)
+        if found is None:
+            return self
+        slices, xs, ys = found
+        self.blend(slices, np.clip(pixel_radius + 0.5 - np.hypot(xs - center[0], ys - center[1]), 0, 1), color, opacity)
+        return self
+
+"""
+Returns the vertices of a polygon clock as rotation_scene draws them: vertex 0 points north
+and the indices increase clockwise, before the clock is turned counterclockwise by angle.
+Returns:
+(N, 2) array of vertices
+"""
+def clock_vertices(N, radius=1.5, angle=0, center=(0, 0)):
+    angles = np.pi/2 - 2*np.pi*np.arange(N)/N + angle
+    return np.asarray(center, dtype=float)[:2] + radius*np.column_stack([np.cos(angles), np.sin(angles)])
+
+"""
+Returns points along circular arcs between pairs of points, turning counterclockwise for a positive angle,
+the shape of manim's ArcBetweenPoints.
+Inputs:
+starts -- (K, 2) array of start points
+ends -- (K, 2) array of end points
+angle -- float or (K,) array, the angle each arc subtends
+samples -- Optional, number of points along each arc
+Returns:
+(K, samples, 2) array of points
+"""
+def arc_polylines(starts, ends, angle, samples=24):
+    starts, ends = np.asarray(starts, dtype=float)[:, :2], np.asarray(ends, dtype=float)[:, :2]
+    angle = np.broadcast_to(np.asarray(angle, dtype=float), (len(starts),))[:, None]
+    t = np.linspace(0, 1, samples)
+    straight = np.abs(angle) < 1e-8
+    safe_angle = np.where(straight, 1.0, angle)
+    proportions = np.where(straight, t, (np.exp(1j*safe_angle*t) - 1)/(np.exp(1j*safe_angle) - 1))
+    chords = (ends[:, 0] - starts[:, 0]) + 1j*(ends[:, 1] - starts[:, 1])
+    planar = (starts[:, 0] + 1j*starts[:, 1])[:, None] + proportions*chords[:, None]
+    return np.stack([planar.real, planar.imag], axis=-1)
+
+"""
+Returns the bodies and tips of curved arrows between pairs of points, as CurvedArrow draws them:
+the tip ends at the end point pointing along the arc, and the body ends at the base of the tip.
+Inputs:
+starts, ends, angle, samples -- as for arc_polylines
+tip_length -- Optional, length and width of the tips
+Returns:
+bodies -- (K, samples, 2) array of points along the arcs
+tips -- (K, 3) array of the corners of the triangular tips
+"""
+def curved_arrow_geometry(starts, ends, angle=-np.pi/2, tip_length=PREVIEW_TIP_LENGTH, samples=24):
+    starts, ends = np.asarray(starts, dtype=float)[:, :2], np.asarray(ends, dtype=float)[:, :2]
+    angle = np.broadcast_to(np.asarray(angle, dtype=float), (len(starts),))
+    safe_angle = np.where(np.abs(angle) < 1e-8, 1e-8, angle)
+    #Direction of the arc at its end, from the derivative of the parametrization of arc_polylines.
+    chords = (ends[:, 0] - starts[:, 0]) + 1j*(ends[:, 1] - starts[:, 1])
+    tangents = 1j*safe_angle*np.exp(1j*safe_angle)/(np.exp(1j*safe_angle) - 1)*chords
+    tangents = tangents/np.where(np.abs(tangents) > 0, np.abs(tangents), 1)
+    directions = np.column_stack([tangents.real, tangents.imag])
+    normals = np.column_stack([-tangents.imag, tangents.real])
+    bases = ends - tip_length*directions
+    tips = np.stack([ends, bases + normals*tip_length/2, bases - normals*tip_length/2], axis=1)
+    return arc_polylines(starts, bases, angle, samples), tips
+
+"""
+Returns the loops of get_loop at vertices of a polygon clock: a circle of loop_radius just outside
+each vertex, open by a tenth of a turn, with a triangular tip pointing back into the vertex.
+Inputs:
+vertices -- (K, 2) array of the vertices with loops
+center -- center of the clock
+loop_radius -- radius of the loops
+samples -- Optional, number of points along each loop
+Returns:
+loops -- (K, samples, 2) array of points along the loops
+tips -- (K, 3) array of the corners of the tips
+"""
+def loop_geometry(vertices, center, loop_radius, samples=32):
+    vertices = np.asarray(vertices, dtype=float)[:, :2]
+    outward = vertices - np.asarray(center, dtype=float)[:2]
+    outward = outward/np.linalg.norm(outward, axis=1)[:, None]
+    loop_centers = vertices + loop_radius*outward
+    start_angles = np.arctan2(outward[:, 1], outward[:, 0]) - np.pi
+    angles = start_angles[:, None] + np.linspace(0, 0.9*2*np.pi, samples)
+    loops = loop_centers[:, None] + loop_radius*np.stack([np.cos(angles), np.sin(angles)], axis=-1)
+    ends = loops[:, -1]
+    altitudes = vertices - ends
+    displacements = np.column_stack([altitudes[:, 1], -altitudes[:, 0]])/np.sqrt(3)
+    return loops, np.stack([vertices, ends + displacements, ends - displacements], axis=1)
+
+"""
+Draws numbers as seven segment digits, each centered on its position, all in one pass.
+Inputs:
+canvas -- PreviewCanvas to draw on
+texts -- list of numbers or strings of digits and minus signs
+positions -- list of the centers of the labels
+height -- Optional, height of the digits
+"""
+def draw_labels(canvas, texts, positions, color=PREVIEW_COLORS["label"], height=PREVIEW_LABEL_HEIGHT, width=PREVIEW_STROKE_WIDTH):
+    advance = 0.75*height
+    segments = []
+    for text, position in zip(texts, positions):
+        text = str(text)
+        first = position[0] - advance*(len(text) - 1)/2
+        segments.extend(DIGIT_ARRAYS[character]*height + (first + k*advance, position[1])
+                        for k, character in enumerate(text) if character in DIGIT_ARRAYS)
+    if segments:
+        segments = np.concatenate(segments)
+        canvas.segments(segments[:, 0], segments[:, 1], color, width)
+    return canvas
+
+"""
+Draws a straight arrow as manim's Arrow does: pulled in by buff at both ends, with a tip
+no longer than a quarter of the arrow.
+"""
+def draw_arrow(canvas, start, end, color=PREVIEW_COLORS["line"], buff=0.25, tip_length=PREVIEW_TIP_LENGTH, width=6):
+    start, end = np.asarray(start, dtype=float)[:2], np.asarray(end, dtype=float)[:2]
+    length = np.linalg.norm(end - start)
+    if length <= 2*buff:
+        return canvas
+    direction = (end - start)/length
+    start, end = start + buff*direction, end - buff*direction
+    tip_length = min(tip_length, 0.25*(length - 2*buff))
+    normal = np.array([-direction[1], direction[0]])
+    base = end - tip_length*direction
+    canvas.stroke([start, base], color, width)
+    canvas.fill([end, base + normal*tip_length/2, base - normal*tip_length/2], color)
+    return canvas
+
+"""
+Draws a siteswap on a polygon clock, as draw_siteswap does: the polygon, a curved arrow from each
+vertex to the vertex its throw lands on, a loop at each vertex whose throw lands back on it, and the throw heights.
+Inputs:
+canvas -- PreviewCanvas to draw on
+throw_heights -- list of periodic throw heights in the pattern
+radius -- Optional, radius of the circumcircle of the polygon
+angle -- Optional, angle the clock has turned counterclockwise
+center -- Optional, center of the clock
+loop_radius -- Optional, radius of the loops
+label_scale -- Optional, labels are at center + label_scale*(vertex - center)
+labels_follow -- Optional, whether the labels turn with the clock, as the moving labels of rotation_scene do,
+                 or stay where they started, as the labels of draw_siteswap.py do
+colors -- Optional, dictionary of colors, as PREVIEW_COLORS
+throw_colors -- Optional, list of the color of each throw's arrow or loop, e.g. from siteswap_patterns.orbit_colors
+                as draw_siteswap.py colors them, by default colors["arc"] and colors["loop"]
+"""
+def draw_clock(canvas, throw_heights, radius=1.5, angle=0, center=(0, 0), loop_radius=0.5, label_scale=1.5,
+               labels_follow=True, colors=PREVIEW_COLORS, throw_colors=None):
+    N = len(throw_heights)
+    center = np.asarray(center, dtype=float)[:2]
+    vertices = clock_vertices(N, radius, angle, center)
+    catches = (np.arange(N) + np.asarray(throw_heights)) % N
+    loops = catches == np.arange(N)
+    if throw_colors is None:
+        throw_colors = [colors["loop"] if loop else colors["arc"] for loop in loops]
+    #Colors given as (r, g, b) sequences are compared as tuples.
+    throw_colors = [color if isinstance(color, str) else tuple(color) for color in throw_colors]
+    canvas.stroke(vertices, colors["polygon"], closed=True)
+    #Throws of the same color are drawn together.
+    for color in dict.fromkeys(throw_colors):
+        colored = np.array([throw_color == color for throw_color in throw_colors])
+        arcs = ~loops & colored
+        if np.any(arcs):
+            bodies, tips = curved_arrow_geometry(vertices[arcs], vertices[catches[arcs]])
+            canvas.segments(bodies[:, :-1].reshape(-1, 2), bodies[:, 1:].reshape(-1, 2), color)
+            for tip in tips:
+                canvas.fill(tip, color)
+        own_loops = loops & colored
+        if np.any(own_loops):
+            curves, tips = loop_geometry(vertices[own_loops], center, loop_radius)
+            canvas.segments(curves[:, :-1].reshape(-1, 2), curves[:, 1:].reshape(-1, 2), color)
+            for tip in tips:
+                canvas.fill(tip, color)
+    label_vertices = vertices if labels_follow else clock_vertices(N, radius, 0, center)
+    draw_labels(canvas, throw_heights, center + label_scale*(label_vertices - center), colors["label"])
+    return canvas
+
+"""
+Draws a NumberLine with a tick at every integer and, optionally, the integers under the ticks.
+Inputs:
+canvas -- PreviewCanvas to draw on
+x_range -- [first, last] numbers on the line
+center -- Optional, where the middle of the line is, before the shift
+shift -- Optional, how far the line is shifted to the right
+unit -- Optional, length of one unit
+include_numbers -- Optional, whether to label the ticks
+label_height -- Optional, height of the numbers
+Only the ticks and numbers in the frame are drawn, so long lines cost the same as short ones.
+"""
+def draw_number_line(canvas, x_range, center=(0, 0), shift=0, unit=1, color=PREVIEW_COLORS["line"],
+                     include_numbers=True, label_height=0.25, tick_size=0.1):
+    first, last = x_range[:2]
+    center = np.asarray(center, dtype=float)[:2] + (shift, 0)
+    def n2p(x):
+        return center[0] + (np.asarray(x, dtype=float) - (first + last)/2)*unit
+    canvas.stroke([(n2p(first), center[1]), (n2p(last), center[1])], color)
+    #Only the numbers whose ticks are near the frame.
+    visible_low = max(first, int(np.floor((-canvas.frame_width/2 - center[0])/unit + (first + last)/2)) - 1)
+    visible_high = min(last, int(np.ceil((canvas.frame_width/2 - center[0])/unit + (first + last)/2)) + 1)
+    numbers = np.arange(int(np.ceil(visible_low)), int(np.floor(visible_high)) + 1)
+    if len(numbers) == 0:
+        return canvas
+    xs = n2p(numbers)
+    canvas.segments(np.column_stack([xs, np.full(len(xs), center[1] - tick_size)]),
+                    np.column_stack([xs, np.full(len(xs), center[1] + tick_size)]), color)
+    if include_numbers:
+        draw_labels(canvas, numbers, np.column_stack([xs, np.full(len(xs), center[1] - tick_size - 0.25 - label_height/2)]),
+                    color, label_height)
+    return canvas
+
+"""
+Yields the frames of a siteswap on a polygon clock turning by a given angle, as rotation_pattern and the
+fivethreeone and sixfourfiveone scenes animate it with Rotate.
+Inputs:
+throw_heights -- list of periodic throw heights in the pattern
+turn -- Optional, angle to turn the clock by, counterclockwise, by default one beat clockwise
+run_time -- Optional, length of the animation in seconds
+fps -- Optional, frames per second
+canvas -- Optional, PreviewCanvas to draw on, by default 480 by 270 pixels
+Further keyword arguments are passed to draw_clock.
+Yields:
+(pixel_height, pixel_width, 4) uint8 RGBA frames, a new array for each
+Raises a ValueError if throw_heights is not a valid siteswap.
+"""
+def rotation_preview(throw_heights, turn=None, run_time=1, fps=60, canvas=None, **clock_options):
+    check_siteswap(throw_heights)
+    canvas = canvas or PreviewCanvas()
+    turn = -2*np.pi/len(throw_heights) if turn is None else turn
+    for t in np.linspace(0, 1, max(int(round(run_time*fps)), 1) + 1):
+        yield draw_clock(canvas.clear(), throw_heights, angle=turn*smooth(t), **clock_options).frame()
+
+"""
+Yields the frames of rotating_polygon.slide: a number line and its arrow sliding to the right
+over a fixed orange number line with an arrow at 3.
+Inputs:
+distance -- Optional, how far the top line slides
+run_time, fps, canvas -- as for rotation_preview
+"""
+def slide_preview(distance=3, run_time=3, fps=60, canvas=None):
+    canvas = canvas or PreviewCanvas()
+    label_height = 0.4
+    for t in np.linspace(0, 1, max(int(round(run_time*fps)), 1) + 1):
+        shift = distance*smooth(t)
+        canvas.clear()
+        draw_number_line(canvas, [-12, 12], center=(0, 0.8), shift=shift, label_height=label_height)
+        draw_number_line(canvas, [-8, 8], center=(0, -0.8), color="#FF862F", label_height=label_height)
+        draw_arrow(canvas, (3, -3.8), (3, -1.6), color="#FF862F")
+        draw_arrow(canvas, (shift, 3.8), (shift, 1.3))
+        yield canvas.frame()
+
+"""
+Previews of the project's scenes, each a function of the canvas and frame rate yielding frames.
+"""
+PREVIEW_SCENES = {
+    "draw_siteswap.fivethreeone": lambda canvas, fps: rotation_preview(
+        [5, 3, 1], 2*np.pi/3, 1, fps, canvas, radius=3, loop_radius=0.05, label_scale=1 + 0.4/3, labels_follow=False,
+        throw_colors=orbit_colors([5, 3, 1])),
+    "draw_siteswap.sixfourfiveone": lambda canvas, fps: rotation_preview(
+        [6, 4, 5, 1], 0, 0, fps, canvas, radius=3, loop_radius=0.05, label_scale=1 + 0.4/3, labels_follow=False,
+        throw_colors=orbit_colors([6, 4, 5, 1])),
+    "rotating_polygon.fivethreeone": lambda canvas, fps: rotation_preview([5, 3, 1], np.pi, 1, fps, canvas),
+    "rotating_polygon.sixfourfiveone": lambda canvas, fps: rotation_preview(
+        [6, 4, 5, 1], -3*np.pi/2, 3, fps, canvas, radius=2.3),
+    "rotating_polygon.slide": lambda canvas, fps: slide_preview(3, 3, fps, canvas),
+}
+
+"""
+Returns images tiled into a grid, left to right and top to bottom.
+Inputs:
+images -- list of (height, width, 4) uint8 arrays, all of the same size
+columns -- Optional, number of images per row
+gap -- Optional, pixels between the images
+"""
+def thumbnail_grid(images, columns=4, gap=4):
+    height, width = images[0].shape[:2]
+    columns = min(columns, len(images))
+    rows = -(-len(images)//columns)
+    grid = np.zeros((rows*height + (rows - 1)*gap, columns*width + (columns - 1)*gap, 4), dtype=np.uint8)
+    grid[:, :, 3] = 255
+    for k, image in enumerate(images):
+        top, left = (k//columns)*(height + gap), (k % columns)*(width + gap)
+        grid[top:top + height, left:left + width] = image
+    return grid
+
+"""
+Writes an RGBA uint8 image to a PNG file, without any imaging library.
+"""
+def write_png(path, image):
+    height, width = image.shape[:2]
+    def chunk(kind, data):
+        return len(data).to_bytes(4, "big") + kind + data + zlib.crc32(kind + data).to_bytes(4, "big")
+    rows = np.concatenate([np.zeros((height, 1), dtype=np.uint8), image.reshape(height, -1)], axis=1)
+    header = width.to_bytes(4, "big") + height.to_bytes(4, "big") + bytes([8, 6, 0, 0, 0])
+    with open(path, "wb") as file:
+        file.write(b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows.tobytes(), 6))
+                   + chunk(b"IEND", b""))
+
+"""
+Pipes frames into ffmpeg to encode a video.
+Inputs:
+frames -- iterable of (height, width, 4) uint8 RGBA frames, all of the same size
+path -- file to write, its extension picks the format
+fps -- Optional, frames per second
+ffmpeg -- Optional, ffmpeg executable
+Returns:
+Number of frames written.
+"""
+def write_video(frames, path, fps=60, ffmpeg="ffmpeg"):
+    frames = iter(frames)
+    first = next(frames)
+    height, width = first.shape[:2]
+    command = [ffmpeg, "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{width}x{height}",
+               "-r", str(fps), "-i", "-", "-pix_fmt", "yuv420p", path]
+    process = subprocess.Popen(command, stdin=subprocess.PIPE)
+    count = 0
+    try:
+        process.stdin.write(first.tobytes())
+        count += 1
+        for frame in frames:
+            process.stdin.write(frame.tobytes())
+            count += 1
+    finally:
+        process.stdin.close()
+        if process.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with status {process.returncode} writing {path}.")
+    return count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Preview polygon clock and number line diagrams without manim.")
+    parser.add_argument("patterns", nargs="*", help="siteswaps to preview on a rotating clock, e.g. 531")
+    parser.add_argument("--scene", choices=sorted(PREVIEW_SCENES), default=None, help="preview one of the project's scenes")
+    parser.add_argument("--output", default=None, help="write the frames of the first preview to this video file")
+    parser.add_argument("--grid", default=None, help="write the last frame of every preview to this PNG file")
+    parser.add_argument("--columns", type=int, default=4, help="thumbnails per row of the grid")
+    parser.add_argument("--size", default="480x270", help="frame size in pixels, WIDTHxHEIGHT")
+    parser.add_argument("--fps", type=int, default=60, help="frames per second")
+    parser.add_argument("--run-time", type=float, default=1, help="seconds each pattern's clock takes to turn one beat")
+    args = parser.parse_args(argv)
+
+    width, height = (int(size) for size in args.size.lower().split("x"))
+    previews = []
+    if args.scene != None:
+        previews.append((args.scene, PREVIEW_SCENES[args.scene](PreviewCanvas(width, height), args.fps)))
+    for pattern in args.patterns:
+        previews.append((pattern, rotation_preview(parse_pattern(pattern), run_time=args.run_time, fps=args.fps,
+                                                   canvas=PreviewCanvas(width, height))))
+    if not previews:
+        parser.error("give patterns or --scene")
+    thumbnails = []
+    count = 0
+    start = time.perf_counter()
+    #Frames are drawn one at a time and streamed to the video, keeping only the last one of each preview.
+    def keep_last(frames, last_frame):
+        for frame in frames:
+            last_frame.append(frame)
+            yield frame
+    for index, (name, frames) in enumerate(previews):
+        last_frame = deque(maxlen=1)
+        frames = keep_last(frames, last_frame)
+        if index == 0 and args.output != None:
+            count += write_video(frames, args.output, args.fps)
+        else:
+            count += sum(1 for frame in frames)
+        thumbnails.append(last_frame[0])
+    elapsed = time.perf_counter() - start
+    if args.grid != None:
+        write_png(args.grid, thumbnail_grid(thumbnails, args.columns))
+    print(f"{count} frames in {elapsed:.2f}s ({count/max(elapsed, 1e-9):.0f} frames/s)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
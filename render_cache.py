@@ -0,0 +1,260 @@
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import sys
+
+from render_farm import PROJECT_DIRECTORY
+
+"""
+This file contains a project wide cache of rendered animations, shared between runs and media directories.
+Manim names the partial movie file of each play by a hash of every mobject and animation in it, which is
+slow to compute for large scenes. For scenes with the RenderCacheScene mixin the name is instead a key made of:
+the scene's name, its parameters (the class attributes of the project's classes it inherits from, like
+throw_heights, endpoints, prechac_positions or polygon_radius), a hash of the source of every function and
+class of the project the scene uses, directly or through other helpers, the render settings, and the number
+of the play in the scene. A change to code the scene doesn't use leaves its key unchanged.
+Rendered segments are kept in RENDER_CACHE_DIRECTORY, and copied into the media directory when a later run
+has the same key, so that manim skips rendering them. The least recently used segments are deleted once the
+cache grows past its size. Scenes are assumed to draw the same frames given the same code and parameters.
+"""
+
+RENDER_CACHE_DIRECTORY = os.path.join(PROJECT_DIRECTORY, ".render_cache")
+RENDER_CACHE_SIZE = 2 << 30
+RENDER_CACHE_PREFIX = "rc_"
+SIMPLE_TYPES = (bool, int, float, complex, str, bytes, tuple, list, dict, type(None))
+
+"""
+Returns True if an object is a function or class defined in one of the project's files.
+"""
+def is_project_object(obj):
+    module = sys.modules.get(getattr(obj, "__module__", None) or "")
+    file = getattr(module, "__file__", None)
+    return file != None and os.path.dirname(os.path.abspath(file)) == PROJECT_DIRECTORY
+
+"""
+Yields the global names a code object and the functions and classes nested in it refer to.
+"""
+def referenced_names(code):
+    yield from code.co_names
+    for constant in code.co_consts:
+        if inspect.iscode(constant):
+            yield from referenced_names(constant)
+
+"""
+Returns a dictionary of the source of every function and class of the project an object depends on:
+the object itself, the project's classes it inherits from, and everything its functions refer to by
+global name, followed recursively. Module level constants they refer to are included by value.
+"""
+def dependency_sources(root):
+    sources = {}
+    seen = set()
+    stack = [root]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or not is_project_object(obj) or obj is RenderCacheScene:
+            continue
+        seen.add(id(obj))
+        try:
+            source = inspect.getsource(obj)
+        except (OSError, TypeError):
+            #Classes made at run time, like those of pattern_scenes.pattern_scene, have no source.
+            source = repr(sorted(vars(obj))) if isinstance(obj, type) else ""
+        sources[f"{obj.__module__}.{getattr(obj, '__qualname__', '')}"] = source
+        if isinstance(obj, type):
+            stack.extend(obj.__bases__)
+            functions = [value for value in vars(obj).values() if inspect.isfunction(value)]
+        else:
+            functions = [obj] if inspect.isfunction(obj) else []
+        for function in functions:
+            for name in referenced_names(function.__code__):
+                if name not in function.__globals__:
+                    continue
+                value = function.__globals__[name]
+                if inspect.isfunction(value) or isinstance(value, type):
+                    stack.append(value)
+                elif isinstance(value, SIMPLE_TYPES):
+                    sources[f"{function.__module__}.{name}"] = repr(value)
+                elif not inspect.ismodule(value):
+                    stack.append(type(value))
+    return sources
+
+code_hashes = {}
+
+"""
+Returns the class whose code a scene class runs. Classes which only set parameters on a single class of the project,
+like the ones cached and pattern_scenes.pattern_scene make on every call, run the code of that class,
+and their parameters are part of the key through scene_parameters.
+"""
+def code_class(scene_class):
+    while True:
+        bases = [base for base in scene_class.__bases__ if base is not RenderCacheScene]
+        if len(bases) != 1 or not is_project_object(bases[0]):
+            return scene_class
+        if any(callable(value) or isinstance(value, (staticmethod, classmethod, property))
+               for value in vars(scene_class).values()):
+            return scene_class
+        scene_class = bases[0]
+
+"""
+Returns a hash of the source of everything of the project a scene class depends on,
+computed once per class of code_class, so that long running workers don't hash it again for every render.
+"""
+def code_hash(scene_class):
+    scene_class = code_class(scene_class)
+    if scene_class not in code_hashes:
+        digest = hashlib.sha256()
+        for name, source in sorted(dependency_sources(scene_class).items()):
+            digest.update(name.encode() + b"\0" + source.encode() + b"\0")
+        code_hashes[scene_class] = digest.hexdigest()
+    return code_hashes[scene_class]
+
+"""
+Returns the parameters of a scene class as JSON: the public class attributes of the project's classes
+it inherits from which aren't functions, such as throw_heights and endpoints.
+"""
+def scene_parameters(scene_class):
+    parameters = {}
+    for klass in reversed(scene_class.__mro__):
+        if not is_project_object(klass) or klass is RenderCacheScene:
+            continue
+        for name, value in vars(klass).items():
+            if not name.startswith("_") and not callable(value) and not isinstance(value, (staticmethod, classmethod, property)):
+                parameters[name] = value
+    return json.dumps(parameters, sort_keys=True, default=lambda value: value.tolist() if hasattr(value, "tolist") else repr(value))
+
+"""
+Links a file to a new path, or copies it where links aren't possible, replacing the path atomically.
+"""
+def link_or_copy(source, target):
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    temporary = f"{target}.{os.getpid()}.tmp"
+    try:
+        os.link(source, temporary)
+    except OSError:
+        shutil.copy2(source, temporary)
+    os.replace(temporary, target)
+
+"""
+A directory of rendered segments, one file per key, deleting the least recently used once it grows past max_size bytes.
+"""
+class RenderCache:
+    def __init__(self, directory=RENDER_CACHE_DIRECTORY, max_size=RENDER_CACHE_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+
+    #Path of the segment with a given key and file extension.
+    def path(self, key, extension):
+        return os.path.join(self.directory, key + extension)
+
+    #Copies a cached segment to target if there is one, marking it as used. Returns whether there was one.
+    def restore(self, key, target):
+        source = self.path(key, os.path.splitext(target)[1])
+        if not os.path.exists(source):
+            return False
+        link_or_copy(source, target)
+        os.utime(source)
+        return True
+
+    #Adds a rendered segment to the cache, or marks it as used if it is already there.
+    def store(self, key, source):
+        target = self.path(key, os.path.splitext(source)[1])
+        if os.path.exists(target):
+            os.utime(target)
+        elif os.path.exists(source):
+            link_or_copy(source, target)
+
+    #Deletes the least recently used segments until the cache fits in max_size.
+    def evict(self):
+        if not os.path.isdir(self.directory):
+            return
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.startswith(RENDER_CACHE_PREFIX):
+                status = entry.stat()
+                entries.append((status.st_mtime, status.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            os.remove(path)
+            total -= size
+
+"""
+Makes manim name the partial movie files of RenderCacheScene scenes by their render_cache_key
+instead of hashing the play call. Other scenes are hashed as before. Safe to call more than once.
+"""
+def install_render_cache():
+    from manim.utils import hashing
+    import manim.renderer.cairo_renderer as cairo_renderer
+    original = hashing.get_hash_from_play_call
+    if getattr(original, "render_cache", False):
+        return
+    def get_hash_from_play_call(scene, *args, **kwargs):
+        if isinstance(scene, RenderCacheScene) and scene.use_render_cache:
+            return scene.render_cache_key()
+        return original(scene, *args, **kwargs)
+    get_hash_from_play_call.render_cache = True
+    hashing.get_hash_from_play_call = get_hash_from_play_call
+    if hasattr(cairo_renderer, "get_hash_from_play_call"):
+        cairo_renderer.get_hash_from_play_call = get_hash_from_play_call
+
+"""
+A Scene mixin keeping its rendered animations in the project's render cache, see the top of this file.
+Put it before the Scene class in the bases, or use cached. Setting use_render_cache to False turns it off.
+"""
+class RenderCacheScene:
+    use_render_cache = True
+    render_cache_directory = RENDER_CACHE_DIRECTORY
+    render_cache_size = RENDER_CACHE_SIZE
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        install_render_cache()
+        self.render_cache = RenderCache(self.render_cache_directory, self.render_cache_size)
+        writer = getattr(self.renderer, "file_writer", None)
+        if self.use_render_cache and writer != None:
+            is_already_cached = writer.is_already_cached
+            def is_in_render_cache(hash_invocation):
+                if is_already_cached(hash_invocation):
+                    return True
+                return (hash_invocation.startswith(RENDER_CACHE_PREFIX)
+                        and self.render_cache.restore(hash_invocation, self.partial_movie_path(hash_invocation)))
+            writer.is_already_cached = is_in_render_cache
+
+    #Path manim writes the partial movie file of a play to.
+    def partial_movie_path(self, hash_invocation):
+        from manim import config
+        return os.path.join(self.renderer.file_writer.partial_movie_directory,
+                            f"{hash_invocation}{config['movie_file_extension']}")
+
+    #Returns the key of the current play, see the top of this file.
+    def render_cache_key(self):
+        import manim
+        from manim import config
+        scene_class = type(self)
+        settings = [str(config[name]) for name in ["pixel_width", "pixel_height", "frame_rate", "frame_width",
+                                                   "frame_height", "background_color", "background_opacity",
+                                                   "transparent", "movie_file_extension"]]
+        digest = hashlib.sha256()
+        for part in [scene_class.__name__, scene_parameters(scene_class), code_hash(scene_class),
+                     manim.__version__, *settings, str(self.renderer.num_plays)]:
+            digest.update(part.encode() + b"\0")
+        return RENDER_CACHE_PREFIX + digest.hexdigest()[:40]
+
+    def render(self, *args, **kwargs):
+        result = super().render(*args, **kwargs)
+        writer = getattr(self.renderer, "file_writer", None)
+        if self.use_render_cache and writer != None:
+            for hash_invocation in self.renderer.animations_hashes:
+                if hash_invocation != None and hash_invocation.startswith(RENDER_CACHE_PREFIX):
+                    self.render_cache.store(hash_invocation, self.partial_movie_path(hash_invocation))
+            self.render_cache.evict()
+        return result
+
+"""
+Returns a subclass of a Scene class keeping its animations in the render cache, with the same name.
+"""
+def cached(scene_class):
+    return type(scene_class.__name__, (RenderCacheScene, scene_class), {})
@@ -0,0 +1,185 @@
+import argparse
+import ast
+import fnmatch
+import importlib
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+"""
+This file contains a batch renderer which finds every Scene in the project and renders
+them in parallel worker processes, reporting how long each scene took and which ones failed.
+Usage:
+python render_farm.py --workers 8 --quality l
+python render_farm.py --scene "rotating_polygon.*" --report timings.json
+"""
+
+PROJECT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+QUALITY_FLAGS = {"l": "low_quality", "m": "medium_quality", "h": "high_quality",
+                 "p": "production_quality", "k": "fourk_quality"}
+
+"""
+Returns a list of (module name, scene name) pairs for every class in the project's modules
+which defines a construct method. The files are parsed rather than imported, so discovery
+doesn't pay for importing manim or run any module level code.
+Inputs:
+directory -- Optional, the directory to search, by default the project directory.
+"""
+def discover_scenes(directory=PROJECT_DIRECTORY):
+    scenes = []
+    for file_name in sorted(os.listdir(directory)):
+        if not file_name.endswith(".py") or file_name.startswith("."):
+            continue
+        with open(os.path.join(directory, file_name), encoding="utf-8") as file:
+            tree = ast.parse(file.read(), filename=file_name)
+        for node in tree.body:
+            if isinstance(node, ast.ClassDef) and any(isinstance(item, ast.FunctionDef) and item.name == "construct"
+                                                      for item in node.body):
+                scenes.append((file_name[:-3], node.name))
+    return scenes
+
+"""
+Returns the name of a manim quality preset, accepting either the command line flag
+(l, m, h, p, k) or the full name (e.g. low_quality).
+"""
+def quality_name(quality):
+    return QUALITY_FLAGS.get(quality, quality)
+
+"""
+Returns the manim config values used to render a scene from a given module at a given quality.
+"""
+def scene_config(module_name, quality="low_quality", media_dir=None):
+    from manim.constants import QUALITIES
+    preset = QUALITIES[quality_name(quality)]
+    settings = {"pixel_height": preset["pixel_height"],
+                "pixel_width": preset["pixel_width"],
+                "frame_rate": preset["frame_rate"],
+                "input_file": os.path.join(PROJECT_DIRECTORY, module_name + ".py")}
+    if media_dir != None:
+        settings["media_dir"] = media_dir
+    return settings
+
+"""
+Renders one scene in the current process and reports the outcome. Meant to run in a worker process,
+so it never raises: failures are returned along with their traceback.
+Inputs:
+module_name -- name of the module defining the scene
+scene_name -- name of the Scene class
+quality -- Optional, manim quality preset or its command line flag
+media_dir -- Optional, directory manim writes its output to
+config_overrides -- Optional, dictionary of further manim config values
+cache -- Optional, whether to keep the scene's animations in the project's render cache, see render_cache.py
+Returns:
+Dictionary with the module, scene, status ("ok" or "failed"), wall time in seconds,
+and either the output path or the error.
+"""
+def render_scene(module_name, scene_name, quality="low_quality", media_dir=None, config_overrides=None, cache=True):
+    start = time.perf_counter()
+    result = {"module": module_name, "scene": scene_name}
+    try:
+        from manim import tempconfig
+        if PROJECT_DIRECTORY not in sys.path:
+            sys.path.insert(0, PROJECT_DIRECTORY)
+        scene_class = getattr(importlib.import_module(module_name), scene_name)
+        if cache:
+            from render_cache import cached
+            scene_class = cached(scene_class)
+        settings = scene_config(module_name, quality, media_dir)
+        settings.update(config_overrides or {})
+        with tempconfig(settings):
+            scene = scene_class()
+            scene.render()
+            output = scene.renderer.file_writer.movie_file_path
+        result.update(status="ok", output=str(output) if output else None)
+    except Exception:
+        result.update(status="failed", error=traceback.format_exc())
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+"""
+Renders a list of scenes in parallel worker processes.
+Inputs:
+scenes -- list of (module name, scene name) pairs, e.g. from discover_scenes
+workers -- Optional, number of worker processes, by default one per core
+quality -- Optional, manim quality preset or its command line flag
+media_dir -- Optional, directory manim writes its output to
+config_overrides -- Optional, dictionary of further manim config values
+log -- Optional, function called with a line of text as each scene finishes
+cache -- Optional, whether to use the project's render cache
+Returns:
+List of the result dictionaries from render_scene, in the order the scenes finished.
+"""
+def render_all(scenes, workers=None, quality="low_quality", media_dir=None, config_overrides=None, log=print, cache=True):
+    results = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = [pool.submit(render_scene, module_name, scene_name, quality, media_dir, config_overrides, cache)
+                   for module_name, scene_name in scenes]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if log != None:
+                log(f"[{len(results)}/{len(scenes)}] {result['module']}.{result['scene']} "
+                    f"{result['status']} in {result['seconds']:.1f}s")
+    return results
+
+"""
+Returns a text report of a batch render: scenes ranked by wall time, followed by the failures
+and the last line of each traceback.
+"""
+def format_report(results, wall_time=None):
+    lines = ["Scene timings:"]
+    for result in sorted(results, key=lambda result: result["seconds"], reverse=True):
+        lines.append(f"  {result['seconds']:8.1f}s  {result['status']:6}  {result['module']}.{result['scene']}")
+    total = sum(result["seconds"] for result in results)
+    summary = f"{len(results)} scenes, {total:.1f}s of render time"
+    if wall_time != None:
+        summary += f" in {wall_time:.1f}s wall time"
+    lines.append(summary)
+    failures = [result for result in results if result["status"] != "ok"]
+    if failures:
+        lines.append(f"{len(failures)} failed:")
+        for result in failures:
+            lines.append(f"  {result['module']}.{result['scene']}: {result['error'].strip().splitlines()[-1]}")
+    return "\n".join(lines)
+
+"""
+Keeps the scenes whose "module.Scene" name matches any of the given shell style patterns.
+"""
+def filter_scenes(scenes, patterns):
+    if not patterns:
+        return scenes
+    return [scene for scene in scenes
+            if any(fnmatch.fnmatch(f"{scene[0]}.{scene[1]}", pattern) for pattern in patterns)]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render every Scene in the project in parallel.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--quality", default="l", help="l, m, h, p, k or a manim quality name")
+    parser.add_argument("--media-dir", default=None, help="directory manim writes its output to")
+    parser.add_argument("--scene", action="append", default=[],
+                        help="only render scenes matching this module.Scene pattern, may be repeated")
+    parser.add_argument("--list", action="store_true", help="list the scenes that would be rendered and exit")
+    parser.add_argument("--report", default=None, help="write the per scene results to this JSON file")
+    parser.add_argument("--no-cache", action="store_true", help="don't use the project's render cache")
+    args = parser.parse_args(argv)
+
+    scenes = filter_scenes(discover_scenes(), args.scene)
+    if args.list:
+        for module_name, scene_name in scenes:
+            print(f"{module_name}.{scene_name}")
+        return 0
+    start = time.perf_counter()
+    results = render_all(scenes, workers=args.workers, quality=args.quality, media_dir=args.media_dir,
+                         cache=not args.no_cache)
+    print(format_report(results, time.perf_counter() - start))
+    if args.report != None:
+        with open(args.report, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    return 0 if all(result["status"] == "ok" for result in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
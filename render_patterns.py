@@ -0,0 +1,205 @@
+import argparse
+import ast
+import json
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from render_farm import PROJECT_DIRECTORY, format_report, scene_config
+from siteswap_patterns import parse_pattern, pattern_name
+
+"""
+This file contains a command line renderer for any number of patterns, using the scenes of pattern_scenes.py.
+Patterns are read from the arguments or from stdin, one spec per line:
+[kind] pattern [parameter=value ...]
+where kind is one of the scenes of pattern_scenes.PATTERN_SCENES (rotation, prechac, wrap or diagram),
+by default those given with --kind, and the parameters override the scene's class attributes, e.g.
+prechac 5313 endpoints=[-20,20] window_margin=1
+prechac 97531 jugglers=3 prechac_positions=[0,2]
+Blank lines and lines starting with # are skipped. Every scene is rendered in the same long lived process,
+or in a small pool of them, which import manim once and keep their caches between patterns, so a pattern
+only costs its own render.
+Usage:
+python render_patterns.py 531 "prechac 5313" --kind rotation --kind wrap
+python render_patterns.py --workers 4 < patterns.txt
+"""
+
+#The keys of pattern_scenes.PATTERN_SCENES, listed here so that specs are read without importing manim.
+PATTERN_KINDS = ["rotation", "prechac", "wrap", "diagram"]
+
+"""
+Returns the value of a parameter written on a spec line: a Python literal if it is one,
+with tuples turned into lists, and the text itself otherwise.
+"""
+def parse_value(text):
+    try:
+        value = ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+    return list(value) if isinstance(value, tuple) else value
+
+"""
+Returns the spec of one render: a dictionary with the kind, throw heights, parameters and scene name,
+which is made of them so that the same render always gets the same name.
+"""
+def make_spec(kind, throw_heights, parameters):
+    name = f"{kind}_{pattern_name(throw_heights)}"
+    if parameters:
+        name += "_" + "_".join(f"{key}{value}" for key, value in sorted(parameters.items()))
+    name = "".join(character if character.isalnum() or character == "_" else "_" for character in name)
+    return {"kind": kind, "throw_heights": list(throw_heights), "parameters": parameters, "name": name}
+
+"""
+Returns the renders a spec line stands for, as dictionaries with the kind, throw heights, parameters and
+name of each scene. A line without a kind stands for one render of each of the default kinds.
+Inputs:
+line -- a spec line, [kind] pattern [parameter=value ...]
+kinds -- Optional, the kinds rendered for a line without a kind
+Returns:
+List of specs, empty for blank lines and comments.
+Raises a ValueError if the line can't be read.
+"""
+def parse_spec(line, kinds=("rotation",)):
+    tokens = line.split("#", 1)[0].split()
+    if not tokens:
+        return []
+    if tokens[0] in PATTERN_KINDS:
+        kinds, tokens = [tokens[0]], tokens[1:]
+    if not tokens:
+        raise ValueError(f"No pattern in {line.strip()!r}.")
+    throw_heights = parse_pattern(tokens[0])
+    parameters = {}
+    for token in tokens[1:]:
+        key, separator, value = token.partition("=")
+        if not separator:
+            raise ValueError(f"Expected parameter=value, got {token!r} in {line.strip()!r}.")
+        parameters[key] = parse_value(value)
+    return [make_spec(kind, throw_heights, parameters) for kind in kinds]
+
+"""
+Yields the specs of a stream of spec lines, skipping specs whose scene name was already seen.
+Lines which can't be read are yielded as specs with an "error" entry, so they are reported with the results.
+"""
+def read_specs(lines, kinds=("rotation",)):
+    seen = set()
+    for number, line in enumerate(lines, 1):
+        try:
+            specs = parse_spec(line, kinds)
+        except ValueError as error:
+            yield {"name": f"line_{number}", "error": str(error)}
+            continue
+        for spec in specs:
+            if spec["name"] not in seen:
+                seen.add(spec["name"])
+                yield spec
+
+"""
+Renders one pattern in the current process and reports the outcome, never raising,
+like render_farm.render_scene.
+Inputs:
+spec -- dictionary from parse_spec
+quality -- Optional, manim quality preset or its command line flag
+media_dir -- Optional, directory manim writes its output to
+config_overrides -- Optional, dictionary of further manim config values
+cache -- Optional, whether to keep the scene's animations in the project's render cache, see render_cache.py
+Returns:
+Dictionary with the module, scene, status ("ok" or "failed"), wall time in seconds,
+and either the output path or the error.
+"""
+def render_pattern(spec, quality="low_quality", media_dir=None, config_overrides=None, cache=True):
+    start = time.perf_counter()
+    result = {"module": "pattern_scenes", "scene": spec["name"]}
+    try:
+        if "error" in spec:
+            raise ValueError(spec["error"])
+        from manim import tempconfig
+        if PROJECT_DIRECTORY not in sys.path:
+            sys.path.insert(0, PROJECT_DIRECTORY)
+        from pattern_scenes import pattern_scene
+        scene_class = pattern_scene(spec["kind"], spec["throw_heights"], spec["name"], **spec["parameters"])
+        if cache:
+            from render_cache import cached
+            scene_class = cached(scene_class)
+        settings = scene_config("pattern_scenes", quality, media_dir)
+        settings.update(config_overrides or {})
+        with tempconfig(settings):
+            scene = scene_class()
+            scene.render()
+            output = scene.renderer.file_writer.movie_file_path
+        result.update(status="ok", output=str(output) if output else None)
+    except Exception:
+        result.update(status="failed", error=traceback.format_exc())
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+"""
+Imports manim and the pattern scenes, so that a worker process pays for it once, before its first pattern.
+An import error is left for render_pattern to report, as an exception here would break the whole pool.
+"""
+def warm_up():
+    if PROJECT_DIRECTORY not in sys.path:
+        sys.path.insert(0, PROJECT_DIRECTORY)
+    try:
+        import pattern_scenes
+    except Exception:
+        pass
+
+"""
+Renders a stream of patterns, in this process when workers is 1 and otherwise in a pool of long lived
+worker processes. Specs are read from the stream as the renders finish, keeping only a few per worker
+in flight, so streams of thousands of patterns are never read into memory at once.
+Inputs:
+specs -- iterable of dictionaries from parse_spec or read_specs
+workers -- Optional, number of worker processes
+quality, media_dir, config_overrides, cache -- as for render_pattern
+Yields:
+The result dictionaries from render_pattern, in the order the renders finish.
+"""
+def render_patterns(specs, workers=1, quality="low_quality", media_dir=None, config_overrides=None, cache=True):
+    if workers <= 1:
+        for spec in specs:
+            yield render_pattern(spec, quality, media_dir, config_overrides, cache)
+        return
+    specs = iter(specs)
+    with ProcessPoolExecutor(max_workers=workers, initializer=warm_up) as pool:
+        pending = set()
+        while True:
+            for spec in specs:
+                pending.add(pool.submit(render_pattern, spec, quality, media_dir, config_overrides, cache))
+                if len(pending) >= 4*workers:
+                    break
+            if not pending:
+                return
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                yield future.result()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render the pattern scenes for any number of patterns.")
+    parser.add_argument("specs", nargs="*",
+                        help="specs to render, \"[kind] pattern [parameter=value ...]\", read from stdin if none or -")
+    parser.add_argument("--kind", action="append", choices=PATTERN_KINDS, default=[],
+                        help="scene rendered for specs without a kind, may be repeated, rotation by default")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes, 1 renders in this process")
+    parser.add_argument("--quality", default="l", help="l, m, h, p, k or a manim quality name")
+    parser.add_argument("--media-dir", default=None, help="directory manim writes its output to")
+    parser.add_argument("--report", default=None, help="write the per pattern results to this JSON file")
+    parser.add_argument("--no-cache", action="store_true", help="don't use the project's render cache")
+    args = parser.parse_args(argv)
+
+    lines = sys.stdin if not args.specs or args.specs == ["-"] else args.specs
+    specs = read_specs(lines, args.kind or ["rotation"])
+    start = time.perf_counter()
+    results = []
+    for result in render_patterns(specs, args.workers, args.quality, args.media_dir, cache=not args.no_cache):
+        results.append(result)
+        print(f"[{len(results)}] {result['scene']} {result['status']} in {result['seconds']:.1f}s", flush=True)
+    print(format_report(results, time.perf_counter() - start))
+    if args.report != None:
+        with open(args.report, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    return 0 if all(result["status"] == "ok" for result in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+import argparse
+import importlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from render_farm import PROJECT_DIRECTORY, scene_config
+
+"""
+This file contains a renderer which splits one long play of a scene, like the 10 second turn of
+line_on_circle or the homotopy of siteswap, into ranges of frames rendered in parallel worker processes.
+Each worker runs the scene from the start: earlier plays are skipped the way manim's -n option skips them,
+jumping to their end, and the frames of the long play before the worker's range are interpolated but not
+drawn, so updaters see every frame as usual. The workers' movies, along with one for the plays before the
+long play and one for those after it, are joined by ffmpeg's concat demuxer without re-encoding.
+The frames are the same as a normal render's for scenes which only depend on the plays before the long
+one through their end states, which holds for the trackers and updaters of this project.
+Usage:
+python render_segments.py line_on_circle.line_on_circle --segments 8 --quality h
+python render_segments.py siteswap.siteswap --play 3 --output siteswap.mp4
+"""
+
+"""
+A Scene mixin which records the run time of each play, meant for a scene made with skip_animations=True
+so that nothing is drawn. play_durations lists (run time, whether the play is a frozen frame) per play.
+"""
+class PlayProbeScene:
+    def setup(self):
+        super().setup()
+        self.play_durations = []
+
+    def begin_animations(self):
+        self.play_durations.append((self.get_run_time(self.animations), self.is_current_animation_frozen_frame()))
+        super().begin_animations()
+
+"""
+A Scene mixin rendering the plays up to segment_last_play, or all of them if it is None, and of the last
+one only the frames in segment_frames, a (start, end) range with None for an open end. The plays before
+the first one rendered are skipped with manim's from_animation_number.
+"""
+class SegmentedScene:
+    segment_last_play = None
+    segment_frames = None
+
+    def setup(self):
+        super().setup()
+        self.segment_frame = 0
+        render = self.renderer.render
+        def render_segment(*args, **kwargs):
+            if self.in_segmented_play():
+                start, end = self.segment_frames
+                frame = self.segment_frame
+                self.segment_frame += 1
+                if frame < start or (end != None and frame >= end):
+                    return
+            render(*args, **kwargs)
+        self.renderer.render = render_segment
+
+    #Whether the current play is the one split into segments.
+    def in_segmented_play(self):
+        return self.segment_frames != None and self.renderer.num_plays == self.segment_last_play
+
+    #Whether the current play has drawn the last frame of its segment, so later frames can be skipped.
+    def past_segment(self):
+        return (self.in_segmented_play() and self.segment_frames[1] != None
+                and self.segment_frame >= self.segment_frames[1])
+
+    def play(self, *args, **kwargs):
+        if self.segment_last_play != None and self.renderer.num_plays > self.segment_last_play:
+            from manim.utils.exceptions import EndSceneEarlyException
+            raise EndSceneEarlyException()
+        self.segment_frame = 0
+        super().play(*args, **kwargs)
+
+    def update_to_time(self, t):
+        if self.past_segment():
+            return
+        super().update_to_time(t)
+
+"""
+Returns a subclass of a Scene class rendering only part of it, see SegmentedScene.
+"""
+def segmented(scene_class, last_play=None, frames=None):
+    return type(scene_class.__name__, (SegmentedScene, scene_class),
+                {"segment_last_play": last_play, "segment_frames": frames})
+
+"""
+Returns the number of frames manim draws for a play of a given run time.
+"""
+def frame_count(run_time, frame_rate):
+    return len(np.arange(0, run_time, 1/frame_rate))
+
+"""
+Returns the (run time, frozen frame) pairs of every play of a scene, found by running it without drawing.
+"""
+def play_durations(module_name, scene_name, quality="low_quality"):
+    from manim import tempconfig
+    if PROJECT_DIRECTORY not in sys.path:
+        sys.path.insert(0, PROJECT_DIRECTORY)
+    scene_class = getattr(importlib.import_module(module_name), scene_name)
+    probe_class = type(scene_name, (PlayProbeScene, scene_class), {})
+    with tempfile.TemporaryDirectory() as media_dir:
+        settings = scene_config(module_name, quality, media_dir)
+        settings.update(write_to_movie=False, save_last_frame=False, preview=False)
+        with tempconfig(settings):
+            scene = probe_class(skip_animations=True)
+            scene.render()
+    return scene.play_durations
+
+"""
+Returns the jobs rendering a scene with one of its plays split into segments, in the order their movies
+are joined. Each job is a dictionary of the first and last play it renders and the frames of the last play.
+Inputs:
+durations -- list from play_durations
+play -- index of the play to split
+segments -- number of segments to split it into
+frame_rate -- frames per second of the render
+"""
+def segment_jobs(durations, play, segments, frame_rate):
+    frames = frame_count(durations[play][0], frame_rate)
+    segments = max(1, min(segments, frames))
+    bounds = [round(index*frames/segments) for index in range(segments + 1)]
+    jobs = []
+    if play > 0:
+        jobs.append({"first_play": 0, "last_play": play - 1, "frames": None})
+    for index in range(segments):
+        #The last segment is left open, in case manim draws a frame more or less than frame_count expects.
+        end = bounds[index + 1] if index < segments - 1 else None
+        jobs.append({"first_play": play, "last_play": play, "frames": (bounds[index], end)})
+    if play < len(durations) - 1:
+        jobs.append({"first_play": play + 1, "last_play": None, "frames": None})
+    return jobs
+
+"""
+Renders one job from segment_jobs in the current process, never raising, like render_farm.render_scene.
+Returns:
+Dictionary with the job, status ("ok" or "failed"), wall time in seconds, and either the movie path or the error.
+"""
+def render_job(module_name, scene_name, job, quality="low_quality", media_dir=None):
+    start = time.perf_counter()
+    result = dict(job)
+    try:
+        from manim import tempconfig
+        if PROJECT_DIRECTORY not in sys.path:
+            sys.path.insert(0, PROJECT_DIRECTORY)
+        scene_class = getattr(importlib.import_module(module_name), scene_name)
+        scene_class = segmented(scene_class, job["last_play"], job["frames"])
+        settings = scene_config(module_name, quality, media_dir)
+        settings.update(from_animation_number=job["first_play"], preview=False, save_last_frame=False)
+        with tempconfig(settings):
+            scene = scene_class()
+            scene.render()
+            output = scene.renderer.file_writer.movie_file_path
+        result.update(status="ok", output=str(output) if output else None)
+    except Exception:
+        result.update(status="failed", error=traceback.format_exc())
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+"""
+Joins movies with the same encoding settings into one, without re-encoding them.
+"""
+def concatenate_movies(paths, output):
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False, encoding="utf-8") as file:
+        for path in paths:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            file.write(f"file '{escaped}'\n")
+        list_path = file.name
+    try:
+        subprocess.run(["ffmpeg", "-y", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", list_path,
+                        "-c", "copy", output], check=True)
+    finally:
+        os.remove(list_path)
+
+"""
+Renders a scene with its longest play, or a given one, split into segments rendered in parallel.
+Inputs:
+module_name -- name of the module defining the scene
+scene_name -- name of the Scene class
+output -- path of the movie to write
+segments -- Optional, number of segments, by default one per core
+play -- Optional, index of the play to split, by default the longest
+quality -- Optional, manim quality preset or its command line flag
+log -- Optional, function called with a line of text as each job finishes
+Returns:
+List of the result dictionaries from render_job, in the order their movies are joined.
+Raises a RuntimeError if a job fails, after the others have finished.
+"""
+def render_segmented(module_name, scene_name, output, segments=None, play=None, quality="low_quality", log=print):
+    from manim.constants import QUALITIES
+    from render_farm import quality_name
+    durations = play_durations(module_name, scene_name, quality)
+    if not durations:
+        raise ValueError(f"{module_name}.{scene_name} has no plays.")
+    if play == None:
+        play = max(range(len(durations)), key=lambda index: (not durations[index][1], durations[index][0]))
+    if durations[play][1]:
+        #Frozen frames, like a wait with nothing moving, are written by copying one frame and gain nothing.
+        segments = 1
+    frame_rate = QUALITIES[quality_name(quality)]["frame_rate"]
+    jobs = segment_jobs(durations, play, segments or os.cpu_count(), frame_rate)
+    with tempfile.TemporaryDirectory() as work_directory, ProcessPoolExecutor(max_workers=len(jobs)) as pool:
+        #Every job writes to its own media directory, as they all render the same scene and play.
+        futures = [pool.submit(render_job, module_name, scene_name, job, quality, os.path.join(work_directory, str(index)))
+                   for index, job in enumerate(jobs)]
+        results = []
+        for future in futures:
+            result = future.result()
+            results.append(result)
+            if log != None:
+                log(f"[{len(results)}/{len(jobs)}] plays {result['first_play']}-{result['last_play']} "
+                    f"frames {result['frames']} {result['status']} in {result['seconds']:.1f}s")
+        failures = [result for result in results if result["status"] != "ok"]
+        if failures:
+            raise RuntimeError(f"{len(failures)} of {len(jobs)} jobs failed:\n{failures[0]['error']}")
+        movies = [result["output"] for result in results if result["output"] and os.path.exists(result["output"])]
+        if len(movies) == 1:
+            os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+            shutil.copyfile(movies[0], output)
+        else:
+            concatenate_movies(movies, output)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a scene with one long play split across processes.")
+    parser.add_argument("scene", help="module.Scene to render")
+    parser.add_argument("--segments", type=int, default=os.cpu_count(), help="number of segments to split the play into")
+    parser.add_argument("--play", type=int, default=None, help="index of the play to split, by default the longest")
+    parser.add_argument("--quality", default="l", help="l, m, h, p, k or a manim quality name")
+    parser.add_argument("--output", default=None, help="movie to write, by default <Scene>.mp4")
+    args = parser.parse_args(argv)
+
+    module_name, _, scene_name = args.scene.rpartition(".")
+    output = args.output or f"{scene_name}.mp4"
+    start = time.perf_counter()
+    render_segmented(module_name, scene_name, output, args.segments, args.play, args.quality)
+    print(f"Wrote {output} in {time.perf_counter() - start:.1f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from render_farm import quality_name
+from render_patterns import PATTERN_KINDS, make_spec, parse_spec, render_pattern, warm_up
+from siteswap_patterns import parse_pattern
+
+"""
+This file contains a long running local render service for the scenes of pattern_scenes.py, so that other
+tools can ask for renders without paying for importing manim and setting up fonts on every request.
+Requests are JSON objects, one per line, sent over a Unix socket or a localhost TCP port:
+{"kind": "prechac", "pattern": "5313", "parameters": {"window_margin": 1}, "quality": "l", "id": "any"}
+where kind is one of rotation (draw_siteswap), prechac (siteswap_line and build_updaters), wrap or diagram,
+pattern is written as in siteswap_patterns.pattern_name or given as a list of throw heights, and quality,
+parameters and id are optional. {"spec": "prechac 5313 window_margin=1"} takes a render_patterns.py spec line.
+The service answers each request with JSON lines carrying the request's id: "queued" with the number of jobs
+ahead of it, "running", and then "ok" with the output path or "failed" with the error.
+Identical requests share one job, whether they arrive while it is queued, running or after it finished,
+as long as its movie still exists. Jobs run on a pool of worker processes which import manim once, at start up.
+Usage:
+python render_service.py serve --workers 4 --socket /tmp/render.sock
+python render_service.py submit 531 "prechac 5313" --socket /tmp/render.sock
+"""
+
+RENDER_SERVICE_PORT = 8765
+
+"""
+A render shared by every request for it. Events are kept, so requests joining late are sent them from the start.
+"""
+class RenderJob:
+    def __init__(self, spec, quality):
+        self.spec = spec
+        self.quality = quality
+        self.events = []
+        self.listeners = []
+        self.result = None
+
+    #Sends an event to every request following the job.
+    def publish(self, event):
+        self.events.append(event)
+        for listener in self.listeners:
+            listener.put_nowait(event)
+
+    #Returns a queue receiving the job's events, starting with the ones already published.
+    def listen(self):
+        listener = asyncio.Queue()
+        for event in self.events:
+            listener.put_nowait(event)
+        self.listeners.append(listener)
+        return listener
+
+    #Whether the job can answer a new request without rendering again.
+    def reusable(self):
+        if self.result == None:
+            return True
+        output = self.result.get("output")
+        return self.result["status"] == "ok" and output != None and os.path.exists(output)
+
+"""
+Returns the specs a request stands for. Raises a ValueError if the request can't be read.
+"""
+def request_specs(request):
+    if "spec" in request:
+        return parse_spec(request["spec"])
+    kind = request.get("kind", "rotation")
+    if kind not in PATTERN_KINDS:
+        raise ValueError(f"Unknown kind {kind!r}, expected one of {', '.join(PATTERN_KINDS)}.")
+    pattern = request.get("pattern")
+    if pattern == None:
+        raise ValueError("A request needs a pattern or a spec.")
+    throw_heights = parse_pattern(pattern) if isinstance(pattern, str) else [int(throw) for throw in pattern]
+    parameters = request.get("parameters") or {}
+    if not isinstance(parameters, dict):
+        raise ValueError("parameters should be an object.")
+    return [make_spec(kind, throw_heights, parameters)]
+
+"""
+The render service, see the top of this file.
+Inputs:
+workers -- Optional, number of worker processes
+quality -- Optional, manim quality preset used by requests which don't give one
+media_dir -- Optional, directory manim writes its output to
+cache -- Optional, whether to use the project's render cache, see render_cache.py
+"""
+class RenderService:
+    def __init__(self, workers=2, quality="l", media_dir=None, cache=True):
+        self.workers = workers
+        self.quality = quality
+        self.media_dir = media_dir
+        self.cache = cache
+        self.jobs = {}
+        self.queue = None
+        self.pool = None
+        self.runners = []
+
+    #Starts the worker processes and waits until they have imported manim, then starts taking jobs.
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=warm_up)
+        await asyncio.gather(*[loop.run_in_executor(self.pool, time.sleep, 0) for _ in range(self.workers)])
+        self.runners = [asyncio.create_task(self.run_jobs()) for _ in range(self.workers)]
+
+    def close(self):
+        for runner in self.runners:
+            runner.cancel()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    #Takes jobs from the queue one at a time, so that a job only counts as running once a worker has it.
+    async def run_jobs(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            job.publish({"status": "running"})
+            try:
+                job.result = await loop.run_in_executor(self.pool, render_pattern, job.spec, job.quality,
+                                                        self.media_dir, None, self.cache)
+            except Exception as error:
+                job.result = {"status": "failed", "error": repr(error)}
+            job.publish(job.result)
+            self.queue.task_done()
+
+    #Returns the job rendering a spec, the one already made for an identical request if it can be reused.
+    def job(self, spec, quality):
+        key = json.dumps([spec, quality_name(quality)], sort_keys=True)
+        if key not in self.jobs or not self.jobs[key].reusable():
+            job = self.jobs[key] = RenderJob(spec, quality)
+            job.publish({"status": "queued", "ahead": self.queue.qsize()})
+            self.queue.put_nowait(job)
+        return self.jobs[key]
+
+    #Answers one request, writing the events of its jobs to the connection as they happen.
+    async def answer(self, request, writer, lock):
+        async def send(message):
+            async with lock:
+                writer.write((json.dumps(message) + "\n").encode())
+                await writer.drain()
+        request_id = request.get("id")
+        try:
+            specs = request_specs(request)
+        except (ValueError, TypeError) as error:
+            await send({"id": request_id, "status": "failed", "error": str(error)})
+            return
+        async def follow(spec):
+            listener = self.job(spec, request.get("quality", self.quality)).listen()
+            while True:
+                event = await listener.get()
+                await send({"id": request_id, "scene": spec["name"], **event})
+                if event["status"] in ("ok", "failed"):
+                    return
+        await asyncio.gather(*[follow(spec) for spec in specs])
+
+    #Reads requests from a connection until it closes, answering them concurrently.
+    async def handle(self, reader, writer):
+        lock = asyncio.Lock()
+        answers = []
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("A request should be a JSON object.")
+            except ValueError as error:
+                async with lock:
+                    writer.write((json.dumps({"id": None, "status": "failed", "error": str(error)}) + "\n").encode())
+                continue
+            answers.append(asyncio.create_task(self.answer(request, writer, lock)))
+        await asyncio.gather(*answers, return_exceptions=True)
+        writer.close()
+
+    #Serves requests on a Unix socket if socket_path is given, and on a localhost TCP port otherwise, until cancelled.
+    async def serve(self, socket_path=None, port=RENDER_SERVICE_PORT):
+        await self.start()
+        try:
+            if socket_path != None:
+                server = await asyncio.start_unix_server(self.handle, path=socket_path)
+            else:
+                server = await asyncio.start_server(self.handle, host="127.0.0.1", port=port)
+            async with server:
+                print(f"Serving {socket_path or f'127.0.0.1:{port}'} with {self.workers} workers", flush=True)
+                await server.serve_forever()
+        finally:
+            self.close()
+
+"""
+Sends requests to a running service and yields the events it answers with, until every request is done.
+"""
+async def submit(requests, socket_path=None, port=RENDER_SERVICE_PORT):
+    if socket_path != None:
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+    else:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for request in requests:
+        writer.write((json.dumps(request) + "\n").encode())
+    await writer.drain()
+    writer.write_eof()
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        yield json.loads(line)
+    writer.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render pattern scenes on request, on a warm pool of workers.")
+    parser.add_argument("command", choices=["serve", "submit"], help="run the service, or send it requests")
+    parser.add_argument("specs", nargs="*", help="for submit, specs as for render_patterns.py")
+    parser.add_argument("--socket", default=None, help="Unix socket to serve or connect to")
+    parser.add_argument("--port", type=int, default=RENDER_SERVICE_PORT, help="localhost port, if no socket is given")
+    parser.add_argument("--workers", type=int, default=2, help="number of worker processes")
+    parser.add_argument("--quality", default="l", help="l, m, h, p, k or a manim quality name")
+    parser.add_argument("--media-dir", default=None, help="directory manim writes its output to")
+    parser.add_argument("--no-cache", action="store_true", help="don't use the project's render cache")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        service = RenderService(args.workers, args.quality, args.media_dir, not args.no_cache)
+        try:
+            asyncio.run(service.serve(args.socket, args.port))
+        except KeyboardInterrupt:
+            pass
+        return 0
+    async def run():
+        failed = False
+        requests = [{"spec": spec, "id": spec, "quality": args.quality} for spec in args.specs]
+        async for event in submit(requests, args.socket, args.port):
+            print(json.dumps(event), flush=True)
+            failed |= event["status"] == "failed"
+        return 1 if failed else 0
+    return asyncio.run(run())
+
+if __name__ == "__main__":
+    sys.exit(main())
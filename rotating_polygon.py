@@ -1,6 +1,12 @@
 from manim import *
 import numpy as np
 
+from glyph_cache import cached_text
+from motion_tracks import track_updater
+from siteswap_patterns import check_siteswap
+from static_layer import StaticLayerScene
+from throw_arc import THROW_FACTORY
+
 """
 This file contains functions and scenes concering decorating
 a rotating polygon with labels and arrows.
@@ -15,6 +21,94 @@ NumberLine.set_default(color=BLACK)
 DecimalNumber.set_default(color=BLACK) """
 
 
+"""
+Returns the center, angle and circumradius of a polygon clock made by rotation_scene, in closed form
+from its first two vertices. The angle is how far the clock has turned counterclockwise from its
+starting position, with vertex 0 pointing north. This stays correct however the polygon has been
+rotated, shifted or scaled, whether by an animation or an updater.
+"""
+def clock_state(polygon):
+    N = polygon.clock_size
+    vertex0, vertex1 = polygon.points[0], polygon.points[4]
+    side = vertex1 - vertex0
+    angle = angle_of_vector(side) + PI/N
+    radius = np.linalg.norm(side)/(2*np.sin(PI/N))
+    center = vertex0 - radius*np.array([np.cos(PI/2 + angle), np.sin(PI/2 + angle), 0])
+    return center, angle, radius
+
+"""
+Returns the positions at a given scale of a polygon clock's vertices, center + scale*(vertex - center),
+as an (N, 3) array. Scale 1 gives the vertices themselves. The table is computed once per frame from the
+clock's angle and reused by every label, arc and loop reading it, until the polygon moves again.
+Polygons not made by rotation_scene fall back to their vertices and bounding box center.
+"""
+def clock_positions(polygon, scale=1):
+    if not hasattr(polygon, "clock_size") or polygon.clock_size < 2:
+        vertices = polygon.get_vertices()
+        center = polygon.get_center()
+        return center + scale*(vertices - center)
+    key = polygon.points[[0, 4]].tobytes()
+    if getattr(polygon, "clock_key", None) != key:
+        center, angle, radius = clock_state(polygon)
+        angles = PI/2 - TAU*np.arange(polygon.clock_size)/polygon.clock_size + angle
+        polygon.clock_key = key
+        polygon.clock_center = center
+        polygon.clock_offsets = radius*np.column_stack([np.cos(angles), np.sin(angles), np.zeros(len(angles))])
+        polygon.clock_table = {}
+    if scale not in polygon.clock_table:
+        polygon.clock_table[scale] = polygon.clock_center + scale*polygon.clock_offsets
+    return polygon.clock_table[scale]
+
+"""
+Returns the center of a polygon clock, the center of its circumcircle.
+"""
+def clock_center(polygon):
+    if not hasattr(polygon, "clock_size") or polygon.clock_size < 2:
+        return polygon.get_center()
+    clock_positions(polygon)
+    return polygon.clock_center
+
+"""
+Rotates a mobject to a given absolute angle about a fixed point, starting from the points it had
+the first time it was called, instead of by an increment from wherever it is now. Updaters using it
+don't accumulate floating point drift over long rotations.
+Inputs:
+mobject -- the Mobject to rotate, along with its submobjects
+angle -- angle in radians, counterclockwise, from the mobject's reference position
+about_point -- Optional, the point to rotate about, by default the mobject's center at the first call
+"""
+def set_rotation(mobject, angle, about_point=None):
+    family = mobject.get_family()
+    if getattr(mobject, "reference_points", None) is None:
+        mobject.reference_points = [submobject.points.copy() for submobject in family]
+        mobject.reference_center = np.array(mobject.get_center() if about_point is None else about_point)
+    matrix = rotation_matrix(angle, OUT)
+    for submobject, points in zip(family, mobject.reference_points):
+        submobject.points = (points - mobject.reference_center) @ matrix.T + mobject.reference_center
+    return mobject
+
+"""
+Moves a mobject to a given offset from the points it had the first time it was called, like set_rotation,
+instead of shifting it by an increment from wherever it is now.
+"""
+def set_translation(mobject, offset):
+    family = mobject.get_family()
+    if getattr(mobject, "reference_offset_points", None) is None:
+        mobject.reference_offset_points = [submobject.points.copy() for submobject in family]
+    for submobject, points in zip(family, mobject.reference_offset_points):
+        submobject.points = points + offset
+    return mobject
+
+"""
+The clock scenes slide a line by time and turn a 12 hour clock by time hours. These return the line's offset
+and the clock's angle at a time. Both are linear, so unlike line_on_circle they aren't sampled into motion tracks.
+"""
+def clock_offset(time):
+    return time*RIGHT
+
+def clock_angle(time):
+    return -time*TAU/12
+
 """
 This function returns a loop with an arrow attached to a given vertex of a polygon.
 Inputs:
@@ -23,39 +117,26 @@ throw_index -- Integer less than the number of sides in the polygon,
 polygon -- a Polygon object
 loop_radius -- A float specifying the radius of the loop
 Returns:
-VGroup of the loop, a ParametricFunction, and a Polygon acting as the triangular tip.
+VGroup of the loop, a circular arc leaving a tenth of a turn open, and the filled triangular tip
+pointing back into the vertex. Its points are a rotated copy of THROW_FACTORY's template for the radius.
 """
 def get_loop(throw_index, polygon, loop_radius):
-    angle_remaining = 0.1*TAU
-    start = polygon.get_vertices()[throw_index]
-    center_to_start = start - polygon.get_center()
-    center = start + (loop_radius/np.linalg.norm(center_to_start))*(center_to_start)
-    start_angle = angle_of_vector(center_to_start) - PI
-    end_angle = start_angle + TAU - angle_remaining
-    def circle_param(t):
-        return center + loop_radius*np.array([np.cos(t), np.sin(t), 0])
-    loop = ParametricFunction(circle_param, t_range=[start_angle, end_angle])
-    altitude = start - circle_param(end_angle)
-    tip_displacement = np.array([altitude[1], -altitude[0], 0])/np.sqrt(3)
-    vertex1 = circle_param(end_angle) + tip_displacement
-    vertex2 = circle_param(end_angle) - tip_displacement
-    tip = Polygon(start, vertex1, vertex2, fill_opacity=1, color=loop.color)
-    return VGroup(loop, tip)
-
-"""
-Returns a CurvedArrow pointing between two specified vertices on a polygon.
+    return THROW_FACTORY.loop(clock_positions(polygon)[throw_index], clock_center(polygon), loop_radius)
+
+"""
+Returns a ThrowArc, drawn like a CurvedArrow, pointing between two specified vertices on a polygon.
+Its points are a rotated copy of THROW_FACTORY's template for the chord length.
 Inputs:
-throw_index -- Tail of CurvedArrow
-catch_index -- Tip of CurvedArrow
+throw_index -- Tail of the arc
+catch_index -- Tip of the arc
 polygon -- Polygon object to attach to
 """
 def get_arc(throw_index, catch_index, polygon):
-    start = polygon.get_vertices()[throw_index]
-    end = polygon.get_vertices()[catch_index]
-    arc = CurvedArrow(start, end, angle=-TAU/4)
+    vertices = clock_positions(polygon)
+    arc = THROW_FACTORY.arc(vertices[throw_index], vertices[catch_index])
     arc.throw_index = throw_index
     arc.catch_index = catch_index
-    return CurvedArrow(start, end, angle=-TAU/4)
+    return arc
 
 """
 Sets up a scene to have a polygon with prescribed labels on the vertices, with or without arcs drawn between vertices, to other specified parameters. The polygon's vertices start pointing north, increasing in index moving clockwise.
@@ -69,7 +150,8 @@ fixed_labels -- Optional, boolean whether to include an additional set of labels
 draw_arcs -- Optional boolean, whether to draw arcs on the polygon, only to be used when the label values are given as throw heights in a siteswap.
 Returns:
 Nothing, but adds attributes scene.polygon, scene.moving_labels, scene.fixed_labels, scene.arcs 
-to scene, also adds all these objects to the scene, displaying them.
+to scene, also adds all these objects to the scene, displaying them. Labels are placed from the
+table of clock_positions, so they follow the polygon however it is rotated.
 """
 def rotation_scene(scene : Scene, N : int, polygon_radius=1.5, label_values = None, fixed_labels=True, draw_arcs=False, loop_radius=0.5):
     if label_values == None:
@@ -79,13 +161,10 @@ def rotation_scene(scene : Scene, N : int, polygon_radius=1.5, label_values = No
         angle = np.pi/2 - 2*i*np.pi/N
         vertices.append(polygon_radius*np.array([np.cos(angle), np.sin(angle), 0]))
     scene.polygon = Polygon(*vertices)
+    scene.polygon.clock_size = N
     scene.add(scene.polygon)
-    def get_moving_position(i):
-        shift_dir = scene.polygon.get_vertices()[i] - scene.polygon.get_center()
-        moving_position = scene.polygon.get_center() + 1.5*shift_dir
-        return moving_position
     def label_updater(label):
-        label.move_to(get_moving_position(label.index))
+        label.move_to(clock_positions(scene.polygon, 1.5)[label.index])
 
     
     scene.moving_labels = []
@@ -105,16 +184,15 @@ def rotation_scene(scene : Scene, N : int, polygon_radius=1.5, label_values = No
                 scene.polygon.add(loop)
         scene.arcs = arcs
     for i in range(N):
-        moving_label = Text(str(label_values[i]))
+        moving_label = cached_text(str(label_values[i]))
         moving_label.index = i
         moving_label.add_updater(label_updater)
         label_updater(moving_label)
         scene.moving_labels.append(moving_label)
         scene.add(moving_label)
         if fixed_labels:
-            shift_dir = scene.polygon.get_vertices()[i] - scene.polygon.get_center()
-            label_position = scene.polygon.get_center() + 2*shift_dir
-            fixed_label = Text(str(i), color=ORANGE).move_to(label_position)
+            label_position = clock_positions(scene.polygon, 2)[i]
+            fixed_label = cached_text(str(i), color=ORANGE).move_to(label_position)
             scene.fixed_labels.append(fixed_label)
             scene.add(fixed_label)
     scene.add(scene.polygon)
@@ -129,8 +207,10 @@ polygon_radius -- Optional, radius of the circumcircle of the polygon
 loop_radius -- Optional, radius of any loops in the siteswap diagram, 
                arrows landing on the same beat they were thrown at, corresponding to
                throw heights that are a multiple of the period.
+Raises a ValueError if throw_heights is not a valid siteswap.
 """
 def draw_siteswap(scene, throw_heights, polygon_radius=1.5, loop_radius=0.5):
+    check_siteswap(throw_heights)
     rotation_scene(scene, len(throw_heights), polygon_radius=polygon_radius, 
                    label_values=throw_heights, fixed_labels=False, 
                    draw_arcs=True, loop_radius=0.5)
@@ -185,13 +265,13 @@ class rotation_twelve_twelve(Scene):
     def construct(self):
         self.camera.background_color = WHITE
         rotation_scene(self, 12)
-        rotation_tracker = Text("Rotating 1 turn").align_on_border(UP + LEFT)
+        rotation_tracker = cached_text("Rotating 1 turn").align_on_border(UP + LEFT)
         self.add(rotation_tracker)
         for i in range(12):
             turn_text = "Rotating " + str(i + 1) + " turn"
             if i != 0:
                 turn_text += "s"
-            rotation_tracker.become(Text(turn_text), match_center=True)
+            rotation_tracker.become(cached_text(turn_text), match_center=True)
             self.play(Rotate(self.polygon, -2*PI/12))
             self.wait(0.5)
         self.wait(3)
@@ -239,8 +319,6 @@ class slide_and_rotate(Scene):
         self.add(line2)
         self.add(line)
         time = ValueTracker(0)
-        self.polygon.angle = time.get_value()
-        line.position = time.get_value()
         line_start = line.n2p(0)
         line_end = line2.n2p(4)
         line_moving_arrow = Arrow(line_start + UP*1.5, line_start)
@@ -254,16 +332,12 @@ class slide_and_rotate(Scene):
         polygon_moving_arrow = Arrow(self.polygon.get_center(), polygon_start)
         self.add(polygon_fixed_arrow)
         self.add(polygon_moving_arrow)
-        def line_updater(mobject : Mobject):
-            mobject.shift((time.get_value() - mobject.position)*RIGHT)
-            line_moving_arrow.shift((time.get_value() - mobject.position)*RIGHT)
-            mobject.position = time.get_value()
-        def polygon_updater(mobject : Mobject):
-            mobject.rotate((time.get_value() - mobject.angle)*(-TAU/12))
-            polygon_moving_arrow.rotate((time.get_value() - mobject.angle)*(-TAU/12), about_point=mobject.get_center())
-            mobject.angle = time.get_value()
-        line.add_updater(line_updater)
-        self.polygon.add_updater(polygon_updater)
+        def polygon_updater(mobject : Mobject, angle):
+            set_rotation(mobject, angle)
+            set_rotation(polygon_moving_arrow, angle, about_point=mobject.reference_center)
+        line.add_updater(track_updater(time, set_translation, clock_offset))
+        line_moving_arrow.add_updater(track_updater(time, set_translation, clock_offset))
+        self.polygon.add_updater(track_updater(time, polygon_updater, clock_angle))
         self.wait()
         self.play(time.animate.set_value(4), run_time=4)
         self.wait(4)
@@ -272,7 +346,7 @@ class slide_and_rotate(Scene):
 A scene demonstrating the fact that addition on the number line corresponds to
 composition of rotating actions on the clock.
 """
-class homomorphism(Scene):
+class homomorphism(StaticLayerScene, Scene):
     def construct(self):
         Text.set_default(color=WHITE)
         Arrow.set_default(color=WHITE)
@@ -293,18 +367,9 @@ class homomorphism(Scene):
         self.add(arrow3)
         self.add(arrow5)
         time = ValueTracker(0)
-        self.polygon.angle = time.get_value()
-        line.position = time.get_value()
-        moving_arrow.position = time.get_value()
-        def line_updater(mobject : Mobject):
-            mobject.shift((time.get_value() - mobject.position)*RIGHT)
-            mobject.position = time.get_value()
-        def polygon_updater(mobject : Mobject):
-            mobject.rotate((time.get_value() - mobject.angle)*(-TAU/12))
-            mobject.angle = time.get_value()
-        line.add_updater(line_updater)
-        moving_arrow.add_updater(line_updater)
-        self.polygon.add_updater(polygon_updater)
+        line.add_updater(track_updater(time, set_translation, clock_offset))
+        moving_arrow.add_updater(track_updater(time, set_translation, clock_offset))
+        self.polygon.add_updater(track_updater(time, set_rotation, clock_angle))
         self.play(time.animate.set_value(3), run_time=3)
         self.wait(2)
         self.play(time.animate.set_value(5), run_time=3)
@@ -314,7 +379,7 @@ class homomorphism(Scene):
 A scene demonstrating the fact that for any number x on the number line,
 there is a unique sliding action sending 0 to x.
 """
-class slide(Scene):
+class slide(StaticLayerScene, Scene):
     def construct(self):
         #self.camera.background_color = WHITE
         line = NumberLine(x_range=[-12,12], include_numbers=True, font_size=75)
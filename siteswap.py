@@ -1,6 +1,10 @@
 from manim import *
 import numpy as np
 
+from siteswap_patterns import orbit_colors
+from static_layer import StaticLayerScene
+from throw_arc import QuadraticThrow
+
 """
 This file contains methods around building an animation showing that a 
 juggling pattern of period N can be visualized on an N hour polygonal clock.
@@ -36,37 +40,116 @@ def cartesian_to_cylindrical(x, y, z):
     r = np.sqrt(x**2 + y**2)
     return np.array([r, u, z])
 
+"""
+Array version of cylindrical_to_cartesian. Takes in an (N, 3) array whose rows are
+cylindrical coordinates (r, u, v), and outputs the (N, 3) array of their Cartesian coordinates.
+"""
+def cylindrical_to_cartesian_array(points):
+    points = np.asarray(points, dtype=float)
+    r, u, v = points[:, 0], points[:, 1], points[:, 2]
+    return np.column_stack([r*np.cos(u), r*np.sin(u), v])
+
+"""
+Array version of cartesian_to_cylindrical. Takes in an (N, 3) array of Cartesian coordinates,
+and outputs the (N, 3) array of their cylindrical coordinates, with the same choice of
+singularity along the negative y axis.
+"""
+def cartesian_to_cylindrical_array(points):
+    points = np.asarray(points, dtype=float)
+    x, y, z = points[:, 0], points[:, 1], points[:, 2]
+    slope = np.divide(y, x, out=np.zeros_like(y), where=(x != 0))
+    u = np.where(x > 0, np.arctan(slope), np.arctan(slope) + np.pi)
+    u = np.where(x == 0, np.where(y > 0, np.pi/2, 0), u)
+    r = np.sqrt(x**2 + y**2)
+    return np.column_stack([r, u, z])
+
+"""
+Returns the origin and unit vectors of an Axes object, so that
+Axes.c2p(a, b) == origin + a*x_unit + b*y_unit. Used to convert whole point arrays
+between scene and axes coordinates without calling c2p/p2c once per point.
+"""
+def axes_affine_frame(Axes):
+    origin = np.array(Axes.c2p(0, 0), dtype=float)
+    x_unit = np.array(Axes.c2p(1, 0), dtype=float) - origin
+    y_unit = np.array(Axes.c2p(0, 1), dtype=float) - origin
+    return origin, x_unit, y_unit
+
 """
 A homomotopy visualizing the map (x, y, z) --> (1+y)e^{-2*pi*ix} where horizontal lines wrap around a circle of radius 1 + the y value. 
 Inputs:
 x, y, z, t - floats indicating the spatial and temporal coordinates of the homotopy
 Axes -- optional Axes object. If supplied the homotopy will be performed in its coordinates.
+period -- optional, number of beats wrapped once around the circle, the period of the pattern.
 """
-def wrap_homotopy(x : float, y : float, z : float, t : float, Axes=None):
+def wrap_homotopy(x : float, y : float, z : float, t : float, Axes=None, period=3):
     if Axes != None:
         axes_coordinates = Axes.p2c(np.array([x,y,z]))
         cylindrical_start = cartesian_to_cylindrical(*axes_coordinates, 0)
         cylindrical_end = np.array([1 + axes_coordinates[1], 
-                                    -2*np.pi*axes_coordinates[0]/3 + 2*np.pi/3, 
+                                    -2*np.pi*axes_coordinates[0]/period + 2*np.pi/period, 
                                     0])
         array_homotopy = cylindrical_to_cartesian(*((1-t)*cylindrical_start + t*cylindrical_end))
         array_homotopy = Axes.c2p(array_homotopy[0], array_homotopy[1])
         return tuple(array_homotopy)
     else:
         cylindrical_start = cartesian_to_cylindrical(x, y, z)
-        cylindrical_end = np.array([1 +y, -2*np.pi*x/3 + 2*np.pi/3, 0])
+        cylindrical_end = np.array([1 +y, -2*np.pi*x/period + 2*np.pi/period, 0])
         array_homotopy = cylindrical_to_cartesian(*((1-t)*cylindrical_start + t*cylindrical_end))
         return tuple(array_homotopy)
 
+"""
+Array version of wrap_homotopy, applying the same homotopy to every row of an (N, 3) point array
+in one call.
+Inputs:
+points -- (N, 3) array of points
+t -- float, the time parameter of the homotopy
+Axes -- optional Axes object. If supplied the homotopy will be performed in its coordinates.
+period -- optional, number of beats wrapped once around the circle, the period of the pattern.
+Returns:
+(N, 3) array of the image points, equal row by row to the output of wrap_homotopy.
+"""
+def wrap_homotopy_array(points, t : float, Axes=None, period=3):
+    points = np.asarray(points, dtype=float)
+    if Axes != None:
+        origin, x_unit, y_unit = axes_affine_frame(Axes)
+        basis = np.array([x_unit[:2], y_unit[:2]]).T
+        axes_coordinates = np.linalg.solve(basis, (points[:, :2] - origin[:2]).T).T
+        a, b = axes_coordinates[:, 0], axes_coordinates[:, 1]
+        cylindrical_start = cartesian_to_cylindrical_array(np.column_stack([a, b, np.zeros_like(a)]))
+        cylindrical_end = np.column_stack([1 + b, -2*np.pi*a/period + 2*np.pi/period, np.zeros_like(a)])
+        cartesian_homotopy = cylindrical_to_cartesian_array((1-t)*cylindrical_start + t*cylindrical_end)
+        return origin + np.outer(cartesian_homotopy[:, 0], x_unit) + np.outer(cartesian_homotopy[:, 1], y_unit)
+    else:
+        x, y = points[:, 0], points[:, 1]
+        cylindrical_start = cartesian_to_cylindrical_array(points)
+        cylindrical_end = np.column_stack([1 + y, -2*np.pi*x/period + 2*np.pi/period, np.zeros_like(x)])
+        return cylindrical_to_cartesian_array((1-t)*cylindrical_start + t*cylindrical_end)
+
+#Number of exact pieces per beat a throw is split into, so that the wrap homotopy has enough points to bend it.
+WRAP_PIECES_PER_BEAT = 4
+
+"""
+Returns the control points of the quadratic Bezier curve connecting two points on the x-axis of a given
+Axes object, as a (3, 3) array.
+"""
+def throw_controls(i, j, axes):
+    return np.array([axes.c2p(i, 0), axes.c2p((i + j)/2, (j - i)), axes.c2p(j, 0)])
+
 """
 Returns a quadratic Bezier curve connecting two points on the x-axis of a given 
 Axes object. 
 """
 def throw_func(i, j, axes):
-    midpoint = axes.c2p((i + j)/2, (j - i))
-    return bezier(np.array([axes.c2p(i, 0), midpoint, axes.c2p(j, 0)]))
+    return bezier(throw_controls(i, j, axes))
     #return lambda t: np.array([t, -(1/3)*(t-P[0])*(t-Q[0]), 0])
 
+"""
+Returns the throw from beat i to beat j on the x-axis of an Axes object as a QuadraticThrow,
+split into WRAP_PIECES_PER_BEAT exact pieces per beat it spans, ready to be wrapped.
+"""
+def wrap_throw(i, j, axes, **kwargs):
+    return QuadraticThrow(throw_controls(i, j, axes), pieces=max(1, int(np.ceil(WRAP_PIECES_PER_BEAT*abs(j - i)))), **kwargs)
+
 
 #An animation that applies a given homotopy to the center of a mobject,
 #changing its position but not its shape or size.
@@ -82,11 +165,18 @@ class center_only_homotopy(Animation):
         self.mobject.move_to(self.function_at_time_t(t)(self.start))
 
 
+#A Homotopy whose homotopy acts on whole (N, 3) point arrays, as in wrap_homotopy_array,
+#instead of being called once per point. It moves every point of a submobject in one call per frame.
+class array_homotopy(Homotopy):
+    def interpolate_submobject(self, submobject, starting_submobject, alpha: float):
+        submobject.points = self.homotopy(starting_submobject.points, alpha)
+
+
 """
 A Scene showing that a juggling pattern of period 3 can be recorded 
 on a 3 hour triangular clock.
 """
-class siteswap(Scene):
+class siteswap(StaticLayerScene, Scene):
     def construct(self):
         config.frame_height = 12
         x_start = 1
@@ -100,11 +190,11 @@ class siteswap(Scene):
         center_wrapping_objects = []
         self.add(axes)
         throw_heights = [5, 3, 1]
-        colors = ['#648FFF', '#DC267F', '#FFB000']
+        colors = orbit_colors(throw_heights)
         for i in range(1, x_end+1):
-            color = colors[i%3]
+            color = colors[(i - 1) % 3]
             throw_height = throw_heights[(i - 1) % 3]
-            throw = ParametricFunction(throw_func(i, i + throw_height, axes), t_range=[0, 1], color=color)
+            throw = wrap_throw(i, i + throw_height, axes, color=color)
             wrapping_objects.append(throw)
             dot = Dot(color=color).move_to(axes.c2p(i, 0))
             square = Square(0.5, color=color).move_to(axes.c2p(i + throw_height, 0))
@@ -113,7 +203,7 @@ class siteswap(Scene):
         homotopies = []
         for ob in wrapping_objects:
             self.add(ob)
-            homotopies.append(Homotopy(mobject=ob, homotopy= lambda x, y, z, t : wrap_homotopy(x,y,z,t, Axes=axes), rate_func=smooth, run_time=8))
+            homotopies.append(array_homotopy(mobject=ob, homotopy= lambda points, t : wrap_homotopy_array(points, t, Axes=axes), rate_func=smooth, run_time=8))
         for ob in center_wrapping_objects:
             self.add(ob)
             homotopies.append(center_only_homotopy(ob, homotopy= lambda x, y, z, t : wrap_homotopy(x,y,z,t, Axes=axes), rate_func=smooth, run_time=8))
@@ -1,35 +1,149 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import matplotlib
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
 import numpy as np
 
+from siteswap_patterns import ORBIT_COLORS, orbit_labels, parse_pattern, pattern_name
+
+"""
+This file draws siteswap diagrams with matplotlib: every throw as a parabola from the beat it is
+thrown on to the beat it is caught on. make_plot shows a diagram in a window, and export_plots writes
+diagrams for a whole list of patterns to image files without opening any windows.
+Usage:
+python siteswap_diagram.py
+python siteswap_diagram.py 531 441 7531 --directory diagrams --format png svg --processes 8
+"""
+
 def throw_func(throw, catch):
     return lambda x : -(x - throw)*(x - catch)*(1/(catch - throw))
 
-def make_plot(throw_heights, colors=None, cycles=3):
-    plot, axes = plt.subplots()
+"""
+Returns the points of every throw of a pattern over a range of beats, evaluated at once.
+A throw of height h from beat i is the parabola y = t(1 - t)h at x = i + th, for t from 0 to 1,
+which is throw_func(i, i + h). Throws of height 0 aren't drawn.
+Inputs:
+throw_heights -- list of periodic throw heights in the pattern
+start, end -- first beat and one past the last beat to draw throws from
+samples_per_beat -- Optional, number of points per beat of the highest throw
+Returns:
+beats -- array of the beats the throws are made from
+arcs -- (len(beats), samples, 2) array of the points of each throw
+"""
+def throw_arcs(throw_heights, start, end, samples_per_beat=50):
+    N = len(throw_heights)
+    beats = np.arange(start, end)
+    heights = np.asarray(throw_heights, dtype=float)[beats % N]
+    beats, heights = beats[heights > 0], heights[heights > 0]
+    if len(beats) == 0:
+        return beats, np.zeros((0, 2, 2))
+    t = np.linspace(0, 1, int(samples_per_beat*heights.max()) + 1)
+    x = beats[:, None] + t[None, :]*heights[:, None]
+    y = t[None, :]*(1 - t[None, :])*heights[:, None]
+    return beats, np.stack([x, y], axis=2)
+
+"""
+Draws the diagram of a pattern onto a matplotlib Axes, as a single LineCollection holding every throw.
+Inputs:
+axes -- matplotlib Axes to draw onto
+throw_heights -- list of periodic throw heights in the pattern
+colors -- Optional, list of matplotlib colors, the throws of ball orbit k get colors[k % len(colors)],
+          see siteswap_patterns.ball_orbits. By default siteswap_patterns.ORBIT_COLORS.
+cycles -- Optional, number of periods drawn either side of beat 0
+"""
+def draw_diagram(axes, throw_heights, colors=None, cycles=3):
     axes.set_yticks([])
     axes.tick_params(labelsize=20)
     N = len(throw_heights)
     start = -cycles*N
     end = cycles*N + 1
-    tick_locations = np.arange(start, end, 1)
-    tick_labels = []
-    for i in range(start, end):
-        tick_labels.append(str(throw_heights[i % N]))
-    axes.set_xticks(tick_locations)
-    axes.set_xticklabels(tick_labels)
-    
-    for i in range(start, end):
-        if throw_heights[i % N] == 0:
-            pass
-        catch = i + throw_heights[i % N]
-        x = np.linspace(i, catch, 50*np.abs(catch - i))
-        y = np.apply_along_axis(throw_func(x[0], x[-1]), 0, x)
-        if colors == None:
-            color = 'r'
-        else:
-            color = colors[i % len(colors)]
-        plt.plot(x, y, color)
+    axes.set_xticks(np.arange(start, end, 1))
+    axes.set_xticklabels([str(throw_heights[i % N]) for i in range(start, end)])
+    beats, arcs = throw_arcs(throw_heights, start, end)
+    colors = ORBIT_COLORS if colors == None else colors
+    orbits = np.array(orbit_labels(throw_heights))[beats % N] % len(colors)
+    axes.add_collection(LineCollection(arcs, colors=[colors[k] for k in orbits]))
+    axes.autoscale_view()
+    return axes
+
+def make_plot(throw_heights, colors=None, cycles=3):
+    plot, axes = plt.subplots()
+    draw_diagram(axes, throw_heights, colors, cycles)
     plt.show()
 
-make_plot([5,3,1], colors=['r','k','b','b','k','r'], cycles=4)
\ No newline at end of file
+"""
+Returns the diagram of a pattern as a matplotlib Figure drawn with the Agg canvas,
+which never opens a window, so it can be used from scripts and worker processes.
+Takes the same inputs as draw_diagram.
+"""
+def diagram_figure(throw_heights, colors=None, cycles=3):
+    figure = Figure()
+    FigureCanvasAgg(figure)
+    draw_diagram(figure.add_subplot(), throw_heights, colors, cycles)
+    return figure
+
+"""
+Writes the diagram of one pattern to one file per format and returns the paths written.
+Inputs:
+throw_heights -- list of periodic throw heights in the pattern
+directory -- directory to write to, the files are named after the pattern
+formats -- Optional, list of file formats matplotlib can save, e.g. ["png", "svg"]
+colors, cycles -- Optional, as for draw_diagram
+dpi -- Optional, resolution of raster formats
+"""
+def export_plot(throw_heights, directory, formats=("png",), colors=None, cycles=3, dpi=100):
+    figure = diagram_figure(throw_heights, colors, cycles)
+    paths = []
+    for file_format in formats:
+        path = os.path.join(directory, f"{pattern_name(throw_heights)}.{file_format}")
+        figure.savefig(path, format=file_format, dpi=dpi)
+        paths.append(path)
+    return paths
+
+"""
+Writes the diagrams of a list of patterns to image files, without opening any windows.
+Inputs:
+patterns -- list of lists of throw heights
+directory -- directory to write to, created if needed. Files are named after the patterns, e.g. 531.png
+formats -- Optional, list of file formats matplotlib can save, e.g. ["png", "svg"]
+colors, cycles -- Optional, as for draw_diagram, shared by every pattern
+processes -- Optional, number of worker processes to draw with. By default the diagrams are drawn in this process.
+dpi -- Optional, resolution of raster formats
+Returns:
+List of the paths written.
+"""
+def export_plots(patterns, directory, formats=("png",), colors=None, cycles=3, processes=None, dpi=100):
+    os.makedirs(directory, exist_ok=True)
+    patterns = [list(pattern) for pattern in patterns]
+    arguments = [(pattern, directory, tuple(formats), colors, cycles, dpi) for pattern in patterns]
+    if processes == None or processes <= 1:
+        results = [export_plot(*argument) for argument in arguments]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(export_plot, *zip(*arguments), chunksize=max(1, len(arguments)//(4*processes))))
+    return [path for paths in results for path in paths]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Draw siteswap diagrams.")
+    parser.add_argument("patterns", nargs="*", help="patterns to export, e.g. 531 or 7a3, with a-z for throws of 10 to 35")
+    parser.add_argument("--directory", default="diagrams", help="directory to write the diagrams to")
+    parser.add_argument("--format", nargs="+", default=["png"], help="file formats to write, e.g. png svg")
+    parser.add_argument("--cycles", type=int, default=3, help="number of periods drawn either side of beat 0")
+    parser.add_argument("--processes", type=int, default=None, help="number of worker processes")
+    args = parser.parse_args(argv)
+
+    if not args.patterns:
+        make_plot([5,3,1], cycles=4)
+        return 0
+    patterns = [parse_pattern(pattern) for pattern in args.patterns]
+    for path in export_plots(patterns, args.directory, args.format, cycles=args.cycles, processes=args.processes):
+        print(path)
+    return 0
+
+if __name__ == "__main__":
+    main()
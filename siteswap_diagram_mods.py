@@ -1,7 +1,12 @@
 from manim import *
 import numpy as np
 
-def diagram(throw_heights, endpoints, throws_to_modify=[], angle=-np.pi/2):
+from beat_solver import BeatStateSolver
+from beat_window import BeatWindow, window_line
+from glyph_cache import cached_decimal
+from throw_arc import ThrowArc
+
+def diagram(throw_heights, endpoints, throws_to_modify=[], angle=-np.pi/1.2):
     line = NumberLine(x_range=endpoints)
     N = len(throw_heights)
     h = max(throw_heights)
@@ -9,15 +14,47 @@ def diagram(throw_heights, endpoints, throws_to_modify=[], angle=-np.pi/2):
     throws = []
 
     for i in range(endpoints[0], endpoints[1] + 1):
-        label_dict[i] = DecimalNumber(throw_heights[i%N], 1, edge_to_fix=ORIGIN)
+        label_dict[i] = cached_decimal(throw_heights[i%N], 1, edge_to_fix=ORIGIN)
         catch_pos = i + throw_heights[i % N]
-        throw = CurvedArrow(line.n2p(i), line.n2p(catch_pos), angle=-PI/1.2)
+        throw = ThrowArc(line.n2p(i), line.n2p(catch_pos), angle=angle)
         throw.throw_pos = i
         throw.catch_pos = catch_pos
         line.add(throw)
         throws.append(throw)
     line.add_labels(label_dict, font_size=70)
     return line, throws
+
+"""
+A windowed version of diagram, which only builds the beats near the frame and recycles them as the line moves,
+so its cost doesn't grow with the range of endpoints. The throws and labels are placed by a BeatStateSolver.
+Inputs:
+throw_heights -- list of periodic throw heights in the pattern
+endpoints -- list of integers of length 2, start and end beats of the diagram
+trackers -- Optional, list of ValueTrackers the throws and labels depend on
+beat_spec -- Optional, function from a beat to the dictionary described in beat_window.py,
+             by default the fixed throws and labels of diagram
+angle -- Optional, angle of the throws' arcs for the default beat_spec
+margin -- Optional, distance beyond the edge of the frame whose beats are still built
+reach -- Optional, number of beats built beyond the frame on either side, by default the largest throw
+Returns:
+line -- the NumberLine
+solver -- the BeatStateSolver placing its throws and labels, to attach to the scene
+window -- the BeatWindow building its beats
+"""
+def windowed_diagram(throw_heights, endpoints, trackers=[], beat_spec=None, angle=-np.pi/1.2, margin=1, reach=None):
+    N = len(throw_heights)
+    if reach is None:
+        reach = max(throw_heights)
+    if beat_spec is None:
+        def beat_spec(beat):
+            return {"catch_position": beat + throw_heights[beat % N], "angle": angle,
+                    "label_value": throw_heights[beat % N], "num_decimal_places": 1}
+    line = window_line(endpoints, reach, margin)
+    line.shift(-line.n2p(line.window_center)[0]*RIGHT)
+    solver = BeatStateSolver([line], trackers)
+    window = BeatWindow(solver, 0, endpoints, beat_spec, reach, margin)
+    solver.update()
+    return line, solver, window
     
 
 def swap_throw_heights(throw_heights, a, b):
@@ -40,6 +77,9 @@ def swap_throw_heights(throw_heights, a, b):
 
 
 class fivethreeone(Scene):
+    #Setting window_margin builds the diagram with windowed_diagram instead.
+    window_margin = None
+
     def construct(self):
         throw_heights = [5, 3, 1]
         period_positions = [2]
@@ -57,31 +97,47 @@ class fivethreeone(Scene):
             else:
                 return swap_modifier
 
-        line, throws = diagram(throw_heights, endpoints, angle=Angle)
-        self.add(line)
-        for throw in throws:
-            self.add(throw)
-        self.play(line.animate.shift(RIGHT))
-        def throw_updater(throw : CurvedArrow):
-            catch_position = throw.throw_pos + get_throw_height(throw.throw_pos)
-            throw.become(CurvedArrow(line.n2p(throw.throw_pos), 
-                         line.n2p(catch_position), 
-                         angle=Angle, 
-                         color=throw.color))
-        
-        def label_updater(label : DecimalNumber):
-            label.set_value(get_throw_height(label.position))
-        for i in range(endpoints[0], endpoints[1] + 1):
-            throw = throws[i - endpoints[0]]
-            throw.add_updater(throw_updater)
-            if i % N in period_positions or i % N in swap_positions:
-                throw.set(color=ORANGE)
-                label = line.labels[i - endpoints[0]]
-                label.set(num_decimal_places=1, color=ORANGE)
-                label.position = i
-                label.add_updater(label_updater)
-        self.wait()
         swapped_throw_heights = swap_throw_heights(throw_heights, 0, 1)
+        if self.window_margin != None:
+            def beat_spec(beat):
+                i = beat % N
+                coefficients = [swapped_throw_heights[i] - throw_heights[i], int(i in period_positions)]
+                color = ORANGE if i in period_positions or i in swap_positions else WHITE
+                return {"catch_position": beat + throw_heights[i], "catch_coefficients": coefficients,
+                        "angle": Angle, "color": color, "label_value": throw_heights[i],
+                        "label_coefficients": coefficients, "num_decimal_places": 1, "label_color": color}
+            line, solver, window = windowed_diagram(throw_heights, endpoints, [swap_tracker, period_tracker], beat_spec,
+                                                    margin=self.window_margin, reach=max(swapped_throw_heights) + 3)
+            self.add(line)
+            self.play(line.animate.shift(RIGHT))
+            solver.attach(self)
+        else:
+            line, throws = diagram(throw_heights, endpoints, angle=Angle)
+            self.add(line)
+            for throw in throws:
+                self.add(throw)
+            self.play(line.animate.shift(RIGHT))
+            #Every throw and label is solved at once, with trackers (swap_tracker, period_tracker): a throw from beat i
+            #has height h_i + swap*(swapped h_i - h_i) + period*[i in period_positions].
+            solver = BeatStateSolver([line], [swap_tracker, period_tracker])
+            beats = np.arange(endpoints[0], endpoints[1] + 1)
+            heights = np.array(throw_heights)[beats % N]
+            coefficients = np.column_stack([np.array(swapped_throw_heights)[beats % N] - heights,
+                                            np.isin(beats % N, period_positions)])
+            solver.add_throws(throws, 0, beats, 0, beats + heights, coefficients)
+            labels = []
+            for i in range(endpoints[0], endpoints[1] + 1):
+                throw = throws[i - endpoints[0]]
+                if i % N in period_positions or i % N in swap_positions:
+                    throw.set_color(ORANGE)
+                    label = line.labels[i - endpoints[0]]
+                    label.set(num_decimal_places=1, color=ORANGE)
+                    label.position = i
+                    labels.append(label)
+            changing = np.isin(beats % N, period_positions) | np.isin(beats % N, swap_positions)
+            solver.add_labels(labels, heights[changing], coefficients[changing])
+            solver.attach(self)
+        self.wait()
         #print(throw_heights)
         #print(swapped_throw_heights)
         print(get_throw_height(0))
@@ -0,0 +1,241 @@
+from itertools import combinations
+
+import numpy as np
+
+"""
+This file contains methods for checking that a list of throw heights is a juggleable
+siteswap, and for listing every siteswap of a given period, number of balls and maximum height.
+It only depends on NumPy, so patterns can be checked and generated without building any scenes.
+"""
+
+"""
+Returns True if a list of throw heights is a valid siteswap, i.e. no two throws land on the same beat.
+Inputs:
+throw_heights -- list of periodic throw heights in the pattern
+"""
+def is_valid_siteswap(throw_heights):
+    return bool(validate_siteswaps([throw_heights])[0])
+
+"""
+Checks a batch of patterns at once. A pattern of period N is valid exactly when
+i -> (i + h_i) mod N is a permutation of 0, ..., N-1 and every throw height is a non-negative integer.
+Patterns of the same period are checked together in one vectorized pass.
+Inputs:
+patterns -- a 2D array of patterns sharing a period, or any iterable of lists of throw heights
+Returns:
+Boolean numpy array, one entry per pattern, in the order the patterns were given.
+"""
+def validate_siteswaps(patterns):
+    if isinstance(patterns, np.ndarray) and patterns.ndim == 2:
+        return validate_period(patterns)
+    patterns = [np.asarray(pattern) for pattern in patterns]
+    valid = np.zeros(len(patterns), dtype=bool)
+    periods = np.array([len(pattern) for pattern in patterns])
+    for N in np.unique(periods):
+        indices = np.flatnonzero(periods == N)
+        if N == 0:
+            continue
+        valid[indices] = validate_period(np.stack([patterns[i] for i in indices]))
+    return valid
+
+"""
+Checks a 2D array of patterns sharing a period, as in validate_siteswaps.
+"""
+def validate_period(patterns):
+    patterns = np.asarray(patterns)
+    M, N = patterns.shape
+    if N == 0:
+        return np.zeros(M, dtype=bool)
+    integral = np.all(patterns == np.round(patterns), axis=1) & np.all(patterns >= 0, axis=1)
+    landing = (np.arange(N) + np.round(patterns).astype(np.int64)) % N
+    permutation = np.all(np.sort(landing, axis=1) == np.arange(N), axis=1)
+    return integral & permutation
+
+"""
+Raises a ValueError describing the first collision if a list of throw heights is not a valid siteswap.
+Inputs:
+throw_heights -- list of periodic throw heights in the pattern
+"""
+def check_siteswap(throw_heights):
+    N = len(throw_heights)
+    if N == 0:
+        raise ValueError("A siteswap needs at least one throw.")
+    for i, throw in enumerate(throw_heights):
+        if throw < 0 or throw != int(throw):
+            raise ValueError(f"Throw height {throw} at beat {i} is not a non-negative integer.")
+    landings = {}
+    for i, throw in enumerate(throw_heights):
+        landing = (i + int(throw)) % N
+        if landing in landings:
+            raise ValueError(f"{list(throw_heights)} is not a valid siteswap: the throws at beats "
+                             f"{landings[landing]} and {i} both land on beat {landing} (mod {N}).")
+        landings[landing] = i
+
+"""
+Finds the ball orbits of a batch of valid patterns sharing a period at once. The throw at beat i is caught
+and thrown again at beat (i + h_i) mod N, so the balls of a pattern follow the cycles of that permutation,
+and every throw of a cycle is made by the same balls. Each cycle is found by pointer doubling: after k
+rounds every beat knows the smallest beat among the next 2**k throws of its cycle.
+Inputs:
+patterns -- 2D array of patterns
+Returns:
+Integer array o of the same shape, where o[m, i] is the orbit of the throw at beat i of pattern m.
+Orbits are numbered from 0 in the order of their first beat.
+"""
+def ball_orbits(patterns):
+    patterns = np.asarray(patterns)
+    M, N = patterns.shape
+    beats = np.arange(N)
+    successor = (beats + np.round(patterns).astype(np.int64)) % N
+    leader = np.broadcast_to(beats, (M, N)).copy()
+    for _ in range(max(1, (N - 1).bit_length())):
+        leader = np.minimum(leader, np.take_along_axis(leader, successor, axis=1))
+        successor = np.take_along_axis(successor, successor, axis=1)
+    numbers = np.cumsum(leader == beats, axis=1) - 1
+    return np.take_along_axis(numbers, leader, axis=1)
+
+"""
+Returns the ball orbit of each throw of a valid pattern, as in ball_orbits, e.g. [0, 1, 0] for 531.
+"""
+def orbit_labels(throw_heights):
+    return ball_orbits([throw_heights])[0].tolist()
+
+ORBIT_COLORS = ['#648FFF', '#DC267F', '#FFB000', '#FE6100', '#785EF0']
+
+"""
+Returns the color of each throw of a valid pattern, the same for every throw of a ball orbit.
+Inputs:
+throw_heights -- list of periodic throw heights in the pattern
+colors -- Optional, list of colors, orbit k gets colors[k % len(colors)]. The default colors are hex strings,
+          which both manim and matplotlib accept.
+"""
+def orbit_colors(throw_heights, colors=None):
+    colors = ORBIT_COLORS if colors == None else colors
+    return [colors[label % len(colors)] for label in orbit_labels(throw_heights)]
+
+SITESWAP_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+"""
+Returns the usual written name of a pattern, e.g. "531", writing throws of 10 and over as letters.
+"""
+def pattern_name(throw_heights):
+    return "".join(SITESWAP_DIGITS[int(throw)] for throw in throw_heights)
+
+"""
+Returns the throw heights of a pattern written as in pattern_name, e.g. [7, 10, 3] for "7a3".
+Raises a ValueError for characters which aren't throw heights.
+"""
+def parse_pattern(name):
+    throw_heights = []
+    for character in name.strip().lower():
+        if character not in SITESWAP_DIGITS:
+            raise ValueError(f"{character!r} in {name!r} is not a throw height.")
+        throw_heights.append(SITESWAP_DIGITS.index(character))
+    return throw_heights
+
+"""
+Returns the number of balls juggled in a valid siteswap, the average of its throw heights.
+"""
+def ball_count(throw_heights):
+    return sum(throw_heights)//len(throw_heights)
+
+"""
+Returns the rotation of a pattern which is largest in lexicographic order,
+the conventional way of writing a siteswap (531 rather than 315 or 153).
+"""
+def canonical_rotation(throw_heights):
+    pattern = list(throw_heights)
+    return max(pattern[i:] + pattern[:i] for i in range(len(pattern)))
+
+"""
+Finds the canonical rotation of a batch of patterns sharing a period at once.
+Inputs:
+patterns -- 2D array of patterns
+Returns:
+Array r of the first rotation of each pattern which is largest in lexicographic order, so that
+np.roll(patterns[m], -r[m]) is canonical_rotation(patterns[m]).
+"""
+def canonical_rotations(patterns):
+    patterns = np.asarray(patterns)
+    M, N = patterns.shape
+    rotations = patterns[:, (np.arange(N)[:, None] + np.arange(N)[None, :]) % N]
+    candidates = np.ones((M, N), dtype=bool)
+    #Narrow down the rotations one column at a time, keeping those with the largest entry so far.
+    for c in range(N):
+        column = np.where(candidates, rotations[:, :, c], patterns.min() - 1)
+        candidates &= column == column.max(axis=1, keepdims=True)
+    return np.argmax(candidates, axis=1)
+
+"""
+Returns the smallest period the pattern repeats with, e.g. 1 for [3, 3].
+"""
+def minimal_period(throw_heights):
+    pattern = list(throw_heights)
+    N = len(pattern)
+    for d in range(1, N + 1):
+        if N % d == 0 and pattern == pattern[d:] + pattern[:d]:
+            return d
+    return N
+
+"""
+A generator yielding every siteswap of a given period, number of balls and maximum throw height,
+each pattern once, written in its canonical rotation. Patterns are found by walking the
+state graph, where a state records which of the next max_height beats already have a ball landing on them,
+so only juggleable sequences are ever built and memory use stays proportional to the period.
+Inputs:
+period -- length of the patterns
+balls -- number of balls juggled
+max_height -- largest allowed throw height
+include_repeats -- Optional, whether to include patterns which repeat with a smaller period,
+                   such as [3, 3] for period 2.
+Yields:
+lists of throw heights
+"""
+def enumerate_siteswaps(period, balls, max_height, include_repeats=False):
+    if period < 1 or balls < 0 or balls > max_height:
+        return
+    for start_state in siteswap_states(balls, max_height):
+        for pattern in cycles_from_state(start_state, period, max_height):
+            if pattern != canonical_rotation(pattern):
+                continue
+            if not include_repeats and minimal_period(pattern) != period:
+                continue
+            yield pattern
+
+"""
+Yields every state with a given number of balls, as a bitmask whose bit j is set
+when a ball lands j beats from now.
+"""
+def siteswap_states(balls, max_height):
+    for combination in combinations(range(max_height), balls):
+        state = 0
+        for bit in combination:
+            state |= 1 << bit
+        yield state
+
+"""
+Yields every sequence of period throws which starts and ends at start_state,
+whose first throw is its largest.
+"""
+def cycles_from_state(start_state, period, max_height):
+    pattern = []
+    def search(state):
+        if len(pattern) == period:
+            if state == start_state:
+                yield list(pattern)
+            return
+        shifted = state >> 1
+        if state & 1:
+            #The first throw is the largest throw of a canonical rotation.
+            largest = pattern[0] if pattern else max_height
+            for throw in range(largest, 0, -1):
+                landing = 1 << (throw - 1)
+                if not shifted & landing:
+                    pattern.append(throw)
+                    yield from search(shifted | landing)
+                    pattern.pop()
+        else:
+            pattern.append(0)
+            yield from search(shifted)
+            pattern.pop()
+    yield from search(start_state)
@@ -0,0 +1,163 @@
+import zlib
+
+from manim import *
+from manim.renderer.cairo_renderer import CairoRenderer
+import numpy as np
+
+"""
+This file contains a scene mixin which rasterizes the parts of a frame that don't change once,
+and only draws what moves every frame.
+
+Manim only reuses a static frame for the mobjects drawn below the first moving one, so a scene whose
+first mobject has an updater redraws everything every frame. Here the mobjects of the scene are split,
+in drawing order, into runs of moving and static mobjects. A mobject is moving when it is animated,
+has updaters, or belongs to an animated or updated family; an updater which changes other mobjects
+lists them in a driven_mobjects attribute on its mobject. Each static run is rasterized once into a
+cached transparent layer, and every frame the layers are composited in order with the moving mobjects
+drawn between them, so the picture is the same as drawing everything. Every layer keeps a checksum of
+the points and colors it was drawn from, and is drawn again as soon as they change, so a static
+mobject moved by something other than an animation or updater is never shown out of date.
+Usage:
+class line_on_circle(StaticLayerScene, Scene):
+"""
+
+STYLE_ATTRIBUTES = ["stroke_rgbas", "fill_rgbas", "background_stroke_rgbas", "stroke_width",
+                    "background_stroke_width", "pixel_array", "z_index"]
+
+"""
+Returns a checksum of everything a list of mobjects draws: their points and their colors.
+"""
+def mobjects_fingerprint(mobjects):
+    checksum = 0
+    for mobject in mobjects:
+        checksum = zlib.crc32(memoryview(np.ascontiguousarray(mobject.points)), checksum)
+        for attribute in STYLE_ATTRIBUTES:
+            value = getattr(mobject, attribute, None)
+            if value is not None:
+                checksum = zlib.crc32(memoryview(np.ascontiguousarray(value)), checksum)
+    return checksum
+
+"""
+Returns the ids of the mobjects in a scene which can change during its current play: the families
+of the animated mobjects, of the mobjects with updaters and the driven_mobjects they list,
+and of the foreground mobjects.
+"""
+def moving_mobject_ids(scene):
+    roots = [animation.mobject for animation in getattr(scene, "animations", None) or []]
+    roots.extend(scene.foreground_mobjects)
+    for mobject in scene.get_mobject_family_members():
+        if mobject.updaters:
+            roots.append(mobject)
+            roots.extend(getattr(mobject, "driven_mobjects", []))
+    return {id(member) for root in roots for member in root.get_family()}
+
+"""
+Returns the mobjects of a scene which draw anything, in drawing order, as a list of (static, mobjects) runs.
+"""
+def layer_runs(scene):
+    moving = moving_mobject_ids(scene)
+    runs = []
+    for mobject in scene.get_mobject_family_members():
+        if not mobject.has_points():
+            continue
+        static = id(mobject) not in moving
+        if runs and runs[-1][0] == static:
+            runs[-1][1].append(mobject)
+        else:
+            runs.append((static, [mobject]))
+    return runs
+
+"""
+A run of static mobjects rasterized into an RGBA image, with premultiplied alpha as Cairo draws it.
+The bottom layer of a frame is drawn onto the background and is opaque; the others are transparent,
+and box is the (top, bottom, left, right) bounding box of their drawn pixels, or None if they are empty.
+"""
+class StaticLayer:
+    def __init__(self, shape):
+        self.image = np.zeros(shape, dtype=np.uint8)
+        self.fingerprint = None
+        self.box = None
+        self.used = True
+
+"""
+Draws a transparent layer over a frame, in place, with the Porter-Duff over operator.
+"""
+def composite_layer(frame, layer):
+    if layer.box is None:
+        return
+    top, bottom, left, right = layer.box
+    source = layer.image[top:bottom, left:right].astype(np.uint16)
+    target = frame[top:bottom, left:right]
+    blended = source + (target.astype(np.uint16)*(255 - source[:, :, 3:4]) + 127)//255
+    target[:] = np.minimum(blended, 255)
+
+"""
+A Scene mixin drawing the static parts of each frame from cached layers, see the top of this file.
+Put it before the Scene class in the bases. Setting use_static_layers to False turns it off.
+"""
+class StaticLayerScene:
+    use_static_layers = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.static_layers = {}
+        if self.use_static_layers and isinstance(self.renderer, CairoRenderer):
+            self.renderer.render = self.render_layered_frame
+
+    #Stands in for the renderer's render, drawing one frame of a play from the cached layers and the moving mobjects.
+    #Like the renderer's update_frame, it draws nothing for skipped plays, whose frames add_frame would drop anyway.
+    def render_layered_frame(self, scene, time, moving_mobjects):
+        if self.renderer.skip_animations:
+            return
+        camera = self.renderer.camera
+        for layer in self.static_layers.values():
+            layer.used = False
+        runs = layer_runs(self)
+        if not runs or not runs[0][0]:
+            camera.reset()
+        for index, (static, mobjects) in enumerate(runs):
+            if not static:
+                camera.capture_mobjects(mobjects, include_submobjects=False)
+            elif index == 0:
+                camera.pixel_array[:] = self.static_layer(mobjects, bottom=True).image
+            else:
+                composite_layer(camera.pixel_array, self.static_layer(mobjects, bottom=False))
+        self.drop_unused_layers()
+        self.renderer.add_frame(self.renderer.get_frame())
+
+    #Returns the layer of a run of static mobjects, drawing it again if the mobjects changed since it was drawn.
+    def static_layer(self, mobjects, bottom):
+        camera = self.renderer.camera
+        key = (bottom, tuple(id(mobject) for mobject in mobjects))
+        fingerprint = mobjects_fingerprint(mobjects)
+        if bottom:
+            fingerprint = zlib.crc32(repr((camera.background_color, camera.background_opacity)).encode(), fingerprint)
+        layer = self.static_layers.get(key)
+        if layer is None:
+            layer = StaticLayer(camera.pixel_array.shape)
+            self.static_layers[key] = layer
+        if layer.fingerprint != fingerprint:
+            if bottom:
+                camera.reset()
+                camera.capture_mobjects(mobjects, include_submobjects=False)
+                layer.image[:] = camera.pixel_array
+            else:
+                frame = camera.pixel_array
+                layer.image.fill(0)
+                camera.pixel_array = layer.image
+                try:
+                    camera.capture_mobjects(mobjects, include_submobjects=False)
+                finally:
+                    camera.pixel_array = frame
+                rows = np.flatnonzero(layer.image[:, :, 3].any(axis=1))
+                columns = np.flatnonzero(layer.image[:, :, 3].any(axis=0))
+                layer.box = (rows[0], rows[-1] + 1, columns[0], columns[-1] + 1) if len(rows) else None
+            layer.fingerprint = fingerprint
+        layer.used = True
+        return layer
+
+    #Forgets the layers the last frame didn't use, along with the Cairo context the camera keeps for each.
+    def drop_unused_layers(self):
+        contexts = getattr(self.renderer.camera, "pixel_array_to_cairo_context", {})
+        for key in [key for key, layer in self.static_layers.items() if not layer.used]:
+            contexts.pop(id(self.static_layers.pop(key).image), None)
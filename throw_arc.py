@@ -0,0 +1,299 @@
+from manim import *
+import numpy as np
+
+"""
+This file contains a throw arc, an arrow along a circular arc between two points
+whose geometry is computed directly from its endpoints, so it can be moved every frame
+without building new mobjects.
+"""
+
+"""
+Returns the control points of circular arcs between pairs of points, as cubic Bezier curves.
+The arcs turn counterclockwise for a positive angle, matching ArcBetweenPoints.
+Inputs:
+starts -- (K, 3) array of start points
+ends -- (K, 3) array of end points
+angle -- float or (K,) array, the angle each arc subtends. An angle of 0 gives a straight segment.
+num_components -- Optional, number of cubic curves per arc
+Returns:
+(K, 4*num_components, 3) array of control points.
+"""
+def arc_points(starts, ends, angle, num_components=9):
+    starts = np.asarray(starts, dtype=float)
+    ends = np.asarray(ends, dtype=float)
+    angle = np.broadcast_to(np.asarray(angle, dtype=float), (len(starts),))[:, None]
+    straight = np.abs(angle) < 1e-8
+    safe_angle = np.where(straight, 1.0, angle)
+    #Anchors and handles of the unit arc from 1 to e^{i*angle}, as complex numbers.
+    delta = safe_angle/num_components
+    anchor_angles = delta*np.arange(num_components)
+    first = np.exp(1j*anchor_angles)
+    last = np.exp(1j*(anchor_angles + delta))
+    handle_length = (4/3)*np.tan(delta/4)
+    unit_arc = np.stack([first, first + 1j*handle_length*first, last - 1j*handle_length*last, last], axis=2)
+    #Send 1 to the start and e^{i*angle} to the end by a similarity, or lay a line when the arc is straight.
+    proportions = (unit_arc - 1)/(np.exp(1j*safe_angle) - 1)[:, :, None]
+    line_proportions = (np.arange(num_components)[:, None] + np.array([0, 1/3, 2/3, 1]))/num_components
+    proportions = np.where(straight[:, :, None], line_proportions[None], proportions).reshape(len(starts), -1)
+    chords = (ends[:, 0] - starts[:, 0]) + 1j*(ends[:, 1] - starts[:, 1])
+    planar = (starts[:, 0] + 1j*starts[:, 1])[:, None] + proportions*chords[:, None]
+    heights = starts[:, 2][:, None] + proportions.real*(ends[:, 2] - starts[:, 2])[:, None]
+    return np.stack([planar.real, planar.imag, heights], axis=2)
+
+"""
+Returns the cubic Bezier curves tracing exactly the same paths as quadratic Bezier curves,
+so curves known by their three control points are drawn without sampling them.
+Inputs:
+controls -- (..., 3, 3) array, the start, control and end point of each quadratic curve
+Returns:
+(..., 4, 3) array of the control points of the cubic curves
+"""
+def quadratic_to_cubic(controls):
+    controls = np.asarray(controls, dtype=float)
+    start, middle, end = controls[..., 0, :], controls[..., 1, :], controls[..., 2, :]
+    return np.stack([start, start + 2*(middle - start)/3, end + 2*(middle - end)/3, end], axis=-2)
+
+"""
+Splits quadratic Bezier curves into pieces of equal parameter length, exactly: each piece is the quadratic
+curve tracing that part of the original. Used to give a curve more points for a nonlinear map, such as
+the wrap homotopy, to act on, without approximating the curve itself.
+Inputs:
+controls -- (..., 3, 3) array, the start, control and end point of each quadratic curve
+pieces -- number of pieces to split each curve into
+Returns:
+(..., pieces, 3, 3) array of the control points of the pieces
+"""
+def split_quadratic(controls, pieces):
+    controls = np.asarray(controls, dtype=float)
+    a = np.arange(pieces)/pieces
+    b = (np.arange(pieces) + 1)/pieces
+    #The control points of the piece from a to b are the blossoms B(a, a), B(a, b) and B(b, b) of the curve.
+    weights = np.stack([np.stack([(1 - s)*(1 - t), s*(1 - t) + t*(1 - s), s*t], axis=1)
+                        for s, t in [(a, a), (a, b), (b, b)]], axis=1)
+    return np.einsum("pkc,...cd->...pkd", weights, controls)
+
+"""
+A throw drawn as quadratic Bezier curves, given by their control points, each stored as the one cubic
+curve tracing it exactly instead of being sampled as a ParametricFunction.
+Inputs:
+controls -- (3, 3) array of the start, control and end point of the throw, or (K, 3, 3) array of several
+            throws drawn as one mobject
+pieces -- Optional, number of exact pieces to split each throw into, for maps which move points nonlinearly
+"""
+class QuadraticThrow(VMobject):
+    def __init__(self, controls, pieces=1, **kwargs):
+        super().__init__(**kwargs)
+        self.pieces = pieces
+        self.set_controls(controls)
+
+    #Moves the throw to new control points, keeping its number of pieces.
+    def set_controls(self, controls):
+        self.controls = np.asarray(controls, dtype=float)
+        self.set_points(quadratic_to_cubic(split_quadratic(self.controls, self.pieces)).reshape(-1, 3))
+        return self
+
+"""
+Returns the control points of throw arcs between pairs of points, as the body arcs
+and the triangular tips. Like CurvedArrow, the tip ends at the end point, pointing along
+the arc, and the body is shortened to end at the base of the tip.
+Inputs:
+starts -- (K, 3) array of start points
+ends -- (K, 3) array of end points
+angle -- float or (K,) array, the angle each arc subtends
+tip_length -- Optional, length of the tips
+buff -- Optional, distance to pull both ends in along the chord, as for Arrow
+max_tip_length_to_length_ratio -- Optional, if given the tip is at most this fraction of the chord
+num_components -- Optional, number of cubic curves per arc
+Returns:
+bodies -- (K, 4*num_components, 3) array of control points of the arcs
+tips -- (K, 12, 3) array of control points of the closed triangular tips
+"""
+def throw_arc_geometry(starts, ends, angle, tip_length=DEFAULT_ARROW_TIP_LENGTH, buff=0,
+                       max_tip_length_to_length_ratio=None, num_components=9):
+    starts = np.asarray(starts, dtype=float)
+    ends = np.asarray(ends, dtype=float)
+    angle = np.broadcast_to(np.asarray(angle, dtype=float), (len(starts),))
+    chords = ends - starts
+    lengths = np.linalg.norm(chords, axis=1)
+    safe_lengths = np.where(lengths > 0, lengths, 1)
+    chord_directions = chords/safe_lengths[:, None]
+    if buff:
+        buffs = np.minimum(buff, lengths/2)[:, None]
+        starts = starts + buffs*chord_directions
+        ends = ends - buffs*chord_directions
+        lengths = lengths - 2*buffs[:, 0]
+    tip_lengths = np.full(len(starts), float(tip_length))
+    if max_tip_length_to_length_ratio != None:
+        tip_lengths = np.minimum(tip_lengths, max_tip_length_to_length_ratio*lengths)
+    #The arc meets its end point at half its angle from the chord.
+    cosines, sines = np.cos(angle/2), np.sin(angle/2)
+    directions = np.column_stack([cosines*chord_directions[:, 0] - sines*chord_directions[:, 1],
+                                  sines*chord_directions[:, 0] + cosines*chord_directions[:, 1],
+                                  np.zeros(len(starts))])
+    normals = np.column_stack([-directions[:, 1], directions[:, 0], np.zeros(len(starts))])
+    bases = ends - tip_lengths[:, None]*directions
+    #As ArrowTriangleFilledTip, the base is as wide as the tip is long.
+    corners = tip_lengths[:, None]*normals/2
+    triangle = np.stack([ends, bases + corners, bases - corners, ends], axis=1)
+    thirds = np.array([0, 1/3, 2/3, 1])[None, None, :, None]
+    tips = (triangle[:, :-1, None] + thirds*(triangle[:, 1:, None] - triangle[:, :-1, None])).reshape(len(starts), 12, 3)
+    return arc_points(starts, bases, angle, num_components), tips
+
+"""
+An arrow along a circular arc, made of the arc itself and a filled triangular tip.
+Moving it with put_start_and_end_on recomputes the control points of both in place,
+so updaters can move throws every frame without allocating new mobjects.
+Inputs:
+start -- start point of the throw
+end -- end point of the throw
+angle -- Optional, the angle the arc subtends, as for CurvedArrow. 0 gives a straight arrow.
+tip_length -- Optional, length of the tip
+buff -- Optional, distance to pull both ends in, as for Arrow
+max_tip_length_to_length_ratio -- Optional, if given the tip is at most this fraction of the arrow's length
+geometry -- Optional, (body, tip) control points as returned by throw_arc_geometry, used instead of computing them
+"""
+class ThrowArc(VMobject):
+    def __init__(self, start, end, angle=-TAU/4, tip_length=DEFAULT_ARROW_TIP_LENGTH, buff=0,
+                 max_tip_length_to_length_ratio=None, num_components=9, geometry=None, **kwargs):
+        self.angle = angle
+        self.tip_length = tip_length
+        self.buff = buff
+        self.max_tip_length_to_length_ratio = max_tip_length_to_length_ratio
+        self.num_components = num_components
+        super().__init__(**kwargs)
+        self.tip = VMobject(color=self.get_color(), fill_opacity=1, stroke_width=0)
+        self.add(self.tip)
+        if geometry != None:
+            self.set_geometry(*geometry)
+        else:
+            self.put_start_and_end_on(start, end)
+
+    #Moves the throw to run between two points, optionally changing the angle of its arc.
+    def put_start_and_end_on(self, start, end, angle=None):
+        if angle != None:
+            self.angle = angle
+        bodies, tips = throw_arc_geometry(np.array([start]), np.array([end]), self.angle,
+                                          tip_length=self.tip_length, buff=self.buff,
+                                          max_tip_length_to_length_ratio=self.max_tip_length_to_length_ratio,
+                                          num_components=self.num_components)
+        self.set_geometry(bodies[0], tips[0])
+        return self
+
+    #Sets the control points of the arc and the tip, as returned by throw_arc_geometry.
+    def set_geometry(self, body, tip):
+        self.points = body
+        self.tip.points = tip
+        return self
+
+    def get_tip(self):
+        return self.tip
+
+"""
+Returns the control points of the closed polygon through the given corners, as straight cubic curves.
+Inputs:
+corners -- (..., M, 3) array of corners
+Returns:
+(..., 4*M, 3) array of control points
+"""
+def polygon_points(corners):
+    corners = np.asarray(corners, dtype=float)
+    closed = np.concatenate([corners, corners[..., :1, :]], axis=-2)
+    thirds = np.array([0, 1/3, 2/3, 1])[:, None]
+    segments = closed[..., :-1, None, :] + thirds*(closed[..., 1:, None, :] - closed[..., :-1, None, :])
+    return segments.reshape(corners.shape[:-2] + (-1, 3))
+
+"""
+Moves control points laid out along the x-axis from the origin onto the plane, rotating them by angles
+and translating the origin to given points. Used to place copies of a template.
+Inputs:
+templates -- (K, P, 3) array of control points
+origins -- (K, 3) array, where each template's origin goes
+directions -- (K, 3) array, where each template's x-axis points, need not be normalized
+Returns:
+(K, P, 3) array of the moved control points
+"""
+def place_templates(templates, origins, directions):
+    norms = np.linalg.norm(directions[:, :2], axis=1)
+    norms = np.where(norms > 0, norms, 1)
+    cosines, sines = (directions[:, 0]/norms)[:, None], (directions[:, 1]/norms)[:, None]
+    x, y = templates[..., 0], templates[..., 1]
+    return np.stack([origins[:, 0, None] + cosines*x - sines*y,
+                     origins[:, 1, None] + sines*x + cosines*y,
+                     origins[:, 2, None] + templates[..., 2]], axis=-1)
+
+"""
+Builds the arcs and loops of polygon diagrams from cached templates. The geometry of an arc only depends
+on its chord length once its angle and tip are fixed, and that of a loop on its radius, so each is computed
+once, along the x-axis from the origin, and every throw is a rotated and translated copy of it.
+A clock of N vertices has at most N/2 chord lengths, so its arcs cost one template each plus a copy per throw.
+Inputs:
+angle -- Optional, the angle the arcs subtend, as for CurvedArrow
+tip_length -- Optional, length of the arcs' tips
+num_components -- Optional, number of cubic curves per arc or loop
+loop_gap -- Optional, fraction of a turn a loop leaves open, as in rotating_polygon.get_loop
+"""
+class ThrowFactory:
+    def __init__(self, angle=-TAU/4, tip_length=DEFAULT_ARROW_TIP_LENGTH, num_components=9, loop_gap=0.1):
+        self.angle = angle
+        self.tip_length = tip_length
+        self.num_components = num_components
+        self.loop_gap = loop_gap
+        self.arc_templates = {}
+        self.loop_templates = {}
+
+    #Returns the body and tip of the arc from the origin to (length, 0, 0), computing it the first time.
+    def arc_template(self, length):
+        key = round(float(length), 9)
+        if key not in self.arc_templates:
+            bodies, tips = throw_arc_geometry(np.zeros((1, 3)), np.array([[key, 0, 0]]), self.angle,
+                                              tip_length=self.tip_length, num_components=self.num_components)
+            self.arc_templates[key] = (bodies[0], tips[0])
+        return self.arc_templates[key]
+
+    #Returns the bodies and tips of the arcs between pairs of points, as throw_arc_geometry does, from the templates.
+    def arc_geometry(self, starts, ends):
+        starts = np.asarray(starts, dtype=float).reshape(-1, 3)
+        chords = np.asarray(ends, dtype=float).reshape(-1, 3) - starts
+        templates = [self.arc_template(length) for length in np.linalg.norm(chords, axis=1)]
+        bodies = place_templates(np.array([body for body, tip in templates]), starts, chords)
+        tips = place_templates(np.array([tip for body, tip in templates]), starts, chords)
+        return bodies, tips
+
+    #Returns a ThrowArc from start to end built from its template.
+    def arc(self, start, end, **kwargs):
+        bodies, tips = self.arc_geometry([start], [end])
+        return ThrowArc(start, end, angle=self.angle, tip_length=self.tip_length, num_components=self.num_components,
+                        geometry=(bodies[0], tips[0]), **kwargs)
+
+    #Returns the loop and tip of a loop of a given radius at the origin, bulging along the x-axis, computing it the first time.
+    #The loop starts at the origin, turns counterclockwise around (radius, 0, 0) and stops loop_gap of a turn short,
+    #and the tip is the triangle with a corner at the origin and its opposite side centered on the loop's end.
+    def loop_template(self, loop_radius):
+        key = round(float(loop_radius), 9)
+        if key not in self.loop_templates:
+            sweep = TAU*(1 - self.loop_gap)
+            end = key*np.array([1 + np.cos(sweep - PI), np.sin(sweep - PI), 0])
+            loop = arc_points(np.zeros((1, 3)), end[None], sweep, self.num_components)[0]
+            displacement = np.array([end[1], -end[0], 0])/np.sqrt(3)
+            tip = polygon_points(np.array([np.zeros(3), end - displacement, end + displacement]))
+            self.loop_templates[key] = (loop, tip)
+        return self.loop_templates[key]
+
+    #Returns the loops and tips at vertices, each bulging away from a center, as (K, P, 3) arrays.
+    def loop_geometry(self, vertices, center, loop_radius):
+        vertices = np.asarray(vertices, dtype=float).reshape(-1, 3)
+        loop, tip = self.loop_template(loop_radius)
+        outward = vertices - np.asarray(center, dtype=float)
+        return (place_templates(np.broadcast_to(loop, (len(vertices),) + loop.shape), vertices, outward),
+                place_templates(np.broadcast_to(tip, (len(vertices),) + tip.shape), vertices, outward))
+
+    #Returns a VGroup of a loop at a vertex bulging away from a center and its filled tip, like rotating_polygon.get_loop.
+    def loop(self, vertex, center, loop_radius, **kwargs):
+        loops, tips = self.loop_geometry([vertex], center, loop_radius)
+        loop = VMobject(**kwargs)
+        loop.set_points(loops[0])
+        tip = VMobject(color=loop.get_color(), fill_opacity=1)
+        tip.set_points(tips[0])
+        return VGroup(loop, tip)
+
+THROW_FACTORY = ThrowFactory()